@@ -41,12 +41,14 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',  # ASGI runserver, so WebSocket chat also works in development
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'channels',
     'question_gen',
 ]
 
@@ -79,6 +81,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'genai_project.wsgi.application'
+ASGI_APPLICATION = 'genai_project.asgi.application'
 
 
 # Database
@@ -164,4 +167,135 @@ TIME_ZONE = 'Asia/Kolkata'  # Change to your actual timezone
 USE_TZ = True
 
 RAZORPAY_KEY_ID = 'your_key_id'
-RAZORPAY_KEY_SECRET = 'your_key_secret'
\ No newline at end of file
+RAZORPAY_KEY_SECRET = 'your_key_secret'
+
+# Quiz engine / LLM timing reports go to the console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'question_gen': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+# Independent LLM prompts run concurrently on a bounded pool
+LLM_FANOUT_WORKERS = 8
+LLM_CALL_TIMEOUT = 30  # seconds per call
+
+GEMINI_MODEL = 'gemini-2.5-flash-lite'
+
+# Opening-question bank for built-in topics (see fill_question_bank)
+QUESTION_BANK_LOW_WATER = 10
+QUESTION_BANK_REFILL_SIZE = 30
+
+# Speculative next-question prefetch while the student is answering
+QUIZ_PREFETCH_ENABLED = True
+QUIZ_PREFETCH_WORKERS = 4
+QUIZ_PREFETCH_WAIT = 2  # seconds a POST waits for an in-flight prefetch
+QUIZ_PREFETCH_TTL = 900
+
+# LLM gateway (question_gen/llm.py)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')  # 'gemini', 'fake' or a dotted path
+LLM_MAX_CONCURRENCY = 16       # in-flight calls per process
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BACKOFF = 0.5        # seconds, doubled per retry with full jitter
+LLM_RETRY_BACKOFF_MAX = 8
+LLM_REQUESTS_PER_MINUTE = 0    # 0 = unlimited
+LLM_TOKENS_PER_MINUTE = 0
+LLM_BREAKER_THRESHOLD = 5      # consecutive failed calls before failing fast
+LLM_BREAKER_COOLDOWN = 30      # seconds before a trial call is let through
+# FakeBackend only (offline runs, `manage.py benchmark`)
+LLM_FAKE_LATENCY = 0           # seconds per call
+LLM_FAKE_LATENCY_JITTER = 0
+LLM_FAKE_FAILURE_RATE = 0      # share of calls raising a transient error
+LLM_FAKE_SEED = 0
+
+# Stream quiz verdicts/questions to the page as server-sent events
+QUIZ_STREAMING_ENABLED = True
+
+# LLM response cache (question_gen/llm_cache.py): in-process LRU + shared DB tier
+LLM_CACHE_ENABLED = True
+LLM_CACHE_MEMORY_SIZE = 1024
+LLM_CACHE_MEMORY_TTL = 600                 # seconds
+LLM_CACHE_DB_MAX_ENTRIES = 5000
+LLM_CACHE_DEFAULT_TTL = 24 * 3600
+LLM_CACHE_TTLS = {
+    'summary': 7 * 24 * 3600,              # same document + topic
+}
+# Prompts meant to produce something new every time
+LLM_CACHE_EXCLUDE = {'opening', 'bank', 'new_concept', 'candidates'}
+
+# Semantic judge cache (question_gen/judge_cache.py): reuse verdicts of near-identical answers
+JUDGE_CACHE_ENABLED = True
+JUDGE_CACHE_THRESHOLD = 0.9                # cosine similarity needed to reuse a verdict
+JUDGE_CACHE_AUDIT_RATE = 0.1               # share of hits re-checked by the real judge
+JUDGE_CACHE_QUESTIONS = 500                # per-question indexes kept in memory
+JUDGE_CACHE_ANSWERS_PER_QUESTION = 200
+
+# PDF uploads (question_gen/documents.py): stop parsing once the prompt has enough text
+DOCUMENT_CHAR_BUDGET = 3000
+DOCUMENT_MAX_PAGES = 50
+DOCUMENT_EXTRACT_TIME_LIMIT = 5            # seconds per upload
+DOCUMENT_SUMMARY_MAX_ENTRIES = 2000        # stored summaries of previous uploads (LRU)
+
+# Queued PDF ingestion (question_gen/jobs.py); run `python manage.py document_worker`
+DOCUMENT_QUEUE_ENABLED = True              # False = parse + summarize inside the upload request
+DOCUMENT_WORKER_PROCESSES = 2
+DOCUMENT_JOB_MAX_ATTEMPTS = 3
+DOCUMENT_JOB_RETRY_DELAY = 10              # seconds, doubled per attempt
+DOCUMENT_JOB_LOCK_TIMEOUT = 300            # a running job older than this is requeued
+
+# Chunk index for quiz prompts (question_gen/retrieval.py); `manage.py index_notes` at deploy
+DOCUMENT_NOTES = {                         # built-in topic -> bundled static PDF
+    'java': 'notes/Java Interview Questions with Answers.pdf',
+    'javascript': 'notes/Basic Javascript.pdf',
+}
+DOCUMENT_INDEX_MAX_PAGES = 300
+DOCUMENT_INDEX_TIME_LIMIT = 60             # seconds per document
+RETRIEVAL_CHUNK_CHARS = 1000
+RETRIEVAL_CHUNK_OVERLAP = 150
+RETRIEVAL_TOP_K = 3
+RETRIEVAL_CONTEXT_CHARS = 1800             # cap on retrieved text per prompt
+
+# Map-reduce summaries of queued uploads (question_gen/summarizer.py)
+SUMMARY_PROCESSES = 4                      # PDF parsing processes per document worker
+SUMMARY_MIN_PAGES_PER_PROCESS = 10
+SUMMARY_MAX_CONCURRENCY = 8                # concurrent map/reduce LLM calls
+SUMMARY_CHUNK_TOKENS = 3000
+SUMMARY_REDUCE_FANIN = 8
+
+# Chat (question_gen/chat.py)
+CHAT_PAGE_SIZE = 50                        # messages per page; older ones load on scroll
+CHAT_WRITE_BATCH_SIZE = 50                 # live messages saved per bulk insert (consumers.py)
+CHAT_WRITE_FLUSH_INTERVAL = 0.05           # seconds a live message may wait for its batch
+
+# Live chat runs over ASGI (genai_project/asgi.py). The in-memory layer only
+# reaches sockets in the same process; use channels_redis for several nodes.
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+
+# Cache: local memory by default (per process). For several processes point
+# CACHE_BACKEND at a shared one, e.g. django.core.cache.backends.redis.RedisCache
+# with CACHE_LOCATION=redis://..., or filebased.FileBasedCache with a directory.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'intelliprep'),
+    },
+}
+
+# Landing page fragments (question_gen/dashboard.py), invalidated by signals.py
+DASHBOARD_CACHE = 'default'                # cache alias
+DASHBOARD_CACHE_TTL = 300                  # seconds; changes invalidate sooner
+
+# Mentor search (question_gen/skills.py)
+MENTOR_SEARCH_PAGE_SIZE = 20
+
+# Quiz leaderboard (question_gen/leaderboard.py)
+LEADERBOARD_SIZE = 20
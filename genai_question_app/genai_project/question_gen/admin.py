@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, InterviewRequest, ChatMessage, ContactMessage  # Add ContactMessage
+from .models import User, InterviewRequest, ChatMessage, ContactMessage, BankQuestion, LLMCacheEntry, JudgedAnswer, DocumentSummary, DocumentJob, QuizAttempt, QuizTurn, Conversation, Skill, LeaderboardEntry
 
 class UserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'user_type', 'package', 'company', 'role', 'is_active', 'date_joined')
@@ -26,10 +26,101 @@ class UserAdmin(BaseUserAdmin):
 
 # Register all models
 admin.site.register(User, UserAdmin)
-admin.site.register(InterviewRequest)
-admin.site.register(ChatMessage)
+
+
+@admin.register(InterviewRequest)
+class InterviewRequestAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'requested_date', 'status', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('student__username', 'interviewer__username')
+    list_select_related = ('student', 'interviewer')  # __str__ uses both
+
+
+@admin.register(ChatMessage)
+class ChatMessageAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'timestamp', 'is_read')
+    search_fields = ('sender__username', 'receiver__username', 'message')
+    list_select_related = ('sender', 'receiver')  # __str__ uses both
+
+
 admin.site.register(ContactMessage)  # Now visible in admin
 
+
+@admin.register(BankQuestion)
+class BankQuestionAdmin(admin.ModelAdmin):
+    list_display = ('topic', 'question', 'used', 'created_at')
+    list_filter = ('topic', 'used')
+    search_fields = ('question',)
+
+
+@admin.register(LLMCacheEntry)
+class LLMCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'model', 'hits', 'latency_ms', 'created_at', 'expires_at')
+    list_filter = ('kind', 'model')
+    ordering = ('-hits',)
+
+
+@admin.register(JudgedAnswer)
+class JudgedAnswerAdmin(admin.ModelAdmin):
+    list_display = ('question', 'answer', 'verdict', 'hits', 'audits', 'audit_mismatches', 'created_at')
+    search_fields = ('question', 'answer')
+    exclude = ('vector',)
+    ordering = ('-hits',)
+
+
+@admin.register(DocumentSummary)
+class DocumentSummaryAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'topic', 'hits', 'size_bytes', 'pages_parsed', 'created_at', 'last_used_at')
+    search_fields = ('content_hash', 'topic')
+    ordering = ('-hits',)
+
+
+@admin.register(DocumentJob)
+class DocumentJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'topic', 'status', 'attempts', 'size_bytes', 'pages_parsed', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('user__username', 'content_hash')
+    list_select_related = ('user',)
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name',)
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ('student', 'interviewer', 'last_message_at', 'last_message_preview')
+    search_fields = ('student__username', 'interviewer__username')
+    list_select_related = ('student', 'interviewer')
+    ordering = ('-last_message_at',)
+
+
+class QuizTurnInline(admin.TabularInline):
+    model = QuizTurn
+    extra = 0
+    fields = ('step', 'question', 'user_answer', 'concept', 'is_correct', 'nest_level')
+    readonly_fields = fields
+
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'topic', 'step', 'score', 'started_at', 'finished_at')
+    list_filter = ('topic',)
+    search_fields = ('user__username', 'topic')
+    list_select_related = ('user',)
+    inlines = [QuizTurnInline]
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'topic', 'period', 'points', 'questions', 'quizzes', 'last_quiz_at')
+    list_filter = ('period',)
+    search_fields = ('user__username', 'topic')
+    list_select_related = ('user',)
+
+
 # Branding
 admin.site.site_header = "InterviewPrep Pro Admin"
 admin.site.site_title = "InterviewPrep Pro"
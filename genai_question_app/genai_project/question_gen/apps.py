@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QuestionGenConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'question_gen'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the dashboard cache invalidation)
@@ -0,0 +1,146 @@
+"""
+End-to-end benchmark flows, driven through the Django test client.
+
+Used by `manage.py benchmark`, which runs them against a throwaway test
+database with the fake LLM backend. Each flow records one sample per request:
+(label, milliseconds, SQL queries, HTTP status).
+"""
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import chat
+from .models import ChatMessage, InterviewRequest, User
+from .question_bank import BUILTIN_TOPICS
+from .views import QUIZ_MAX_STEPS
+
+ANSWERS = [
+    "It lets a function keep access to variables from the scope it was created in.",
+    "It runs code asynchronously and gives back a value later.",
+    "The runtime frees objects that nothing references any more.",
+    "I am not sure, maybe it is about loops?",
+    "It makes the code reusable for different types.",
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+class Recorder:
+    """Test client wrapper that times every request and counts its SQL queries."""
+
+    def __init__(self, user, samples):
+        self.client = Client()
+        self.client.force_login(user)
+        self.samples = samples
+
+    def request(self, label, method, path, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(path, data or {})
+            elapsed = (time.perf_counter() - start) * 1000
+        self.samples.append((label, elapsed, len(queries), response.status_code))
+        return response
+
+
+# ==================== FIXTURES ====================
+def create_users(students, interviewers):
+    """Bench users plus some chat history and interview requests for the dashboards."""
+    mentors = [
+        User.objects.create(username=f'bench-mentor-{i}', user_type='interviewer', company='Acme', package='12 LPA')
+        for i in range(interviewers)
+    ]
+    learners = [User.objects.create(username=f'bench-student-{i}') for i in range(students)]
+    now = timezone.now()
+    for i, student in enumerate(learners):
+        mentor = mentors[i % len(mentors)]
+        chat.save_messages([
+            ChatMessage(sender=student if n % 2 == 0 else mentor, receiver=mentor if n % 2 == 0 else student,
+                        message=f'bench message {n}')
+            for n in range(10)
+        ])
+        InterviewRequest.objects.create(student=student, interviewer=mentor, requested_date=now + timedelta(days=i + 1))
+    return learners, mentors
+
+
+# ==================== FLOWS ====================
+def quiz_flow(student, samples, seed):
+    """select_topic -> quiz_view x QUIZ_MAX_STEPS -> quiz_end. Returns answered steps."""
+    rng = random.Random(seed)
+    rec = Recorder(student, samples)
+    topic = rng.choice(BUILTIN_TOPICS)
+    rec.request('select_topic GET', 'get', '/select-topic/')
+    rec.request('select_topic POST', 'post', '/select-topic/', {'topic': topic})
+
+    answered = 0
+    for _ in range(QUIZ_MAX_STEPS):
+        rec.request('quiz_view GET', 'get', f'/quiz/{topic}/')
+        response = rec.request('quiz_view POST', 'post', f'/quiz/{topic}/', {'answer': rng.choice(ANSWERS)})
+        answered += response.status_code == 302
+    rec.request('quiz_end', 'get', f'/quiz/{topic}/')
+    return answered
+
+
+def chat_flow(student, mentor, samples, seed):
+    student_side = Recorder(student, samples)
+    mentor_side = Recorder(mentor, samples)
+    student_side.request('chat GET', 'get', f'/chat/{mentor.id}/')
+    for n in range(3):
+        student_side.request('chat POST', 'post', f'/chat/{mentor.id}/', {'message': f'question {seed}-{n}'})
+    mentor_side.request('chat GET', 'get', f'/chat/{student.id}/')
+    mentor_side.request('chat POST', 'post', f'/chat/{student.id}/', {'message': f'answer {seed}'})
+    return 0
+
+
+def dashboard_flow(student, mentor, samples, seed):
+    student_side = Recorder(student, samples)
+    mentor_side = Recorder(mentor, samples)
+    student_side.request('landing (student)', 'get', '/')
+    student_side.request('user_profile', 'get', f'/profile/{mentor.id}/')
+    mentor_side.request('landing (interviewer)', 'get', '/')
+    return 0
+
+
+def run_concurrently(jobs, concurrency):
+    """Run zero-argument callables on `concurrency` threads; returns their results."""
+    def _run(job):
+        try:
+            return job()
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bench') as pool:
+        return list(pool.map(_run, jobs))
+
+
+def summarize(samples):
+    """{label: {count, p50, p95, p99, max, queries_avg, queries_max, errors}} (times in ms)."""
+    by_label = {}
+    for label, ms, queries, status in samples:
+        by_label.setdefault(label, []).append((ms, queries, status))
+
+    report = {}
+    for label, rows in sorted(by_label.items()):
+        times = [ms for ms, _, _ in rows]
+        queries = [q for _, q, _ in rows]
+        report[label] = {
+            'count': len(rows),
+            'p50': round(percentile(times, 50), 1),
+            'p95': round(percentile(times, 95), 1),
+            'p99': round(percentile(times, 99), 1),
+            'max': round(max(times), 1),
+            'queries_avg': round(sum(queries) / len(queries), 1),
+            'queries_max': max(queries),
+            'errors': sum(1 for _, _, status in rows if status >= 400),
+        }
+    return report
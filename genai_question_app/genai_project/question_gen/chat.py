@@ -0,0 +1,172 @@
+"""
+Chat history between a student and a mentor, newest page first.
+
+Pages are keyset-paginated on (timestamp, id): the cursor is the oldest
+message already shown, so fetching any page is one index range scan on
+chatmsg_pair_ts_idx no matter how long the thread is.
+
+New messages go through save_messages(), which updates the pair's
+Conversation row (last message) in the same transaction; unread badges come
+from unread_counts(), straight off the partial unread index.
+
+Live delivery (consumers.py) pushes each new message to both participants
+as one serialize() frame over the conversation's group_name() group.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q
+
+from . import dashboard
+from .models import MAX_ID, ChatMessage, Conversation
+
+PREVIEW_CHARS = 120
+
+
+def can_chat(user, other_user):
+    """Chat is only between a student and an interviewer."""
+    return {user.user_type, other_user.user_type} == {'student', 'interviewer'}
+
+
+def group_name(user_id, other_user_id):
+    """Channel layer group shared by both sides of a conversation."""
+    low, high = sorted((user_id, other_user_id))
+    return f'chat.{low}.{high}'
+
+
+def serialize(message):
+    """The JSON shape a message is pushed / polled in."""
+    return {
+        'id': message.id,
+        'sender_id': message.sender_id,
+        'sender': message.sender.username,
+        'message': message.message,
+        'timestamp': message.timestamp.isoformat(),
+        'is_read': message.is_read,
+    }
+
+
+def conversation(user, other_user):
+    """All messages between the two users, either direction."""
+    return ChatMessage.objects.filter(
+        Q(sender=user, receiver=other_user) | Q(sender=other_user, receiver=user)
+    )
+
+
+def encode_cursor(message):
+    return f"{int(message.timestamp.timestamp() * 1_000_000)}-{message.id}"
+
+
+def decode_cursor(cursor):
+    """(timestamp, id) from encode_cursor(); ValueError if it isn't one."""
+    micros, message_id = (int(part) for part in cursor.split('-'))  # ValueError unless two numbers
+    if not 0 < message_id <= MAX_ID:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    try:
+        timestamp = datetime.fromtimestamp(micros / 1_000_000, tz=dt_timezone.utc)
+    except (OverflowError, OSError):
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+    return timestamp, message_id
+
+
+def page(user, other_user, before=None, limit=None):
+    """
+    Up to `limit` messages older than the `before` cursor (newest page if
+    None), oldest first. Returns (messages, cursor for the next older page or None).
+    Raises ValueError for a cursor that page() didn't hand out.
+    """
+    limit = limit or getattr(settings, 'CHAT_PAGE_SIZE', 50)
+    messages = conversation(user, other_user).select_related('sender')
+    if before:
+        timestamp, message_id = decode_cursor(before)
+        messages = messages.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id))
+    # One extra row tells us whether an older page exists
+    rows = list(messages.order_by('-timestamp', '-id')[:limit + 1])
+    older = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit][::-1], older
+
+
+def latest_id(user, other_user_id):
+    """Id of the newest message between the two users (0 if none)."""
+    latest = ChatMessage.objects.filter(
+        Q(sender=user, receiver_id=other_user_id) | Q(sender_id=other_user_id, receiver=user)
+    ).aggregate(latest=Max('id'))['latest']
+    return latest or 0
+
+
+def newer(user, other_user, after_id, limit=None):
+    """Up to `limit` messages with an id above `after_id`, oldest first (for polling clients)."""
+    limit = limit or getattr(settings, 'CHAT_PAGE_SIZE', 50)
+    return list(
+        conversation(user, other_user).filter(id__gt=after_id).select_related('sender').order_by('id')[:limit]
+    )
+
+
+# ==================== WRITES ====================
+def pair(user, other_user):
+    """(student, interviewer) for two chat participants."""
+    return (user, other_user) if user.user_type == 'student' else (other_user, user)
+
+
+def send(sender, receiver, text):
+    message = ChatMessage(sender=sender, receiver=receiver, message=text)
+    save_messages([message])
+    return message
+
+
+def save_messages(new_messages):
+    """Insert messages (sender/receiver loaded) and update their conversations, atomically."""
+    with transaction.atomic():
+        ChatMessage.objects.bulk_create(new_messages)
+        _touch_conversations(new_messages)
+    # bulk_create sends no post_save, so drop the cached chat lists here
+    dashboard.invalidate_chat(*{user_id for m in new_messages for user_id in (m.sender_id, m.receiver_id)})
+    return new_messages
+
+
+def _touch_conversations(new_messages):
+    changes = {}
+    for message in new_messages:
+        student, interviewer = pair(message.sender, message.receiver)
+        change = changes.setdefault((student.id, interviewer.id), {})
+        if 'last' not in change or message.timestamp >= change['last'].timestamp:
+            change['last'] = message
+
+    for (student_id, interviewer_id), change in changes.items():
+        last = change['last']
+        values = {
+            'last_message_at': last.timestamp,
+            'last_message_preview': last.message[:PREVIEW_CHARS],
+        }
+        conversation = Conversation.objects.filter(student_id=student_id, interviewer_id=interviewer_id)
+        if conversation.update(**values):
+            continue
+        try:
+            with transaction.atomic():
+                Conversation.objects.create(
+                    student_id=student_id, interviewer_id=interviewer_id,
+                    last_message_at=last.timestamp, last_message_preview=last.message[:PREVIEW_CHARS],
+                )
+        except IntegrityError:
+            # The other side's first message created it meanwhile
+            conversation.update(**values)
+
+
+def mark_read(user, other_user):
+    """Mark everything `other_user` sent to `user` as read (one bulk UPDATE). Returns the number marked."""
+    marked = ChatMessage.objects.filter(sender=other_user, receiver=user, is_read=False).update(is_read=True)
+    if marked:
+        dashboard.invalidate_chat(user.id)
+    return marked
+
+
+def unread_counts(user):
+    """{sender id: unread messages} for `user`, from one grouped query on chatmsg_unread_idx."""
+    rows = (
+        ChatMessage.objects.filter(receiver=user, is_read=False)
+        .values('sender')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    return {row['sender']: row['count'] for row in rows}
@@ -0,0 +1,134 @@
+"""
+WebSocket chat (served by genai_project/asgi.py, route in routing.py).
+
+A client sends {"message": "..."}; the message is buffered by
+MessageWriter, saved with one bulk_create per batch (chat.save_messages,
+which also updates the conversations), and then pushed to
+both participants through the channel layer (CHANNEL_LAYERS) as one
+chat.serialize() frame; a message delivered to the receiver's open
+socket is marked read. Batches are flushed every CHAT_WRITE_FLUSH_INTERVAL
+seconds or as soon as CHAT_WRITE_BATCH_SIZE messages are waiting. If a
+batch can't be saved, each sender's socket gets an error frame with its
+text back, so nothing is lost silently.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+
+from .chat import can_chat, group_name, mark_read, save_messages, serialize
+from .models import ChatMessage, User
+
+logger = logging.getLogger(__name__)
+
+
+NOT_SAVED = "Your message could not be sent. Please try again."
+
+
+class MessageWriter:
+    """Per-process buffer of new chat messages."""
+
+    def __init__(self):
+        self.pending = []  # (message, channel name of the sender's socket)
+        self.timer = None
+        self.tasks = set()
+        self.lock = asyncio.Lock()
+
+    async def add(self, message, reply_channel):
+        self.pending.append((message, reply_channel))
+        if len(self.pending) >= getattr(settings, 'CHAT_WRITE_BATCH_SIZE', 50):
+            await self.flush()
+        elif self.timer is None:
+            interval = getattr(settings, 'CHAT_WRITE_FLUSH_INTERVAL', 0.05)
+            self.timer = asyncio.get_running_loop().call_later(interval, self._flush_later)
+
+    def _flush_later(self):
+        self.timer = None
+        task = asyncio.ensure_future(self.flush())
+        # Keep a reference until it's done, or the task can be garbage collected mid-flush
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        async with self.lock:
+            batch, self.pending = self.pending, []
+            if not batch:
+                return
+            try:
+                # Sets the ids (RETURNING on SQLite 3.35+ / PostgreSQL), which clients use as cursors
+                await sync_to_async(save_messages)([message for message, _ in batch])
+            except Exception:
+                logger.exception("Failed to save %d chat message(s)", len(batch))
+                saved = False
+            else:
+                saved = True
+
+        layer = get_channel_layer()
+        if not saved:
+            for message, reply_channel in batch:
+                await layer.send(reply_channel, {'type': 'chat.not_saved', 'message': message.message})
+            return
+        for message, _ in batch:
+            await layer.group_send(
+                group_name(message.sender_id, message.receiver_id),
+                {'type': 'chat.message', 'message': serialize(message)},
+            )
+
+
+writer = MessageWriter()
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    group = None
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        user_id = self.scope['url_route']['kwargs']['user_id']
+        self.other_user = await sync_to_async(User.objects.filter(id=user_id).first)()
+        if self.other_user is None or not can_chat(self.user, self.other_user):
+            await self.close()
+            return
+
+        self.group = group_name(self.user.id, self.other_user.id)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.group:
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        try:
+            await super().receive(text_data, bytes_data, **kwargs)
+        except ValueError:
+            # Not JSON; answer instead of letting the error close the socket
+            await self.send_json({'error': 'Expected {"message": "..."}.'})
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict) or not isinstance(content.get('message'), str):
+            await self.send_json({'error': 'Expected {"message": "..."}.'})
+            return
+        text = content['message'].strip()
+        if text:
+            await writer.add(ChatMessage(
+                sender=self.user, receiver=self.other_user, message=text, timestamp=timezone.now(),
+            ), self.channel_name)
+
+    async def chat_message(self, event):
+        await self.send_json(event['message'])
+        if event['message']['sender_id'] == self.other_user.id:
+            # This user has the thread open, so the message has been seen
+            await sync_to_async(mark_read)(self.user, self.other_user)
+
+    async def chat_not_saved(self, event):
+        await self.send_json({'error': NOT_SAVED, 'message': event['message']})
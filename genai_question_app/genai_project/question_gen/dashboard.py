@@ -0,0 +1,60 @@
+"""
+Cached pieces of the landing pages.
+
+  mentors               the student landing's mentor strip, shared by everyone
+  pending:<mentor id>   a mentor's pending interview requests
+  chats:<user id>       a mentor's active chats (with unread counts)
+  unread:<user id>      a student's unread counts per mentor
+
+Entries live in the DASHBOARD_CACHE cache alias for DASHBOARD_CACHE_TTL
+seconds and are deleted as soon as their data changes: signals.py handles
+saves / deletes, and chat.py calls invalidate_chat() after its bulk writes
+(bulk_create / update() don't send signals).
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+metrics.register('dashboard.hits', 'dashboard.misses', 'dashboard.invalidations')
+
+MENTORS = 'mentors'
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE', 'default')]
+
+
+def _key(fragment, user_id=None):
+    return f'dashboard:{fragment}' if user_id is None else f'dashboard:{fragment}:{user_id}'
+
+
+def fragment(name, user_id, compute):
+    """Cached value of `compute()` for this fragment (and user), computing it on a miss."""
+    key = _key(name, user_id)
+    value = _cache().get(key)
+    if value is not None:
+        metrics.incr('dashboard.hits')
+        return value
+    metrics.incr('dashboard.misses')
+    value = compute()
+    _cache().set(key, value, getattr(settings, 'DASHBOARD_CACHE_TTL', 300))
+    return value
+
+
+def invalidate(name, *user_ids):
+    keys = [_key(name, user_id) for user_id in user_ids] if user_ids else [_key(name)]
+    _cache().delete_many(keys)
+    metrics.incr('dashboard.invalidations', len(keys))
+
+
+def invalidate_chat(*user_ids):
+    """Chat lists and unread counts of these users."""
+    _cache().delete_many([_key(name, user_id) for user_id in user_ids for name in ('chats', 'unread')])
+    metrics.incr('dashboard.invalidations', 2 * len(user_ids))
+
+
+def stats():
+    counts = metrics.snapshot('dashboard.')
+    counts['dashboard.hit_ratio'] = metrics.ratio(counts['dashboard.hits'], counts['dashboard.misses'])
+    return counts
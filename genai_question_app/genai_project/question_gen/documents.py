@@ -0,0 +1,140 @@
+"""
+Text extraction from uploaded PDFs.
+
+Only the first few thousand characters ever reach a prompt, so pages are
+parsed one at a time and extraction stops as soon as the character budget
+is met, or at a hard page / time cap, whichever comes first.
+
+Summaries are stored per (SHA-256 of the file, topic) in DocumentSummary,
+so a repeat upload of the same PDF needs neither parsing nor an LLM call.
+"""
+import hashlib
+import logging
+import random
+import time
+from collections import namedtuple
+
+import PyPDF2
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from . import llm
+from .models import DocumentSummary
+
+logger = logging.getLogger(__name__)
+
+# stopped: 'budget', 'page_cap', 'time_limit' or 'end' (whole document read)
+Extraction = namedtuple('Extraction', 'text pages_parsed total_pages stopped')
+
+
+def extract_text(file_obj, char_budget=None, max_pages=None, time_limit=None):
+    """
+    Extract up to `char_budget` characters from the PDF in `file_obj`.
+
+    Defaults come from DOCUMENT_CHAR_BUDGET, DOCUMENT_MAX_PAGES and
+    DOCUMENT_EXTRACT_TIME_LIMIT (seconds). PyPDF2 errors propagate.
+    """
+    if char_budget is None:
+        char_budget = getattr(settings, 'DOCUMENT_CHAR_BUDGET', 3000)
+    if max_pages is None:
+        max_pages = getattr(settings, 'DOCUMENT_MAX_PAGES', 50)
+    if time_limit is None:
+        time_limit = getattr(settings, 'DOCUMENT_EXTRACT_TIME_LIMIT', 5)
+
+    start = time.monotonic()
+    reader = PyPDF2.PdfReader(file_obj)
+    total_pages = len(reader.pages)
+
+    parts, size, parsed, stopped = [], 0, 0, 'end'
+    # reader.pages is lazy: a page is only parsed when it's accessed
+    for index in range(total_pages):
+        if parsed >= max_pages:
+            stopped = 'page_cap'
+            break
+        if time.monotonic() - start >= time_limit:
+            stopped = 'time_limit'
+            break
+        page_text = reader.pages[index].extract_text() or ''
+        parsed += 1
+        parts.append(page_text)
+        size += len(page_text) + 1
+        if size >= char_budget:
+            stopped = 'budget'
+            break
+
+    text = '\n'.join(parts)[:char_budget]
+    logger.info(
+        "Extracted %d chars from %d/%d PDF page(s) in %.2fs (stopped: %s)",
+        len(text), parsed, total_pages, time.monotonic() - start, stopped,
+    )
+    return Extraction(text, parsed, total_pages, stopped)
+
+
+def iter_pages(file_obj, max_pages, time_limit):
+    """Yield the text of each page, parsing lazily, up to `max_pages` pages or `time_limit` seconds."""
+    start = time.monotonic()
+    reader = PyPDF2.PdfReader(file_obj)
+    for index in range(min(len(reader.pages), max_pages)):
+        if time.monotonic() - start >= time_limit:
+            logger.info("Stopped reading PDF after %d page(s): time limit", index)
+            return
+        yield reader.pages[index].extract_text() or ''
+
+
+def summarize_document(file_obj, topic, digest, size_bytes=0):
+    """Extract, summarize and store one PDF. Returns (summary, extraction)."""
+    extraction = extract_text(file_obj)
+    sum_prompt = f"Summarize key points briefly (focus on {topic}): {extraction.text}"
+    summary = llm.generate(sum_prompt, kind='summary')
+    store_summary(digest, topic, summary, size_bytes, extraction.pages_parsed)
+    return summary, extraction
+
+
+# ==================== SUMMARY STORE ====================
+def content_hash(uploaded_file):
+    """SHA-256 of an upload, read chunk by chunk. Leaves the file rewound."""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def cached_summary(digest, topic):
+    """Stored summary for this file + topic, or None."""
+    entries = DocumentSummary.objects.filter(content_hash=digest, topic=topic)
+    summary = entries.values_list('summary', flat=True).first()
+    if summary is not None:
+        entries.update(hits=F('hits') + 1, last_used_at=timezone.now())
+    return summary
+
+
+def store_summary(digest, topic, summary, size_bytes=0, pages_parsed=0):
+    DocumentSummary.objects.update_or_create(
+        content_hash=digest,
+        topic=topic,
+        defaults={
+            'summary': summary,
+            'size_bytes': size_bytes,
+            'pages_parsed': pages_parsed,
+            'last_used_at': timezone.now(),
+        },
+    )
+    # Pruning needs a COUNT, so only do it on a fraction of writes
+    if random.random() < getattr(settings, 'DOCUMENT_SUMMARY_PRUNE_PROBABILITY', 0.1):
+        prune_summaries()
+
+
+def prune_summaries():
+    """Keep at most DOCUMENT_SUMMARY_MAX_ENTRIES summaries, dropping the least recently used."""
+    max_entries = getattr(settings, 'DOCUMENT_SUMMARY_MAX_ENTRIES', 2000)
+    excess = DocumentSummary.objects.count() - max_entries
+    if excess <= 0:
+        return 0
+    stale_ids = list(
+        DocumentSummary.objects.order_by('last_used_at').values_list('id', flat=True)[:excess + max_entries // 10]
+    )
+    deleted, _ = DocumentSummary.objects.filter(id__in=stale_ids).delete()
+    logger.info("Pruned %d document summaries", deleted)
+    return deleted
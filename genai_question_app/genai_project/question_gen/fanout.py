@@ -0,0 +1,73 @@
+"""
+Concurrent execution of independent LLM prompts.
+
+Prompts that don't depend on each other (e.g. the judge and concept prompts
+of a quiz turn) are submitted together to a bounded thread pool, so a step
+takes as long as its longest dependency chain instead of the sum of calls.
+
+Tasks reach the database through the LLM and judge caches, so every task
+runs between close_old_connections() calls, like a request does.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'LLM_FANOUT_WORKERS', 8),
+    thread_name_prefix='llm-fanout',
+)
+
+
+class FanoutTimeout(TimeoutError):
+    """A fanned-out call did not finish before its deadline."""
+
+
+def _task(fn):
+    """Run `fn` on a pool thread without reusing a stale or broken DB connection."""
+    close_old_connections()
+    try:
+        return fn()
+    finally:
+        close_old_connections()
+
+
+def _measured(fn):
+    start = time.perf_counter()
+    result = _task(fn)
+    return result, round(time.perf_counter() - start, 3)
+
+
+def submit(fn):
+    """Start one call in the background and return its Future."""
+    return _executor.submit(_task, fn)
+
+
+def run_parallel(tasks, timeout=None):
+    """
+    Run independent callables at the same time.
+
+    `tasks` maps a label to a zero-argument callable. Each call gets `timeout`
+    seconds (default settings.LLM_CALL_TIMEOUT) from submission. Returns
+    ({label: result}, {label: seconds}); the first failure is re-raised and
+    calls that haven't started yet are cancelled.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'LLM_CALL_TIMEOUT', 30)
+
+    futures = {label: _executor.submit(_measured, fn) for label, fn in tasks.items()}
+    deadline = time.monotonic() + timeout
+    results, timings = {}, {}
+    try:
+        for label, future in futures.items():
+            remaining = max(deadline - time.monotonic(), 0)
+            try:
+                results[label], timings[label] = future.result(timeout=remaining)
+            except FutureTimeout:
+                raise FanoutTimeout(f"LLM call '{label}' timed out after {timeout}s")
+    except Exception:
+        for future in futures.values():
+            future.cancel()
+        raise
+    return results, timings
@@ -0,0 +1,195 @@
+"""
+Database-backed queue for PDF ingestion.
+
+select_topic stores the upload as a DocumentJob and returns at once. The
+worker processes started by `manage.py document_worker` claim queued jobs
+with a conditional UPDATE (so two workers never run the same job), parse,
+summarize (summarizer.py) and index the file, and retry failures with
+exponential backoff up to DOCUMENT_JOB_MAX_ATTEMPTS.
+Only the database is shared between workers, so plain SQLite is enough.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .documents import cached_summary, store_summary
+from .retrieval import index_pages, is_indexed
+from . import summarizer
+from .summarizer import extract_pages, summarize_pages
+from .models import DocumentJob
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def worker_name(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def enqueue(user, topic, uploaded_file, digest):
+    return DocumentJob.objects.create(
+        user=user,
+        topic=topic,
+        document=uploaded_file,
+        content_hash=digest,
+        size_bytes=uploaded_file.size,
+    )
+
+
+def claim(worker_id):
+    """Atomically take the oldest runnable job, or return None."""
+    for _ in range(5):
+        now = timezone.now()
+        job_id = (
+            DocumentJob.objects
+            .filter(status='queued', available_at__lte=now)
+            .order_by('available_at', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        # Another worker may have claimed it in the meantime
+        claimed = DocumentJob.objects.filter(id=job_id, status='queued').update(
+            status='running', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return DocumentJob.objects.get(id=job_id)
+    return None
+
+
+def requeue_stale():
+    """Put back jobs whose worker died mid-run (locked longer than DOCUMENT_JOB_LOCK_TIMEOUT)."""
+    cutoff = timezone.now() - timedelta(seconds=_setting('DOCUMENT_JOB_LOCK_TIMEOUT', 300))
+    requeued = DocumentJob.objects.filter(status='running', locked_at__lt=cutoff).update(
+        status='queued', locked_by='', locked_at=None, available_at=timezone.now(),
+    )
+    if requeued:
+        logger.warning("Requeued %d stale document job(s)", requeued)
+    return requeued
+
+
+def _finish(job, **fields):
+    """Record the outcome if this worker still holds the lease. Returns False if it was requeued meanwhile."""
+    return DocumentJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        locked_by='', locked_at=None, **fields,
+    ) == 1
+
+
+def _lease_lost(job):
+    logger.warning("Document job %s was requeued while %s ran it; dropping this result", job.id, job.locked_by)
+
+
+def _discard_file(job):
+    if job.document:
+        job.document.delete(save=False)
+        DocumentJob.objects.filter(id=job.id).update(document='')
+
+
+def _process(job):
+    """
+    Summarize (map-reduce) and index the job's PDF, skipping whatever an
+    identical upload already produced. Returns (summary, pages_parsed, timings).
+    """
+    summary = cached_summary(job.content_hash, job.topic)
+    needs_index = not is_indexed(job.content_hash)
+    if summary is not None and not needs_index:
+        return summary, 0, {}
+
+    start = time.perf_counter()
+    with job.document.open('rb') as f:
+        data = f.read()
+    # One parse (across processes) feeds both the summary and the index
+    pages = extract_pages(data)
+    timings = {'pages': len(pages), 'extract': round(time.perf_counter() - start, 3)}
+
+    if summary is None:
+        summary, summary_timings = summarize_pages(pages, job.topic)
+        timings.update(summary_timings)
+        store_summary(job.content_hash, job.topic, summary, job.size_bytes, len(pages))
+    if needs_index:
+        index_start = time.perf_counter()
+        index_pages(job.content_hash, pages, title=job.document.name)
+        timings['index'] = round(time.perf_counter() - index_start, 3)
+    timings['total'] = round(time.perf_counter() - start, 3)
+    return summary, len(pages), timings
+
+
+def run(job):
+    """
+    Parse, summarize and index one claimed job. Returns True on success.
+    A worker whose lease went stale changes nothing: the job (and its
+    upload) belongs to whoever claimed it next.
+    """
+    try:
+        summary, pages_parsed, timings = _process(job)
+    except Exception as e:
+        if job.attempts < _setting('DOCUMENT_JOB_MAX_ATTEMPTS', 3):
+            delay = _setting('DOCUMENT_JOB_RETRY_DELAY', 10) * 2 ** (job.attempts - 1)
+            if _finish(job, status='queued', error=str(e), available_at=timezone.now() + timedelta(seconds=delay)):
+                logger.warning(
+                    "Document job %s failed (attempt %d), retrying in %ss: %s", job.id, job.attempts, delay, e,
+                )
+            else:
+                _lease_lost(job)
+        elif _finish(job, status='failed', error=str(e), finished_at=timezone.now()):
+            logger.error("Document job %s failed after %d attempt(s): %s", job.id, job.attempts, e)
+            _discard_file(job)
+        else:
+            _lease_lost(job)
+        return False
+
+    finished = _finish(
+        job, status='done', summary=summary, pages_parsed=pages_parsed, timings=timings,
+        error='', finished_at=timezone.now(),
+    )
+    if not finished:
+        _lease_lost(job)
+        return False
+    _discard_file(job)
+    logger.info("Document job %s done in %d attempt(s), timings=%s", job.id, job.attempts, timings)
+    return True
+
+
+def work(worker_id, poll=1.0, once=False):
+    """Worker loop: claim and run jobs until stopped (or until the queue is empty with once=True)."""
+    try:
+        _work_loop(worker_id, poll, once)
+    finally:
+        summarizer.shutdown()
+
+
+def _work_loop(worker_id, poll, once):
+    last_sweep = 0
+    while True:
+        idle = False
+        try:
+            if time.monotonic() - last_sweep > 60:
+                requeue_stale()
+                last_sweep = time.monotonic()
+            job = claim(worker_id)
+            if job is None:
+                idle = True
+            else:
+                run(job)
+        except OperationalError as e:
+            # e.g. "database is locked" while another SQLite writer holds the lock
+            logger.warning("Document worker %s: %s", worker_id, e)
+            time.sleep(poll)
+        finally:
+            close_old_connections()
+
+        if idle:
+            if once:
+                return
+            time.sleep(poll)
@@ -0,0 +1,271 @@
+"""
+Semantic cache for the answer judge.
+
+Students answering the same question tend to write nearly the same thing, so
+each judged (question, answer, verdict) triple is stored with a cheap local
+vector of the answer: hashed character 3-5-grams, log-scaled and L2
+normalized, kept sparse in NumPy. A new answer whose cosine similarity to an earlier
+answer for the same question is at least JUDGE_CACHE_THRESHOLD reuses that
+verdict instead of calling the LLM.
+
+A fraction of hits (JUDGE_CACHE_AUDIT_RATE) is re-judged by the LLM in the
+background to measure how often the reused verdict would have been wrong;
+`manage.py judge_cache_report` summarizes hit rate and accuracy.
+"""
+import hashlib
+import logging
+import random
+import re
+import threading
+import zlib
+from collections import namedtuple
+
+import numpy as np
+from cachetools import LRUCache
+from django.conf import settings
+from django.db.models import F
+
+from . import metrics
+from .fanout import submit
+from .models import JudgedAnswer
+
+logger = logging.getLogger(__name__)
+
+metrics.register('judge_cache.hits', 'judge_cache.misses', 'judge_cache.audits', 'judge_cache.audit_mismatches')
+
+DIMENSIONS = 2 ** 12  # hash buckets; bucket numbers fit in uint16
+NGRAM_SIZES = (3, 4, 5)
+
+Hit = namedtuple('Hit', 'entry_id verdict similarity')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def normalize(text):
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def question_hash(question):
+    return hashlib.sha256(normalize(question).encode('utf-8')).hexdigest()
+
+
+def vectorize(text):
+    """
+    Hashed character n-gram vector of `text`, unit length, kept sparse:
+    (sorted bucket numbers as uint16, weights as float16). A short answer
+    only fills a few hundred of the DIMENSIONS buckets.
+    """
+    padded = f" {normalize(text)} "
+    hashes = [
+        zlib.crc32(padded[i:i + n].encode('utf-8')) % DIMENSIONS
+        for n in NGRAM_SIZES
+        for i in range(len(padded) - n + 1)
+    ]
+    buckets, counts = np.unique(np.array(hashes, dtype=np.uint16), return_counts=True)
+    weights = np.log1p(counts.astype(np.float32))
+    norm = np.linalg.norm(weights)
+    return buckets, (weights / norm if norm else weights).astype(np.float16)
+
+
+def encode(vec):
+    """Bytes stored in JudgedAnswer.vector: the bucket numbers, then the weights."""
+    buckets, weights = vec
+    return buckets.tobytes() + weights.tobytes()
+
+
+def decode(blob):
+    blob = bytes(blob)
+    n = len(blob) // 4
+    return np.frombuffer(blob, dtype=np.uint16, count=n), np.frombuffer(blob, dtype=np.float16, offset=2 * n)
+
+
+def densify(vec):
+    buckets, weights = vec
+    dense = np.zeros(DIMENSIONS, dtype=np.float32)
+    dense[buckets] = weights
+    return dense
+
+
+class _QuestionIndex:
+    """
+    Sparse vectors and verdicts of the newest `limit` answers to one question.
+
+    Answers live in a fixed ring of `limit` slots, so adding one never copies
+    the others. Lookups score every slot at once against flat arrays that are
+    rebuilt on the first lookup after a change; the slots are then re-pointed
+    at views into them, so the vectors are only held once.
+    """
+
+    def __init__(self, rows, limit):
+        self.limit = limit
+        self.slots = [None] * limit  # (entry_id, verdict, buckets, weights)
+        self.next = 0
+        self.entry_ids = set()
+        self._flat = None
+        for entry_id, verdict, blob in rows:
+            self.add(entry_id, verdict, decode(blob))
+
+    def __len__(self):
+        return len(self.entry_ids)
+
+    def __contains__(self, entry_id):
+        return entry_id in self.entry_ids
+
+    def _build_flat(self):
+        filled = [i for i, slot in enumerate(self.slots) if slot is not None]
+        buckets = np.concatenate([self.slots[i][2] for i in filled])
+        weights = np.concatenate([self.slots[i][3] for i in filled])
+        starts, offset = [], 0
+        for i in filled:
+            entry_id, verdict, slot_buckets, _ = self.slots[i]
+            end = offset + len(slot_buckets)
+            self.slots[i] = (entry_id, verdict, buckets[offset:end], weights[offset:end])
+            starts.append(offset)
+            offset = end
+        self._flat = ([self.slots[i][:2] for i in filled], buckets, weights, np.array(starts))
+        return self._flat
+
+    def nearest(self, vec):
+        """(entry_id, verdict, cosine similarity) of the closest stored answer, or None."""
+        if not self.entry_ids or not len(vec[0]):
+            return None
+        entries, buckets, weights, starts = self._flat or self._build_flat()
+        sims = np.add.reduceat(densify(vec)[buckets] * weights, starts)
+        best = int(np.argmax(sims))
+        return entries[best][0], entries[best][1], float(sims[best])
+
+    def add(self, entry_id, verdict, vec):
+        if not len(vec[0]):
+            return
+        evicted = self.slots[self.next]
+        if evicted is not None:
+            self.entry_ids.discard(evicted[0])
+        self.slots[self.next] = (entry_id, verdict) + tuple(vec)
+        self.entry_ids.add(entry_id)
+        self.next = (self.next + 1) % self.limit
+        self._flat = None
+
+
+_indexes = None
+_lock = threading.Lock()
+
+
+def _get_index(qhash):
+    global _indexes
+    with _lock:
+        if _indexes is None:
+            _indexes = LRUCache(maxsize=_setting('JUDGE_CACHE_QUESTIONS', 500))
+        index = _indexes.get(qhash)
+    if index is None:
+        limit = _setting('JUDGE_CACHE_ANSWERS_PER_QUESTION', 200)
+        rows = list(
+            JudgedAnswer.objects.filter(question_hash=qhash)
+            .order_by('-id')
+            .values_list('id', 'verdict', 'vector')[:limit]
+        )
+        index = _QuestionIndex(rows[::-1], limit)
+        with _lock:
+            _indexes[qhash] = index
+    return index
+
+
+def reset():
+    global _indexes
+    with _lock:
+        _indexes = None
+
+
+def enabled():
+    return _setting('JUDGE_CACHE_ENABLED', True)
+
+
+def lookup(question, answer):
+    """Return a Hit when a close-enough answer to `question` was judged before, else None."""
+    if not enabled():
+        return None
+    index = _get_index(question_hash(question))
+    vec = vectorize(answer)
+    with _lock:
+        nearest = index.nearest(vec)
+    hit = Hit(*nearest) if nearest is not None else None
+
+    if hit is None or hit.similarity < _setting('JUDGE_CACHE_THRESHOLD', 0.9):
+        metrics.incr('judge_cache.misses')
+        return None
+
+    JudgedAnswer.objects.filter(id=hit.entry_id).update(hits=F('hits') + 1)
+    metrics.incr('judge_cache.hits')
+    return hit
+
+
+def store(question, answer, verdict):
+    """
+    Remember `verdict` for `answer`. Only the newest JUDGE_CACHE_ANSWERS_PER_QUESTION
+    rows per question are kept, the same ones the in-memory index holds.
+    """
+    vec = vectorize(answer)
+    if not enabled() or not verdict or not len(vec[0]):
+        return
+    qhash = question_hash(question)
+    entry = JudgedAnswer.objects.create(
+        question_hash=qhash,
+        question=question,
+        answer=answer,
+        verdict=verdict,
+        vector=encode(vec),
+    )
+    index = _get_index(qhash)
+    with _lock:
+        if entry.id not in index:
+            index.add(entry.id, verdict, vec)
+        full = len(index) >= index.limit
+    if full:
+        _prune(qhash, index.limit)
+
+
+def _prune(qhash, limit):
+    """Delete the rows of a question older than its newest `limit`."""
+    newest = JudgedAnswer.objects.filter(question_hash=qhash).order_by('-id').values_list('id', flat=True)
+    cutoff = next(iter(newest[limit:limit + 1]), None)
+    if cutoff is not None:
+        JudgedAnswer.objects.filter(question_hash=qhash, id__lte=cutoff).delete()
+
+
+def same_verdict(a, b):
+    return a.strip().lower().startswith('correct') == b.strip().lower().startswith('correct')
+
+
+def maybe_audit(hit, judge_fn):
+    """
+    With probability JUDGE_CACHE_AUDIT_RATE, run the real judge (`judge_fn`)
+    in the background and record whether it agrees with the cached verdict.
+    """
+    if random.random() >= _setting('JUDGE_CACHE_AUDIT_RATE', 0.1):
+        return
+
+    def _audit():
+        try:
+            mismatch = not same_verdict(judge_fn(), hit.verdict)
+            JudgedAnswer.objects.filter(id=hit.entry_id).update(
+                audits=F('audits') + 1,
+                audit_mismatches=F('audit_mismatches') + int(mismatch),
+            )
+            metrics.incr('judge_cache.audits')
+            if mismatch:
+                metrics.incr('judge_cache.audit_mismatches')
+        except Exception:
+            logger.exception("Judge cache audit failed")
+
+    submit(_audit)
+
+
+def stats():
+    counts = metrics.snapshot('judge_cache.')
+    counts['judge_cache.hit_ratio'] = metrics.ratio(counts['judge_cache.hits'], counts['judge_cache.misses'])
+    audits = counts['judge_cache.audits']
+    counts['judge_cache.audited_accuracy'] = (
+        round(1 - counts['judge_cache.audit_mismatches'] / audits, 3) if audits else None
+    )
+    return counts
@@ -0,0 +1,85 @@
+"""
+Quiz leaderboard, kept as pre-aggregated LeaderboardEntry rows.
+
+Each finished quiz adds its score to the user's rows for
+(its topic and ALL_TOPICS) x (all time, its month, its week), so a board
+is a single index range read (leaderboard_board_idx) however many quizzes
+have been taken. `manage.py rebuild_leaderboard` recomputes everything
+from QuizAttempt if the rows ever need repairing.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LeaderboardEntry
+
+ALL_TOPICS = '*'
+ALL_TIME = 'all'
+WINDOWS = ('all', 'month', 'week')
+
+
+def topic_key(topic):
+    return ' '.join((topic or '').lower().split())[:100] or 'custom'
+
+
+def period_key(window, when=None):
+    """'all', '2026-10' (month) or '2026-W42' (ISO week) for the local date of `when`."""
+    if window == 'all':
+        return ALL_TIME
+    day = timezone.localdate(when)
+    if window == 'month':
+        return f"{day:%Y-%m}"
+    if window == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    raise ValueError(f"Unknown leaderboard window {window!r}")
+
+
+def record(user_id, topic, correct, questions, finished_at):
+    """Add one finished quiz to the user's six board rows."""
+    topics = [topic_key(topic), ALL_TOPICS]
+    periods = [period_key(window, finished_at) for window in WINDOWS]
+    increments = {
+        'points': F('points') + correct,
+        'questions': F('questions') + questions,
+        'quizzes': F('quizzes') + 1,
+        'last_quiz_at': finished_at,
+    }
+    with transaction.atomic():
+        rows = LeaderboardEntry.objects.filter(user_id=user_id, topic__in=topics, period__in=periods)
+        # One UPDATE for every row that already exists; new rows only on a user's first quiz of a period
+        if rows.update(**increments) == len(topics) * len(periods):
+            return
+        existing = set(rows.values_list('topic', 'period'))
+        missing = [
+            LeaderboardEntry(
+                user_id=user_id, topic=board_topic, period=period, points=correct,
+                questions=questions, quizzes=1, last_quiz_at=finished_at,
+            )
+            for board_topic in topics for period in periods if (board_topic, period) not in existing
+        ]
+        try:
+            with transaction.atomic():
+                LeaderboardEntry.objects.bulk_create(missing)
+        except IntegrityError:
+            # Another quiz of this user created some of them meanwhile; go row by row
+            for entry in missing:
+                try:
+                    with transaction.atomic():
+                        entry.save(force_insert=True)
+                except IntegrityError:
+                    LeaderboardEntry.objects.filter(
+                        user_id=user_id, topic=entry.topic, period=entry.period,
+                    ).update(**increments)
+
+
+def top(topic=None, window='all', limit=None):
+    """Best entries of a board: most points, earliest to reach them first."""
+    limit = limit or getattr(settings, 'LEADERBOARD_SIZE', 20)
+    return list(
+        LeaderboardEntry.objects.filter(
+            topic=topic_key(topic) if topic else ALL_TOPICS,
+            period=period_key(window),
+        ).select_related('user').order_by('-points', 'last_quiz_at')[:limit]
+    )
@@ -0,0 +1,514 @@
+"""
+LLM gateway: the only place that talks to Gemini.
+
+Every call goes through generate(), which adds on top of the backend:
+  * a per-call deadline (LLM_CALL_TIMEOUT), passed down to the API request
+  * retries with jittered exponential backoff for transient errors
+  * a global request/token rate limit per minute (shared via the cache)
+  * a cap on concurrent in-flight calls
+  * a circuit breaker that fails fast (or returns a caller-supplied
+    fallback) after repeated failures instead of tying up workers
+
+The backend is chosen with LLM_BACKEND ('gemini', 'fake' or a dotted path),
+so everything can run offline against FakeBackend.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from . import llm_cache, metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.register(
+    'llm.calls', 'llm.streams', 'llm.failures', 'llm.retries', 'llm.timeouts',
+    'llm.rate_limited', 'llm.short_circuited', 'llm.fallbacks',
+)
+
+BACKENDS = {
+    'gemini': 'question_gen.llm.GeminiBackend',
+    'fake': 'question_gen.llm.FakeBackend',
+}
+
+
+class LLMError(Exception):
+    """An LLM call failed."""
+
+
+class LLMTimeout(LLMError, TimeoutError):
+    """The call (including retries and queueing) ran past its deadline."""
+
+
+class LLMUnavailable(LLMError):
+    """The circuit breaker is open or the rate limit can't be met in time."""
+
+
+# What users are shown when a call fails with LLMUnavailable
+AI_BUSY_MESSAGE = "Our AI tutor is busy right now. Please try again in a moment."
+
+
+class TransientLLMError(LLMError):
+    """Retryable backend failure (used by FakeBackend)."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ==================== BACKENDS ====================
+class GeminiBackend:
+    """google-generativeai with one reusable GenerativeModel per model name."""
+
+    def __init__(self):
+        import google.generativeai as genai
+        from google.api_core import exceptions as api_exceptions
+
+        self.genai = genai
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self._models = {}
+        self._lock = threading.Lock()
+        self.transient_errors = (
+            api_exceptions.ServiceUnavailable,
+            api_exceptions.TooManyRequests,
+            api_exceptions.InternalServerError,
+            api_exceptions.DeadlineExceeded,
+            ConnectionError,
+            TimeoutError,
+        )
+
+    def _model(self, name):
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self.genai.GenerativeModel(name)
+            return self._models[name]
+
+    def _config(self, schema):
+        if schema is None:
+            return None
+        return self.genai.GenerationConfig(response_mime_type='application/json', response_schema=schema)
+
+    def generate(self, prompt, model, schema=None, timeout=None):
+        response = self._model(model).generate_content(
+            prompt,
+            generation_config=self._config(schema),
+            request_options={'timeout': timeout} if timeout else None,
+        )
+        return response.text.strip()
+
+    def stream(self, prompt, model, timeout=None):
+        response = self._model(model).generate_content(
+            prompt,
+            stream=True,
+            request_options={'timeout': timeout} if timeout else None,
+        )
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunk without text parts (e.g. safety metadata only)
+                continue
+            if text:
+                yield text
+
+
+class FakeBackend:
+    """
+    Deterministic local stand-in for Gemini.
+
+    Plain prompts get short canned answers in the same shape the real
+    prompts ask for; schema prompts get a JSON value that satisfies the schema.
+    The same prompt always produces the same response.
+
+    For benchmarks it can imitate a real API: LLM_FAKE_LATENCY (+ up to
+    LLM_FAKE_LATENCY_JITTER) seconds per call and LLM_FAKE_FAILURE_RATE
+    transient failures, drawn from a generator seeded with LLM_FAKE_SEED.
+    """
+    transient_errors = (TransientLLMError,)
+
+    CONCEPTS = [
+        'closures', 'promises', 'garbage collection', 'generics', 'hooks', 'event loop',
+        'polymorphism', 'immutability', 'virtual DOM', 'threads', 'streams', 'interfaces',
+    ]
+
+    def __init__(self):
+        self.latency = _setting('LLM_FAKE_LATENCY', 0)
+        self.jitter = _setting('LLM_FAKE_LATENCY_JITTER', 0)
+        self.failure_rate = _setting('LLM_FAKE_FAILURE_RATE', 0)
+        self._random = random.Random(_setting('LLM_FAKE_SEED', 0))
+        self._lock = threading.Lock()
+
+    def _delay(self, timeout):
+        """Seconds this call takes; raises like a real API on injected failures and timeouts."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.failure_rate
+        if failed:
+            time.sleep(delay / 2)
+            raise TransientLLMError("Injected fake backend failure")
+        if timeout is not None and delay > timeout:
+            time.sleep(max(timeout, 0))
+            raise LLMTimeout(f"Fake backend call took longer than {timeout:.2f}s")
+        return delay
+
+    def _digest(self, seed):
+        return hashlib.sha256(seed.encode('utf-8')).hexdigest()
+
+    def _pick(self, seed, options):
+        return options[int(self._digest(seed), 16) % len(options)]
+
+    def _value(self, schema, seed, size=3):
+        kind = str(schema.get('type', 'string')).lower()
+        if kind == 'object':
+            return {name: self._value(sub, f'{seed}.{name}', size) for name, sub in schema.get('properties', {}).items()}
+        if kind == 'array':
+            return [self._value(schema.get('items', {}), f'{seed}[{i}]', size) for i in range(size)]
+        if 'enum' in schema:
+            return self._pick(seed, schema['enum'])
+        name = seed.rsplit('.', 1)[-1].split('[')[0]
+        if name == 'question':
+            return f"What do you know about {self._pick(seed, self.CONCEPTS)}? (#{self._digest(seed)[:6]})"
+        if name == 'concept':
+            return self._pick(seed, self.CONCEPTS)
+        if name == 'compliment':
+            return 'Nice work!'
+        if name == 'reason':
+            return ''
+        return f'fake {name}'
+
+    def generate(self, prompt, model, schema=None, timeout=None):
+        time.sleep(self._delay(timeout))
+        return self._respond(prompt, schema)
+
+    def _respond(self, prompt, schema=None):
+        seed = self._digest(prompt)[:12]
+        if schema is not None:
+            # "Write 30 ..." prompts get 30 array items
+            size = re.search(r'\bWrite (\d+)', prompt)
+            return json.dumps(self._value(schema, seed, int(size.group(1)) if size else 3))
+        if "Reply only 'Correct!'" in prompt:
+            return self._pick(seed, ['Correct!', 'Incorrect: missing key details'])
+        if 'Reply only the concept' in prompt:
+            return self._pick(seed, self.CONCEPTS)
+        if prompt.startswith('Summarize'):
+            return 'Key points: ' + prompt[30:200]
+        return f"Nice work! What do you know about {self._pick(seed, self.CONCEPTS)}?"
+
+    def stream(self, prompt, model, timeout=None):
+        delay = self._delay(timeout)
+        words = self._respond(prompt).split(' ')
+        for i, word in enumerate(words):
+            # Latency spread over the chunks, as tokens arriving
+            time.sleep(delay / len(words))
+            yield word if i == len(words) - 1 else word + ' '
+
+
+# ==================== CIRCUIT BREAKER ====================
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failed calls; open -> half-open
+    after `cooldown` seconds, where one trial call decides whether to close again.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def cancel_trial(self):
+        """The half-open trial never reached the backend; let another call try."""
+        with self._lock:
+            self.trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                logger.warning("LLM circuit breaker open after %d failure(s)", self.failures)
+
+
+# ==================== GATEWAY ====================
+_backend = None
+_breaker = None
+_slots = None
+_state_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _state_lock:
+        if _backend is None:
+            path = _setting('LLM_BACKEND', 'gemini')
+            _backend = import_string(BACKENDS.get(path, path))()
+        return _backend
+
+
+def get_breaker():
+    global _breaker
+    with _state_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                threshold=_setting('LLM_BREAKER_THRESHOLD', 5),
+                cooldown=_setting('LLM_BREAKER_COOLDOWN', 30),
+            )
+        return _breaker
+
+
+def _get_slots():
+    global _slots
+    with _state_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(_setting('LLM_MAX_CONCURRENCY', 16))
+        return _slots
+
+
+def reset():
+    """Drop backend, breaker, concurrency and in-process cache state (after settings change)."""
+    global _backend, _breaker, _slots
+    with _state_lock:
+        _backend = _breaker = _slots = None
+    llm_cache.reset()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting.startswith('LLM_') or setting == 'GEMINI_MODEL':
+        reset()
+
+
+def estimate_tokens(prompt):
+    # ~4 characters per token, plus room for the response
+    return len(prompt) // 4 + _setting('LLM_RESPONSE_TOKEN_ESTIMATE', 256)
+
+
+def _window_add(name, window, amount):
+    key = f'llm-rate:{name}:{window}'
+    cache.add(key, 0, timeout=120)
+    try:
+        return cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, timeout=120)
+        return amount
+
+
+def _acquire_rate(tokens, deadline):
+    """Reserve one request and `tokens` tokens in the current minute, waiting for the next one if needed."""
+    rpm = _setting('LLM_REQUESTS_PER_MINUTE', 0)
+    tpm = _setting('LLM_TOKENS_PER_MINUTE', 0)
+    if not rpm and not tpm:
+        return
+
+    while True:
+        now = time.time()
+        window = int(now // 60)
+        requests_used = _window_add('requests', window, 1)
+        tokens_used = _window_add('tokens', window, tokens)
+        if (not rpm or requests_used <= rpm) and (not tpm or tokens_used <= tpm):
+            return
+
+        # Over budget: give the reservation back and wait for the next window
+        _window_add('requests', window, -1)
+        _window_add('tokens', window, -tokens)
+        wait = (window + 1) * 60 - now
+        if time.monotonic() + wait >= deadline:
+            metrics.incr('llm.rate_limited')
+            raise LLMUnavailable("LLM rate limit reached")
+        time.sleep(wait)
+
+
+def _backoff(attempt):
+    # Full jitter: uniform(0, min(cap, base * 2^attempt))
+    base = _setting('LLM_RETRY_BACKOFF', 0.5)
+    cap = _setting('LLM_RETRY_BACKOFF_MAX', 8)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _call_with_retries(backend, prompt, model, schema, deadline):
+    max_retries = _setting('LLM_MAX_RETRIES', 2)
+    tokens = estimate_tokens(prompt)
+    slots = _get_slots()
+    attempt = 0
+
+    while True:
+        _acquire_rate(tokens, deadline)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not slots.acquire(timeout=remaining):
+            raise LLMTimeout("LLM call deadline exceeded")
+        try:
+            metrics.incr('llm.calls')
+            return backend.generate(prompt, model=model, schema=schema, timeout=deadline - time.monotonic())
+        except backend.transient_errors as e:
+            if attempt >= max_retries:
+                raise LLMError(f"LLM call failed after {attempt + 1} attempt(s): {e}") from e
+            delay = _backoff(attempt)
+            if time.monotonic() + delay >= deadline:
+                raise LLMTimeout(f"LLM call deadline exceeded: {e}") from e
+            logger.info("Transient LLM error (%s), retry %d in %.2fs", e, attempt + 1, delay)
+        finally:
+            slots.release()
+
+        metrics.incr('llm.retries')
+        attempt += 1
+        time.sleep(delay)
+
+
+def generate(prompt, *, kind='default', schema=None, model=None, timeout=None, fallback=None, use_cache=True):
+    """
+    Run one prompt and return the response text.
+
+    `kind` labels the call site (judge, summary, ...). `schema` requests a
+    JSON response that follows it. use_cache=False skips the response cache
+    both ways, for calls that must reach the model. When the call can't be
+    made (breaker open, rate limit, deadline, failure) `fallback` is
+    returned if given, otherwise an LLMError is raised.
+    """
+    backend = get_backend()
+    breaker = get_breaker()
+    model = model or settings.GEMINI_MODEL
+    deadline = time.monotonic() + (timeout or _setting('LLM_CALL_TIMEOUT', 30))
+
+    cache_key = None
+    if use_cache and llm_cache.enabled(kind):
+        cache_key = llm_cache.make_key(prompt, model, schema)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        if not breaker.allow():
+            metrics.incr('llm.short_circuited')
+            raise LLMUnavailable("LLM service temporarily unavailable")
+        try:
+            start = time.perf_counter()
+            text = _call_with_retries(backend, prompt, model, schema, deadline)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+        except LLMUnavailable:
+            breaker.cancel_trial()
+            raise
+        except Exception as e:
+            breaker.record_failure()
+            metrics.incr('llm.failures')
+            if isinstance(e, LLMTimeout):
+                metrics.incr('llm.timeouts')
+            if isinstance(e, LLMError):
+                raise
+            raise LLMError(str(e)) from e
+        breaker.record_success()
+        if cache_key is not None:
+            llm_cache.put(cache_key, kind, model, text, latency_ms)
+        return text
+    except LLMError as e:
+        if fallback is None:
+            raise
+        metrics.incr('llm.fallbacks')
+        logger.warning("LLM %s call degraded to fallback: %s", kind, e)
+        return fallback
+
+
+def stream(prompt, *, kind='default', model=None, timeout=None):
+    """
+    Stream one prompt, yielding text chunks as they arrive.
+
+    Same breaker, rate limit, concurrency cap and deadline as generate().
+    Streams are not retried: part of the answer may already be on screen.
+    """
+    backend = get_backend()
+    breaker = get_breaker()
+    model = model or settings.GEMINI_MODEL
+    deadline = time.monotonic() + (timeout or _setting('LLM_CALL_TIMEOUT', 30))
+
+    cache_key = None
+    if llm_cache.enabled(kind):
+        cache_key = llm_cache.make_key(prompt, model)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    if not breaker.allow():
+        metrics.incr('llm.short_circuited')
+        raise LLMUnavailable("LLM service temporarily unavailable")
+    try:
+        _acquire_rate(estimate_tokens(prompt), deadline)
+    except LLMUnavailable:
+        breaker.cancel_trial()
+        raise
+
+    slots = _get_slots()
+    if not slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        breaker.record_failure()
+        metrics.incr('llm.timeouts')
+        raise LLMTimeout("LLM call deadline exceeded")
+    try:
+        metrics.incr('llm.calls')
+        metrics.incr('llm.streams')
+        start = time.perf_counter()
+        parts = []
+        for chunk in backend.stream(prompt, model=model, timeout=deadline - time.monotonic()):
+            if time.monotonic() > deadline:
+                raise LLMTimeout("LLM stream deadline exceeded")
+            parts.append(chunk)
+            yield chunk
+    except GeneratorExit:
+        # The consumer stopped reading (client went away): no verdict on the
+        # backend, but a half-open trial must not stay claimed forever
+        breaker.cancel_trial()
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        metrics.incr('llm.failures')
+        logger.warning("LLM %s stream failed: %s", kind, e)
+        if isinstance(e, LLMError):
+            raise
+        raise LLMError(str(e)) from e
+    else:
+        breaker.record_success()
+        if cache_key is not None:
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            llm_cache.put(cache_key, kind, model, ''.join(parts).strip(), latency_ms)
+    finally:
+        slots.release()
+
+
+def stats():
+    counts = metrics.snapshot('llm.')
+    counts['llm.breaker_state'] = get_breaker().state
+    return counts
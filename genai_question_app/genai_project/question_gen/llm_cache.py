@@ -0,0 +1,149 @@
+"""
+Prompt/response cache in front of every LLM call.
+
+Keyed on model name + response schema + whitespace-normalized prompt.
+Two tiers:
+  * an in-process LRU with TTL (cachetools.TTLCache), checked first
+  * LLMCacheEntry rows in the database, shared by every worker process
+
+Per-kind TTLs come from LLM_CACHE_TTLS; kinds listed in LLM_CACHE_EXCLUDE
+(prompts that are supposed to vary, like fresh questions) are never cached.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+from datetime import timedelta
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from . import metrics
+from .models import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+metrics.register('llm_cache.memory_hits', 'llm_cache.db_hits', 'llm_cache.misses', 'llm_cache.saved_ms')
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _get_memory():
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TTLCache(
+                maxsize=_setting('LLM_CACHE_MEMORY_SIZE', 1024),
+                ttl=_setting('LLM_CACHE_MEMORY_TTL', 600),
+            )
+        return _memory
+
+
+def reset():
+    global _memory
+    with _memory_lock:
+        _memory = None
+
+
+def enabled(kind):
+    return _setting('LLM_CACHE_ENABLED', True) and kind not in _setting('LLM_CACHE_EXCLUDE', ())
+
+
+def ttl_for(kind):
+    return _setting('LLM_CACHE_TTLS', {}).get(kind, _setting('LLM_CACHE_DEFAULT_TTL', 86400))
+
+
+def make_key(prompt, model, schema=None):
+    normalized = re.sub(r'\s+', ' ', prompt).strip()
+    schema_part = json.dumps(schema, sort_keys=True) if schema is not None else ''
+    return hashlib.sha256(f"{model}\0{schema_part}\0{normalized}".encode('utf-8')).hexdigest()
+
+
+def get(key):
+    """Return the cached response for `key` or None, counting hits and saved latency."""
+    memory = _get_memory()
+    with _memory_lock:
+        cached = memory.get(key)
+    if cached is not None:
+        text, latency_ms = cached
+        metrics.incr('llm_cache.memory_hits')
+        metrics.incr('llm_cache.saved_ms', latency_ms)
+        return text
+
+    entry = (
+        LLMCacheEntry.objects
+        .filter(key=key, expires_at__gt=timezone.now())
+        .values_list('response', 'latency_ms')
+        .first()
+    )
+    if entry is None:
+        metrics.incr('llm_cache.misses')
+        return None
+
+    text, latency_ms = entry
+    LLMCacheEntry.objects.filter(key=key).update(hits=F('hits') + 1)
+    with _memory_lock:
+        memory[key] = (text, latency_ms)
+    metrics.incr('llm_cache.db_hits')
+    metrics.incr('llm_cache.saved_ms', latency_ms)
+    return text
+
+
+def put(key, kind, model, text, latency_ms):
+    memory = _get_memory()
+    with _memory_lock:
+        memory[key] = (text, latency_ms)
+
+    LLMCacheEntry.objects.update_or_create(
+        key=key,
+        defaults={
+            'kind': kind,
+            'model': model,
+            'response': text,
+            'latency_ms': latency_ms,
+            'expires_at': timezone.now() + timedelta(seconds=ttl_for(kind)),
+        },
+    )
+    # Pruning needs a COUNT, so only do it on a fraction of writes
+    if random.random() < _setting('LLM_CACHE_PRUNE_PROBABILITY', 0.05):
+        prune()
+
+
+def prune():
+    """Delete expired rows, then the oldest ones above LLM_CACHE_DB_MAX_ENTRIES."""
+    deleted, _ = LLMCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+    max_entries = _setting('LLM_CACHE_DB_MAX_ENTRIES', 5000)
+    excess = LLMCacheEntry.objects.count() - max_entries
+    if excess > 0:
+        # Go 10% below the limit so the next writes don't immediately prune again
+        stale_ids = list(
+            LLMCacheEntry.objects.order_by('created_at').values_list('id', flat=True)[:excess + max_entries // 10]
+        )
+        deleted += LLMCacheEntry.objects.filter(id__in=stale_ids).delete()[0]
+    if deleted:
+        logger.info("Pruned %d LLM cache entries", deleted)
+    return deleted
+
+
+def stats():
+    counts = metrics.snapshot('llm_cache.')
+    hits = counts['llm_cache.memory_hits'] + counts['llm_cache.db_hits']
+    counts['llm_cache.hit_ratio'] = metrics.ratio(hits, counts['llm_cache.misses'])
+    counts['llm_cache.db_entries'] = LLMCacheEntry.objects.count()
+    # Lifetime totals from the shared tier (survive restarts)
+    totals = LLMCacheEntry.objects.aggregate(
+        total_hits=Sum('hits'),
+        total_saved_ms=Sum(F('hits') * F('latency_ms')),
+    )
+    counts['llm_cache.db_lifetime_hits'] = totals['total_hits'] or 0
+    counts['llm_cache.db_lifetime_saved_ms'] = totals['total_saved_ms'] or 0
+    return counts
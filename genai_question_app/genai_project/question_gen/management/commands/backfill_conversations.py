@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from question_gen.chat import PREVIEW_CHARS, conversation, pair
+from question_gen.models import ChatMessage, Conversation, User
+
+
+class Command(BaseCommand):
+    help = "Build Conversation rows (last message) from existing chat messages. Safe to re-run."
+
+    def handle(self, *args, **options):
+        # One row per direction; both directions of a pair are merged below
+        directions = ChatMessage.objects.values_list('sender', 'receiver').order_by().distinct()
+        pairs = {frozenset(direction) for direction in directions}
+
+        users = User.objects.in_bulk({user_id for key in pairs for user_id in key})
+        created = updated = skipped = 0
+        for key in pairs:
+            if len(key) != 2:
+                skipped += 1
+                continue
+            first, second = (users[user_id] for user_id in key)
+            if {first.user_type, second.user_type} != {'student', 'interviewer'}:
+                skipped += 1
+                continue
+            student, interviewer = pair(first, second)
+            last = conversation(student, interviewer).order_by('-timestamp', '-id').first()
+            _, was_created = Conversation.objects.update_or_create(
+                student=student,
+                interviewer=interviewer,
+                defaults={
+                    'last_message_at': last.timestamp,
+                    'last_message_preview': last.message[:PREVIEW_CHARS],
+                },
+            )
+            created += was_created
+            updated += not was_created
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Conversations: {created} created, {updated} updated, {skipped} pair(s) skipped"
+        ))
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from question_gen import benchmark, judge_cache, llm, metrics
+from question_gen.question_bank import BUILTIN_TOPICS, fill
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive quiz, chat and dashboard flows through the test client under concurrency, "
+        "against a throwaway database and the fake LLM backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=20, help="Runs of each flow.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Flows running at the same time.")
+        parser.add_argument('--latency', type=float, default=0.2, help="Fake LLM latency per call (seconds).")
+        parser.add_argument('--jitter', type=float, default=0.1, help="Extra random latency per call (seconds).")
+        parser.add_argument('--failure-rate', type=float, default=0.0, help="Share of fake LLM calls that fail.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--no-caches', action='store_true', help="Disable the LLM response and judge caches.")
+        parser.add_argument('--save-baseline', metavar='PATH', help="Write the results to a JSON file.")
+        parser.add_argument('--compare', metavar='PATH', help="Compare against a saved baseline.")
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Allowed p95 slowdown vs the baseline (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        overrides = {
+            'LLM_BACKEND': 'fake',
+            'LLM_FAKE_LATENCY': options['latency'],
+            'LLM_FAKE_LATENCY_JITTER': options['jitter'],
+            'LLM_FAKE_FAILURE_RATE': options['failure_rate'],
+            'LLM_FAKE_SEED': options['seed'],
+            'LLM_REQUESTS_PER_MINUTE': 0,
+            'LLM_TOKENS_PER_MINUTE': 0,
+            # The test client doesn't run the page's streaming JS
+            'QUIZ_STREAMING_ENABLED': False,
+        }
+        if options['no_caches']:
+            overrides.update(LLM_CACHE_ENABLED=False, JUDGE_CACHE_ENABLED=False)
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # Shared by the client threads, so a file rather than an in-memory database
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(**overrides):
+                judge_cache.reset()
+                results = self.run_flows(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            llm.reset()
+            judge_cache.reset()
+
+        results['config'] = {k: options[k] for k in (
+            'sessions', 'concurrency', 'latency', 'jitter', 'failure_rate', 'seed', 'no_caches',
+        )}
+        self.print_report(results)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save_baseline']}"))
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def run_flows(self, options):
+        sessions, concurrency = options['sessions'], options['concurrency']
+        students, mentors = benchmark.create_users(sessions, max(sessions // 5, 1))
+        for topic in BUILTIN_TOPICS:
+            fill(topic, sessions + 10)
+
+        samples, llm_usage = [], {}
+        flows = {
+            'quiz': lambda i: benchmark.quiz_flow(students[i], samples, options['seed'] + i),
+            'chat': lambda i: benchmark.chat_flow(students[i], mentors[i % len(mentors)], samples, options['seed'] + i),
+            'dashboard': lambda i: benchmark.dashboard_flow(students[i], mentors[i % len(mentors)], samples, i),
+        }
+        started = time.perf_counter()
+        for name, flow in flows.items():
+            before = metrics.snapshot()
+            answered = sum(benchmark.run_concurrently([lambda i=i: flow(i) for i in range(sessions)], concurrency))
+            after = metrics.snapshot()
+            calls = sum(after[k] - before[k] for k in ('llm.calls', 'llm.streams'))
+            llm_usage[name] = {
+                'llm_calls': calls,
+                'llm_calls_per_step': round(calls / answered, 2) if answered else None,
+                'llm_failures': after['llm.failures'] - before['llm.failures'],
+                'cache_hits': sum(
+                    after[k] - before[k] for k in ('llm_cache.memory_hits', 'llm_cache.db_hits', 'judge_cache.hits')
+                ),
+            }
+
+        return {
+            'views': benchmark.summarize(samples),
+            'llm': llm_usage,
+            'wall_seconds': round(time.perf_counter() - started, 2),
+        }
+
+    def print_report(self, results):
+        header = f"{'view':<24}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'sql avg':>9}{'sql max':>9}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for label, row in results['views'].items():
+            self.stdout.write(
+                f"{label:<24}{row['count']:>6}{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}"
+                f"{row['max']:>9.1f}{row['queries_avg']:>9.1f}{row['queries_max']:>9}{row['errors']:>8}"
+            )
+        self.stdout.write("(times in ms)\n")
+        for flow, usage in results['llm'].items():
+            per_step = f", {usage['llm_calls_per_step']} per answered step" if usage['llm_calls_per_step'] else ''
+            self.stdout.write(
+                f"{flow}: {usage['llm_calls']} LLM call(s){per_step}, "
+                f"{usage['llm_failures']} failure(s), {usage['cache_hits']} cache hit(s)"
+            )
+        self.stdout.write(f"Wall time: {results['wall_seconds']}s")
+
+    def compare(self, results, path, tolerance):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Can't read baseline {path}: {e}")
+
+        regressions = []
+        for label, row in results['views'].items():
+            base = baseline.get('views', {}).get(label)
+            if base is None:
+                continue
+            # Ignore tiny absolute differences; they are noise at these sizes
+            if row['p95'] > base['p95'] * (1 + tolerance) and row['p95'] - base['p95'] > 5:
+                regressions.append(f"{label}: p95 {base['p95']}ms -> {row['p95']}ms")
+            if row['queries_max'] > base['queries_max']:
+                regressions.append(f"{label}: SQL queries {base['queries_max']} -> {row['queries_max']}")
+        for flow, usage in results['llm'].items():
+            base = baseline.get('llm', {}).get(flow, {}).get('llm_calls_per_step')
+            if base and usage['llm_calls_per_step'] and usage['llm_calls_per_step'] > base * (1 + tolerance):
+                regressions.append(f"{flow}: LLM calls per step {base} -> {usage['llm_calls_per_step']}")
+
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(line))
+            raise CommandError(f"{len(regressions)} regression(s) against {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}"))
@@ -0,0 +1,50 @@
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _run_worker(index, poll, once):
+    # Entry point of each worker process (also works with the 'spawn' start method)
+    import django
+    django.setup()
+    from question_gen import jobs
+    jobs.work(jobs.worker_name(index), poll=poll, once=once)
+
+
+class Command(BaseCommand):
+    help = "Process queued PDF uploads (parse + summarize) with N worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=getattr(settings, 'DOCUMENT_WORKER_PROCESSES', 2),
+                            help="Worker processes to run.")
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help="Seconds to wait before checking an empty queue again.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is empty instead of waiting for new jobs.")
+
+    def handle(self, *args, **options):
+        processes, poll, once = max(options['processes'], 1), options['poll'], options['once']
+        self.stdout.write(f"Starting {processes} document worker(s)")
+        if processes == 1:
+            _run_worker(0, poll, once)
+            return
+
+        # Children must open their own database connections
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=_run_worker, args=(i, poll, once), name=f'document-worker-{i}')
+            for i in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS("Document workers stopped"))
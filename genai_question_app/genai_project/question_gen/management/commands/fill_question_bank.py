@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from question_gen.models import BankQuestion
+from question_gen.question_bank import BUILTIN_TOPICS, fill
+
+
+class Command(BaseCommand):
+    help = "Pre-generate opening questions for the built-in quiz topics."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--topic', action='append', choices=BUILTIN_TOPICS,
+                            help="Topic to fill (repeatable). Defaults to all built-in topics.")
+        parser.add_argument('--count', type=int, default=30,
+                            help="Questions to request per batch.")
+        parser.add_argument('--target', type=int, default=0,
+                            help="Keep requesting batches until this many unused questions exist.")
+
+    def handle(self, *args, **options):
+        for topic in options['topic'] or BUILTIN_TOPICS:
+            target = max(options['target'], 1)
+            added = 0
+            # Stop after a few batches in case the model keeps repeating itself
+            for _ in range(5):
+                try:
+                    added += fill(topic, options['count'])
+                except Exception as e:
+                    raise CommandError(f"Failed to fill {topic}: {e}")
+                if BankQuestion.objects.filter(topic=topic, used=False).count() >= target:
+                    break
+            unused = BankQuestion.objects.filter(topic=topic, used=False).count()
+            self.stdout.write(self.style.SUCCESS(f"{topic}: added {added}, {unused} unused in bank"))
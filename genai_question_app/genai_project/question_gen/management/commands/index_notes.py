@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from question_gen.retrieval import index_document, notes_source
+
+
+class Command(BaseCommand):
+    help = "Index the bundled static notes PDFs (DOCUMENT_NOTES) for quiz retrieval. Run at deploy time."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--topic', action='append', help="Topic to index (repeatable). Defaults to all.")
+
+    def handle(self, *args, **options):
+        notes = getattr(settings, 'DOCUMENT_NOTES', {})
+        for topic in options['topic'] or notes:
+            if topic not in notes:
+                raise CommandError(f"No notes configured for {topic!r}")
+            path = finders.find(notes[topic])
+            if path is None:
+                raise CommandError(f"Static file {notes[topic]!r} not found")
+            with open(path, 'rb') as f:
+                count = index_document(notes_source(topic), f, title=notes[topic])
+            self.stdout.write(self.style.SUCCESS(f"{topic}: indexed {count} chunk(s) from {notes[topic]}"))
@@ -0,0 +1,53 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from question_gen.judge_cache import decode, densify, same_verdict
+from question_gen.models import JudgedAnswer
+
+
+class Command(BaseCommand):
+    help = "Hit rate and accuracy of the semantic judge cache, live and replayed at several thresholds."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--thresholds', type=float, nargs='+', default=[0.8, 0.85, 0.9, 0.95],
+                            help="Similarity thresholds to replay.")
+
+    def handle(self, *args, **options):
+        totals = JudgedAnswer.objects.aggregate(
+            hits=Sum('hits'), audits=Sum('audits'), mismatches=Sum('audit_mismatches'),
+        )
+        entries = JudgedAnswer.objects.count()
+        hits, audits, mismatches = (totals[k] or 0 for k in ('hits', 'audits', 'mismatches'))
+        self.stdout.write(f"Stored verdicts: {entries}")
+        self.stdout.write(f"Live hits: {hits} (hit rate {hits / (hits + entries):.1%})" if hits + entries else "Live hits: 0")
+        if audits:
+            self.stdout.write(f"Audited hits: {audits}, accuracy {1 - mismatches / audits:.1%}")
+        else:
+            self.stdout.write("Audited hits: 0")
+
+        # Leave-one-out replay: would each stored answer have hit another stored answer
+        # to the same question, and would that verdict have agreed with the real one?
+        nearest = []  # (similarity, verdicts agree)
+        groups = {}
+        for qhash, verdict, vector in JudgedAnswer.objects.values_list('question_hash', 'verdict', 'vector').iterator():
+            groups.setdefault(qhash, []).append((verdict, densify(decode(vector))))
+        for rows in groups.values():
+            if len(rows) < 2:
+                continue
+            matrix = np.vstack([vec for _, vec in rows])
+            sims = matrix @ matrix.T
+            np.fill_diagonal(sims, -1.0)
+            for i, j in enumerate(sims.argmax(axis=1)):
+                nearest.append((float(sims[i, j]), same_verdict(rows[i][0], rows[j][0])))
+
+        if not nearest:
+            self.stdout.write("Not enough answers per question to replay thresholds yet.")
+            return
+
+        self.stdout.write(f"\nReplay over {len(nearest)} answers:")
+        self.stdout.write(f"{'threshold':>10} {'hit rate':>10} {'accuracy':>10}")
+        for threshold in sorted(options['thresholds']):
+            agreed = [same for sim, same in nearest if sim >= threshold]
+            accuracy = f"{sum(agreed) / len(agreed):.1%}" if agreed else '-'
+            self.stdout.write(f"{threshold:>10.2f} {len(agreed) / len(nearest):>10.1%} {accuracy:>10}")
@@ -0,0 +1,36 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from question_gen.leaderboard import ALL_TOPICS, WINDOWS, period_key, topic_key
+from question_gen.models import LeaderboardEntry, QuizAttempt
+
+
+class Command(BaseCommand):
+    help = "Recompute the leaderboard from finished quiz attempts (backfill or repair)."
+
+    def handle(self, *args, **options):
+        totals = defaultdict(lambda: {'points': 0, 'questions': 0, 'quizzes': 0, 'last_quiz_at': None})
+        attempts = QuizAttempt.objects.filter(finished_at__isnull=False).values_list(
+            'user_id', 'topic', 'score', 'total_steps', 'finished_at',
+        )
+        for user_id, topic, score, total_steps, finished_at in attempts.iterator():
+            for board_topic in (topic_key(topic), ALL_TOPICS):
+                for window in WINDOWS:
+                    entry = totals[user_id, board_topic, period_key(window, finished_at)]
+                    entry['points'] += score or 0
+                    entry['questions'] += total_steps
+                    entry['quizzes'] += 1
+                    entry['last_quiz_at'] = max(filter(None, (entry['last_quiz_at'], finished_at)))
+
+        with transaction.atomic():
+            LeaderboardEntry.objects.all().delete()
+            LeaderboardEntry.objects.bulk_create(
+                [
+                    LeaderboardEntry(user_id=user_id, topic=topic, period=period, **values)
+                    for (user_id, topic, period), values in totals.items()
+                ],
+                batch_size=500,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Leaderboard rebuilt: {len(totals)} entries"))
@@ -0,0 +1,41 @@
+"""
+Tiny counter registry backed by the Django cache, so counts are shared
+between worker processes whenever the cache backend is.
+"""
+from django.core.cache import cache
+
+KEY_PREFIX = 'metrics:'
+
+_names = set()
+
+
+def register(*names):
+    """Declare counters up front so snapshot() reports them even at zero."""
+    _names.update(names)
+
+
+def incr(name, amount=1):
+    _names.add(name)
+    key = KEY_PREFIX + name
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, amount, timeout=None)
+
+
+def get(name):
+    return cache.get(KEY_PREFIX + name, 0)
+
+
+def snapshot(prefix=''):
+    """Current value of every registered counter (optionally filtered by prefix)."""
+    names = sorted(n for n in _names if n.startswith(prefix))
+    values = cache.get_many([KEY_PREFIX + n for n in names])
+    return {n: values.get(KEY_PREFIX + n, 0) for n in names}
+
+
+def ratio(hits, misses):
+    total = hits + misses
+    return round(hits / total, 3) if total else None
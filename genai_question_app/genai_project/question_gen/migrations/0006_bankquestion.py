@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:41
+
+from django.db import migrations, models
+import question_gen.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0005_contactmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='profile_image',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=50)),
+                ('compliment', models.CharField(blank=True, max_length=255)),
+                ('question', models.TextField()),
+                ('question_hash', models.CharField(max_length=64, unique=True)),
+                ('rand_key', models.FloatField(default=question_gen.models.random_key)),
+                ('used', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['topic', 'used', 'rand_key'], name='bankq_topic_used_rand_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0006_bankquestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('kind', models.CharField(max_length=30)),
+                ('model', models.CharField(max_length=100)),
+                ('response', models.TextField()),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'LLM Cache Entry',
+                'verbose_name_plural': 'LLM Cache Entries',
+            },
+        ),
+    ]
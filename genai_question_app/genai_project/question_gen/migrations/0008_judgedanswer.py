@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0007_llmcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JudgedAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_hash', models.CharField(db_index=True, max_length=64)),
+                ('question', models.TextField()),
+                ('answer', models.TextField()),
+                ('verdict', models.TextField()),
+                ('vector', models.BinaryField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('audits', models.PositiveIntegerField(default=0)),
+                ('audit_mismatches', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
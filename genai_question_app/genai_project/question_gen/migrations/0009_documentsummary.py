@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:53
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0008_judgedanswer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('topic', models.CharField(blank=True, max_length=100)),
+                ('summary', models.TextField()),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('pages_parsed', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Document summaries',
+                'unique_together': {('content_hash', 'topic')},
+            },
+        ),
+    ]
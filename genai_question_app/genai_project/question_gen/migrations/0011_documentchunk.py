@@ -0,0 +1,68 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:56
+
+from django.db import OperationalError, migrations, models
+
+FTS_STATEMENTS = [
+    "CREATE VIRTUAL TABLE question_gen_documentchunk_fts USING fts5("
+    "text, content='question_gen_documentchunk', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER question_gen_documentchunk_ai AFTER INSERT ON question_gen_documentchunk BEGIN "
+    "INSERT INTO question_gen_documentchunk_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER question_gen_documentchunk_ad AFTER DELETE ON question_gen_documentchunk BEGIN "
+    "INSERT INTO question_gen_documentchunk_fts(question_gen_documentchunk_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER question_gen_documentchunk_au AFTER UPDATE ON question_gen_documentchunk BEGIN "
+    "INSERT INTO question_gen_documentchunk_fts(question_gen_documentchunk_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO question_gen_documentchunk_fts(rowid, text) VALUES (new.id, new.text); END",
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS question_gen_documentchunk_au",
+    "DROP TRIGGER IF EXISTS question_gen_documentchunk_ad",
+    "DROP TRIGGER IF EXISTS question_gen_documentchunk_ai",
+    "DROP TABLE IF EXISTS question_gen_documentchunk_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    # FTS5 is SQLite-only; elsewhere retrieval falls back to a keyword filter
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        for statement in FTS_STATEMENTS:
+            schema_editor.execute(statement)
+    except OperationalError:
+        # SQLite compiled without FTS5
+        for statement in DROP_STATEMENTS:
+            schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_STATEMENTS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0010_documentjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(db_index=True, max_length=100)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('position', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+            ],
+            options={
+                'ordering': ['source', 'position'],
+            },
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0011_documentchunk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentjob',
+            name='timings',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
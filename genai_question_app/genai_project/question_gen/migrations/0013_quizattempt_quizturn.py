@@ -0,0 +1,54 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0012_documentjob_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=100)),
+                ('document_summary', models.TextField(blank=True)),
+                ('document_source', models.CharField(blank=True, max_length=100)),
+                ('step', models.PositiveSmallIntegerField(default=1)),
+                ('nest_level', models.PositiveSmallIntegerField(default=0)),
+                ('total_steps', models.PositiveSmallIntegerField(default=5)),
+                ('current_compliment', models.TextField(blank=True)),
+                ('current_question', models.TextField(blank=True)),
+                ('pending_opening', models.BooleanField(default=False)),
+                ('score', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizTurn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.PositiveSmallIntegerField()),
+                ('question', models.TextField()),
+                ('user_answer', models.TextField()),
+                ('concept', models.CharField(blank=True, max_length=255)),
+                ('feedback', models.TextField(blank=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('nest_level', models.PositiveSmallIntegerField(default=0)),
+                ('compliment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turns', to='question_gen.quizattempt')),
+            ],
+            options={
+                'ordering': ['step'],
+                'unique_together': {('attempt', 'step')},
+            },
+        ),
+    ]
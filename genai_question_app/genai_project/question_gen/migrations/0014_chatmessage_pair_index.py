@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0013_quizattempt_quizturn'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['sender', 'receiver', 'timestamp'], name='chatmsg_pair_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0014_chatmessage_pair_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_message_preview', models.CharField(blank=True, max_length=120)),
+                ('student_unread', models.PositiveIntegerField(default=0)),
+                ('interviewer_unread', models.PositiveIntegerField(default=0)),
+                ('interviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interviewer_conversations', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_conversations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['interviewer', '-last_message_at'], name='conv_interviewer_last_idx'), models.Index(fields=['student', '-last_message_at'], name='conv_student_last_idx')],
+                'unique_together': {('student', 'interviewer')},
+            },
+        ),
+    ]
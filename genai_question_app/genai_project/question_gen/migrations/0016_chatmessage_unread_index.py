@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0015_conversation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['receiver', 'sender'], name='chatmsg_unread_idx'),
+        ),
+    ]
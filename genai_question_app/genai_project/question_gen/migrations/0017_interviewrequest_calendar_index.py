@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0016_chatmessage_unread_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interviewrequest',
+            index=models.Index(fields=['interviewer', 'requested_date', 'status'], name='ireq_interviewer_date_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0017_interviewrequest_calendar_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentorSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('company'), models.F('user_type'), name='user_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('role'), models.F('user_type'), name='user_role_idx'),
+        ),
+        migrations.AddField(
+            model_name='mentorskill',
+            name='skill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentor_links', to='question_gen.skill'),
+        ),
+        migrations.AddField(
+            model_name='mentorskill',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentor_skills', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='mentors', through='question_gen.MentorSkill', to='question_gen.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='mentorskill',
+            index=models.Index(fields=['skill', 'user'], name='mentorskill_skill_user_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='mentorskill',
+            unique_together={('user', 'skill')},
+        ),
+    ]
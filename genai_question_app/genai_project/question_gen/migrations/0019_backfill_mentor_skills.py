@@ -0,0 +1,43 @@
+import re
+
+from django.db import migrations
+
+SEPARATORS = re.compile(r'[,;/\n|]+')
+
+
+def normalize(name):
+    # Same rules as question_gen.skills.normalize (kept here so the migration never changes)
+    return ' '.join(name.lower().split())[:50]
+
+
+def backfill(apps, schema_editor):
+    User = apps.get_model('question_gen', 'User')
+    Skill = apps.get_model('question_gen', 'Skill')
+    MentorSkill = apps.get_model('question_gen', 'MentorSkill')
+
+    parsed = {}
+    mentors = User.objects.filter(user_type='interviewer').exclude(skills__isnull=True).exclude(skills='')
+    for user_id, text in mentors.values_list('id', 'skills'):
+        names = {normalize(part) for part in SEPARATORS.split(text)} - {''}
+        if names:
+            parsed[user_id] = names
+
+    all_names = set().union(*parsed.values()) if parsed else set()
+    Skill.objects.bulk_create([Skill(name=name) for name in all_names], ignore_conflicts=True)
+    skill_ids = dict(Skill.objects.filter(name__in=all_names).values_list('name', 'id'))
+    MentorSkill.objects.bulk_create(
+        [MentorSkill(user_id=user_id, skill_id=skill_ids[name]) for user_id, names in parsed.items() for name in names],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0018_skill_mentorskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
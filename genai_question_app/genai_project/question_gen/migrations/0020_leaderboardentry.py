@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0019_backfill_mentor_skills'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=100)),
+                ('period', models.CharField(max_length=10)),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('questions', models.PositiveIntegerField(default=0)),
+                ('quizzes', models.PositiveIntegerField(default=0)),
+                ('last_quiz_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['topic', 'period', '-points', 'last_quiz_at'], name='leaderboard_board_idx')],
+                'unique_together': {('user', 'topic', 'period')},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+import numpy as np
+from django.db import migrations
+
+# Same layout as question_gen.judge_cache (kept here so the migration never changes)
+DIMENSIONS = 2 ** 12
+DENSE_SIZE = DIMENSIONS * 4  # float32
+
+
+def _batches(JudgedAnswer, size=500):
+    # By id range rather than one open cursor: SQLite can't isolate it from the updates
+    last_id = 0
+    while True:
+        rows = list(
+            JudgedAnswer.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'vector')[:size]
+        )
+        if not rows:
+            return
+        yield from ((entry_id, bytes(vector)) for entry_id, vector in rows)
+        last_id = rows[-1][0]
+
+
+def to_sparse(apps, schema_editor):
+    JudgedAnswer = apps.get_model('question_gen', 'JudgedAnswer')
+    for entry_id, vector in _batches(JudgedAnswer):
+        if len(vector) != DENSE_SIZE:
+            continue
+        dense = np.frombuffer(vector, dtype=np.float32)
+        buckets = np.flatnonzero(dense).astype(np.uint16)
+        sparse = buckets.tobytes() + dense[buckets].astype(np.float16).tobytes()
+        JudgedAnswer.objects.filter(id=entry_id).update(vector=sparse)
+
+
+def to_dense(apps, schema_editor):
+    JudgedAnswer = apps.get_model('question_gen', 'JudgedAnswer')
+    for entry_id, vector in _batches(JudgedAnswer):
+        if len(vector) == DENSE_SIZE:
+            continue
+        n = len(vector) // 4
+        dense = np.zeros(DIMENSIONS, dtype=np.float32)
+        dense[np.frombuffer(vector, dtype=np.uint16, count=n)] = np.frombuffer(vector, dtype=np.float16, offset=2 * n)
+        JudgedAnswer.objects.filter(id=entry_id).update(vector=dense.tobytes())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0020_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_sparse, to_dense),
+    ]
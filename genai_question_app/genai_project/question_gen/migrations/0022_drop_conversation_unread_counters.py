@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0021_sparse_judge_vectors'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='conversation',
+            name='interviewer_unread',
+        ),
+        migrations.RemoveField(
+            model_name='conversation',
+            name='student_unread',
+        ),
+    ]
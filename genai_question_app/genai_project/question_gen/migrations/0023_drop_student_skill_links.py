@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def drop_student_links(apps, schema_editor):
+    # Databases that ran 0019 before it was limited to mentors also linked other users' skills
+    MentorSkill = apps.get_model('question_gen', 'MentorSkill')
+    MentorSkill.objects.exclude(user__user_type='interviewer').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('question_gen', '0022_drop_conversation_unread_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_student_links, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,14 @@
+import random
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.conf import settings
 
+# Largest value a database integer column compares against without overflowing (cursor bounds)
+MAX_ID = 2 ** 63 - 1
+
 class User(AbstractUser):
     """
     Custom User model with user_type (student/interviewer/admin)
@@ -27,6 +33,8 @@ class User(AbstractUser):
     skills = models.CharField(max_length=200, blank=True, null=True)  # Added skills field
     bio = models.TextField(blank=True, null=True)
     profile_image = models.URLField( max_length=500,blank=True, null=True)
+    # `skills` parsed into rows (kept in sync by skills.py) so mentors can be searched by skill
+    skill_tags = models.ManyToManyField('Skill', through='MentorSkill', related_name='mentors', blank=True)
 
     def __str__(self):
         return self.username
@@ -34,6 +42,34 @@ class User(AbstractUser):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Mentor search filters (case-insensitive equality on LOWER(...))
+            models.Index(Lower('company'), 'user_type', name='user_company_idx'),
+            models.Index(Lower('role'), 'user_type', name='user_role_idx'),
+        ]
+
+
+class Skill(models.Model):
+    """A normalized skill name (lowercase, single spaces), e.g. 'system design'."""
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class MentorSkill(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentor_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='mentor_links')
+
+    class Meta:
+        unique_together = ['user', 'skill']
+        indexes = [
+            # skill -> mentors, for search
+            models.Index(fields=['skill', 'user'], name='mentorskill_skill_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.skill}"
 
 
 class InterviewRequest(models.Model):
@@ -67,6 +103,10 @@ class InterviewRequest(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['student', 'interviewer', 'requested_date']
+        indexes = [
+            # A mentor's requests in a date window (interview_calendar)
+            models.Index(fields=['interviewer', 'requested_date', 'status'], name='ireq_interviewer_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} → {self.interviewer.username} ({self.get_status_display()})"
@@ -80,10 +120,37 @@ class ChatMessage(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # One conversation direction in time order (chat.py pages on it)
+            models.Index(fields=['sender', 'receiver', 'timestamp'], name='chatmsg_pair_ts_idx'),
+            # Only unread rows, so unread badges stay cheap however much history there is
+            models.Index(fields=['receiver', 'sender'], condition=models.Q(is_read=False), name='chatmsg_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender} → {self.receiver}: {self.message[:30]}"
 
+class Conversation(models.Model):
+    """
+    One row per student/interviewer pair, kept in step with ChatMessage
+    inserts (chat.save_messages) so dashboards don't aggregate messages.
+    Unread badges come from chat.unread_counts, not from this row.
+    """
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='student_conversations')
+    interviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interviewer_conversations')
+    last_message_at = models.DateTimeField(default=timezone.now)
+    last_message_preview = models.CharField(max_length=120, blank=True)
+
+    class Meta:
+        unique_together = ['student', 'interviewer']
+        indexes = [
+            models.Index(fields=['interviewer', '-last_message_at'], name='conv_interviewer_last_idx'),
+            models.Index(fields=['student', '-last_message_at'], name='conv_student_last_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} ↔ {self.interviewer}"
+
 class ContactMessage(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
@@ -96,4 +163,221 @@ class ContactMessage(models.Model):
         verbose_name_plural = 'Contact Messages'
 
     def __str__(self):
-        return f"Message from {self.name} ({self.email}) - {self.created_at.strftime('%b %d, %Y')}"
\ No newline at end of file
+        return f"Message from {self.name} ({self.email}) - {self.created_at.strftime('%b %d, %Y')}"
+
+def random_key():
+    return random.random()
+
+
+class BankQuestion(models.Model):
+    """
+    Pre-generated opening question for a built-in quiz topic, so starting a
+    quiz doesn't need a live Gemini call. Filled by `fill_question_bank`.
+    """
+    topic = models.CharField(max_length=50)
+    compliment = models.CharField(max_length=255, blank=True)
+    question = models.TextField()
+    question_hash = models.CharField(max_length=64, unique=True)  # sha256 of topic + normalized question
+    rand_key = models.FloatField(default=random_key)  # indexed random order for cheap picks
+    used = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['topic', 'used', 'rand_key'], name='bankq_topic_used_rand_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.topic}] {self.question[:50]}"
+
+
+class LLMCacheEntry(models.Model):
+    """
+    Shared (cross-process) tier of the LLM response cache; the in-process
+    LRU tier sits in front of it. See question_gen/llm_cache.py.
+    """
+    key = models.CharField(max_length=64, unique=True)  # sha256 of model + schema + normalized prompt
+    kind = models.CharField(max_length=30)
+    model = models.CharField(max_length=100)
+    response = models.TextField()
+    latency_ms = models.PositiveIntegerField(default=0)  # cost of the original call
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'LLM Cache Entry'
+        verbose_name_plural = 'LLM Cache Entries'
+
+    def __str__(self):
+        return f"[{self.kind}] {self.key[:12]} ({self.hits} hits)"
+
+
+class JudgedAnswer(models.Model):
+    """
+    (question, answer, verdict) triple for the semantic judge cache.
+    `vector` is the answer's sparse hashed character n-gram vector (see
+    judge_cache.encode). Only the newest rows per question are kept.
+    """
+    question_hash = models.CharField(max_length=64, db_index=True)
+    question = models.TextField()
+    answer = models.TextField()
+    verdict = models.TextField()
+    vector = models.BinaryField()
+    hits = models.PositiveIntegerField(default=0)
+    audits = models.PositiveIntegerField(default=0)  # hits re-checked against the real judge
+    audit_mismatches = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.answer[:40]} → {self.verdict[:30]}"
+
+
+class DocumentSummary(models.Model):
+    """
+    Summary of an uploaded PDF, keyed by the SHA-256 of its bytes and the quiz
+    topic, so re-uploading the same file skips parsing and the LLM call.
+    """
+    content_hash = models.CharField(max_length=64)
+    topic = models.CharField(max_length=100, blank=True)
+    summary = models.TextField()
+    size_bytes = models.PositiveIntegerField(default=0)
+    pages_parsed = models.PositiveIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        unique_together = ['content_hash', 'topic']
+        verbose_name_plural = 'Document summaries'
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} / {self.topic or 'any'} ({self.hits} hits)"
+
+
+class DocumentJob(models.Model):
+    """
+    Queued PDF upload waiting to be parsed and summarized by
+    `manage.py document_worker`; select_topic.html polls its status.
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='document_jobs')
+    topic = models.CharField(max_length=100, blank=True)
+    document = models.FileField(upload_to='document_jobs/%Y/%m/', blank=True)
+    content_hash = models.CharField(max_length=64)
+    size_bytes = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)  # retries are pushed back
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    summary = models.TextField(blank=True)
+    pages_parsed = models.PositiveIntegerField(default=0)
+    timings = models.JSONField(default=dict, blank=True)  # seconds per pipeline stage
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='docjob_status_avail_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.status}) for {self.user.username}"
+
+
+class DocumentChunk(models.Model):
+    """
+    Slice of an indexed document. `source` is the upload's content hash or
+    'notes:<topic>' for the bundled notes. Mirrored into an FTS5 table on SQLite.
+    """
+    source = models.CharField(max_length=100, db_index=True)
+    title = models.CharField(max_length=255, blank=True)
+    position = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['source', 'position']
+
+    def __str__(self):
+        return f"{self.source[:20]} #{self.position}"
+
+
+class QuizAttempt(models.Model):
+    """
+    One quiz run. The session only holds its id; answered steps are
+    appended as QuizTurn rows.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_attempts')
+    topic = models.CharField(max_length=100)
+    document_summary = models.TextField(blank=True)
+    document_source = models.CharField(max_length=100, blank=True)  # retrieval index to use
+    step = models.PositiveSmallIntegerField(default=1)
+    nest_level = models.PositiveSmallIntegerField(default=0)
+    total_steps = models.PositiveSmallIntegerField(default=5)
+    current_compliment = models.TextField(blank=True)
+    current_question = models.TextField(blank=True)
+    pending_opening = models.BooleanField(default=False)  # opening question still to be streamed
+    score = models.PositiveSmallIntegerField(null=True, blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.topic} (step {self.step})"
+
+
+class QuizTurn(models.Model):
+    """An answered quiz step. Append-only."""
+    attempt = models.ForeignKey(QuizAttempt, on_delete=models.CASCADE, related_name='turns')
+    step = models.PositiveSmallIntegerField()
+    question = models.TextField()
+    user_answer = models.TextField()
+    concept = models.CharField(max_length=255, blank=True)
+    feedback = models.TextField(blank=True)
+    is_correct = models.BooleanField(default=False)
+    nest_level = models.PositiveSmallIntegerField(default=0)
+    compliment = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['step']
+        unique_together = ['attempt', 'step']
+
+    def __str__(self):
+        return f"Attempt {self.attempt_id} step {self.step}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    A user's quiz totals on one board: a topic (or '*' for all topics) over
+    a period ('all', a month '2026-10' or an ISO week '2026-W42').
+    Incremented by leaderboard.record() when a quiz finishes.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    topic = models.CharField(max_length=100)
+    period = models.CharField(max_length=10)
+    points = models.PositiveIntegerField(default=0)  # correct answers
+    questions = models.PositiveIntegerField(default=0)
+    quizzes = models.PositiveIntegerField(default=0)
+    last_quiz_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ['user', 'topic', 'period']
+        indexes = [
+            # A board's top N in rank order
+            models.Index(fields=['topic', 'period', '-points', 'last_quiz_at'], name='leaderboard_board_idx'),
+        ]
+
+    @property
+    def accuracy(self):
+        return round(100 * self.points / self.questions, 1) if self.questions else 0
+
+    def __str__(self):
+        return f"{self.user} - {self.topic} {self.period}: {self.points}"
@@ -0,0 +1,19 @@
+"""
+Page-range text extraction run inside the summarizer's process pool.
+
+Kept free of Django imports so worker processes can import it under any
+multiprocessing start method.
+"""
+from io import BytesIO
+
+import PyPDF2
+
+
+def page_count(data):
+    return len(PyPDF2.PdfReader(BytesIO(data)).pages)
+
+
+def extract_range(data, start, stop):
+    """Text of pages [start, stop) of the PDF in `data` (bytes)."""
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    return [reader.pages[index].extract_text() or '' for index in range(start, stop)]
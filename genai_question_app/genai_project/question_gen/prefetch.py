@@ -0,0 +1,103 @@
+"""
+Speculative prefetch of the next quiz question.
+
+As soon as a question is shown, a background job generates the next-question
+candidates for both nesting branches and stores them in the cache, keyed by
+quiz attempt and step. The answer POST then only has to judge the answer and
+take the ready candidate for its branch.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from . import metrics
+from .quiz_engine import generate_candidates
+
+logger = logging.getLogger(__name__)
+
+metrics.register('prefetch.scheduled', 'prefetch.hits', 'prefetch.misses', 'prefetch.failed', 'prefetch.evicted')
+
+# Separate from the fan-out pool so prefetch jobs never starve live requests
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'QUIZ_PREFETCH_WORKERS', 4),
+    thread_name_prefix='quiz-prefetch',
+)
+_pending = {}  # cache key -> Future, for jobs started by this process
+_lock = threading.Lock()
+
+
+def _key(attempt, step):
+    return f'quiz-prefetch:{attempt}:{step}'
+
+
+def _run(key, topic, summary, history, question):
+    try:
+        candidates = generate_candidates(topic, summary, history, question)
+        cache.set(key, candidates, getattr(settings, 'QUIZ_PREFETCH_TTL', 900))
+        return candidates
+    except Exception:
+        metrics.incr('prefetch.failed')
+        logger.exception("Quiz prefetch %s failed", key)
+        return None
+    finally:
+        close_old_connections()
+        with _lock:
+            _pending.pop(key, None)
+
+
+def schedule(attempt, step, topic, summary, history, question):
+    """Start generating candidates for (attempt, step) unless already done or running."""
+    if not getattr(settings, 'QUIZ_PREFETCH_ENABLED', True):
+        return
+    key = _key(attempt, step)
+    with _lock:
+        if key in _pending or cache.get(key) is not None:
+            return
+        _pending[key] = _executor.submit(_run, key, topic, summary, list(history), question)
+    metrics.incr('prefetch.scheduled')
+
+
+def take(attempt, step, branch):
+    """
+    Return the prefetched candidate for `branch`, or None on a miss.
+
+    A job still running in this process is given QUIZ_PREFETCH_WAIT seconds
+    to finish. The entry is removed either way, so the other branch's
+    candidate is evicted along with it.
+    """
+    key = _key(attempt, step)
+    candidates = cache.get(key)
+    if candidates is None:
+        with _lock:
+            future = _pending.get(key)
+        if future is not None:
+            try:
+                candidates = future.result(timeout=getattr(settings, 'QUIZ_PREFETCH_WAIT', 2))
+            except FutureTimeout:
+                candidates = None
+    cache.delete(key)
+
+    if candidates and candidates.get(branch):
+        metrics.incr('prefetch.hits')
+        return candidates[branch]
+    metrics.incr('prefetch.misses')
+    return None
+
+
+def evict(attempt, steps):
+    """Drop any candidates left over for an attempt (quiz finished or abandoned)."""
+    keys = [_key(attempt, step) for step in steps]
+    leftover = cache.get_many(keys)
+    cache.delete_many(keys)
+    if leftover:
+        metrics.incr('prefetch.evicted', len(leftover))
+
+
+def stats():
+    counts = metrics.snapshot('prefetch.')
+    counts['prefetch.hit_ratio'] = metrics.ratio(counts['prefetch.hits'], counts['prefetch.misses'])
+    return counts
@@ -0,0 +1,133 @@
+"""
+Opening-question bank for the built-in quiz topics.
+
+Questions are generated ahead of time (`manage.py fill_question_bank`) and a
+quiz start just claims a random unused one. When a topic runs low it is
+topped up in a background thread.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from . import llm
+from .models import BankQuestion
+
+logger = logging.getLogger(__name__)
+
+BUILTIN_TOPICS = ('java', 'javascript', 'reactjs')
+
+BANK_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'compliment': {'type': 'string'},
+            'question': {'type': 'string'},
+        },
+        'required': ['compliment', 'question'],
+    },
+}
+
+_refilling = set()
+_refill_lock = threading.Lock()
+
+
+def question_hash(topic, question):
+    normalized = re.sub(r'\s+', ' ', question).strip().lower()
+    return hashlib.sha256(f"{topic}:{normalized}".encode('utf-8')).hexdigest()
+
+
+def generate_questions(topic, count):
+    """Ask Gemini for `count` distinct beginner opening questions on `topic`."""
+    prompt = (
+        f"You are a quiz master. Topic: {topic}. "
+        f"Write {count} different engaging beginner questions on the main topic, each covering a different concept. "
+        "For each give a short compliment to open the quiz and the question itself. Very concise."
+    )
+    raw = llm.generate(prompt, kind='bank', schema=BANK_SCHEMA)
+    items = json.loads(raw)
+    return [
+        (str(item.get('compliment', '')).strip()[:255], str(item.get('question', '')).strip())
+        for item in items
+        if isinstance(item, dict) and str(item.get('question', '')).strip()
+    ]
+
+
+def fill(topic, count):
+    """Generate and store up to `count` new questions, skipping duplicates. Returns rows inserted."""
+    rows = {}
+    for compliment, question in generate_questions(topic, count):
+        key = question_hash(topic, question)
+        rows.setdefault(key, BankQuestion(topic=topic, compliment=compliment, question=question, question_hash=key))
+
+    existing = set(
+        BankQuestion.objects.filter(question_hash__in=rows.keys()).values_list('question_hash', flat=True)
+    )
+    new_rows = [row for key, row in rows.items() if key not in existing]
+    BankQuestion.objects.bulk_create(new_rows, ignore_conflicts=True)
+    return len(new_rows)
+
+
+# Claims one random unused row and reports how many unused rows are left (counted
+# up to the low-water mark, so it stays a short index range scan). The row after
+# a random pivot is taken, wrapping around to the one before it at the end.
+_CLAIM_SQL = """
+UPDATE {table} SET used = %s
+WHERE used = %s AND id = COALESCE(
+    (SELECT id FROM {table} WHERE topic = %s AND used = %s AND rand_key >= %s ORDER BY rand_key LIMIT 1),
+    (SELECT id FROM {table} WHERE topic = %s AND used = %s AND rand_key < %s ORDER BY rand_key DESC LIMIT 1)
+)
+RETURNING compliment, question,
+    (SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE topic = %s AND used = %s LIMIT %s) unused)
+"""
+
+
+def take_opening_question(topic):
+    """
+    Claim a random unused bank question for `topic` in one UPDATE ... RETURNING.
+
+    Returns (compliment, question), or None when the bank is empty. Losing a
+    race for the same row to a concurrent start also returns None, and the
+    caller asks the LLM as it would for an empty bank.
+    """
+    low_water = getattr(settings, 'QUESTION_BANK_LOW_WATER', 10)
+    pivot = random.random()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _CLAIM_SQL.format(table=BankQuestion._meta.db_table),
+            [True, False, topic, False, pivot, topic, False, pivot, topic, False, low_water],
+        )
+        row = cursor.fetchone()
+
+    if row is None or row[2] < low_water:
+        refill_in_background(topic)
+    if row is None:
+        return None
+    return row[0], row[1]
+
+
+def refill_in_background(topic):
+    """Top up `topic` on a daemon thread; at most one refill per topic at a time."""
+    with _refill_lock:
+        if topic in _refilling:
+            return
+        _refilling.add(topic)
+
+    def _run():
+        try:
+            added = fill(topic, getattr(settings, 'QUESTION_BANK_REFILL_SIZE', 30))
+            logger.info("Question bank refill for %s added %d question(s)", topic, added)
+        except Exception:
+            logger.exception("Question bank refill for %s failed", topic)
+        finally:
+            close_old_connections()
+            with _refill_lock:
+                _refilling.discard(topic)
+
+    threading.Thread(target=_run, name=f'bank-refill-{topic}', daemon=True).start()
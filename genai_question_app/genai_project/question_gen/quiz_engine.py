@@ -0,0 +1,355 @@
+"""
+Quiz turn engine.
+
+One answered question used to cost 3-4 sequential Gemini calls (judge, concept,
+sometimes "new concept", next question). run_turn() asks for all of it in a
+single schema-constrained JSON response and only falls back to the old chain
+when that response can't be parsed.
+"""
+import json
+import logging
+import time
+
+from . import judge_cache, llm
+from .fanout import run_parallel
+
+logger = logging.getLogger(__name__)
+
+# JSON schema the model has to follow for a whole quiz turn
+TURN_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'verdict': {'type': 'string', 'enum': ['correct', 'incorrect']},
+        'reason': {'type': 'string'},
+        'concept': {'type': 'string'},
+        'compliment': {'type': 'string'},
+        'question': {'type': 'string'},
+    },
+    'required': ['verdict', 'reason', 'concept', 'compliment', 'question'],
+}
+
+
+_CANDIDATE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'concept': {'type': 'string'},
+        'compliment': {'type': 'string'},
+        'question': {'type': 'string'},
+    },
+    'required': ['concept', 'compliment', 'question'],
+}
+
+# Next-question candidates for both nesting branches, generated ahead of the answer
+CANDIDATES_SCHEMA = {
+    'type': 'object',
+    'properties': {'follow_up': _CANDIDATE_SCHEMA, 'new_concept': _CANDIDATE_SCHEMA},
+    'required': ['follow_up', 'new_concept'],
+}
+
+BRANCHES = ('follow_up', 'new_concept')
+
+
+def branch_for(nest_level):
+    """nest_level 0 goes one level deeper, anything else starts a new concept."""
+    return 'follow_up' if nest_level == 0 else 'new_concept'
+
+
+class TurnParseError(ValueError):
+    """The structured turn response was missing, malformed or incomplete."""
+
+
+def parse_response(full_text):
+    # Shortened logic
+    if '?' in full_text:
+        split_idx = full_text.find('?') + 1
+        compliment = full_text[:split_idx].strip()
+        question = full_text[split_idx:].strip()
+    else:
+        compliment = ''
+        question = full_text.strip()
+
+    return compliment, question
+
+
+def format_feedback(is_correct, reason=''):
+    """Same wording the judge prompt has always produced."""
+    if is_correct:
+        return 'Correct!'
+    return f"Incorrect: {reason}" if reason else 'Incorrect'
+
+
+def is_correct_feedback(feedback):
+    return feedback.strip().lower().startswith('correct')
+
+
+def _call(stats, prompts):
+    """
+    Run independent prompts concurrently through the LLM gateway.
+
+    `prompts` maps a step label to a prompt (or a (prompt, schema) pair).
+    Records call counts and per-step timings in `stats`.
+    """
+    tasks = {}
+    for label, prompt in prompts.items():
+        prompt, schema = prompt if isinstance(prompt, tuple) else (prompt, None)
+        tasks[label] = lambda label=label, prompt=prompt, schema=schema: llm.generate(prompt, kind=label, schema=schema)
+
+    results, timings = run_parallel(tasks)
+    stats['calls'] += len(results)
+    stats['timings'].update(timings)
+    return results
+
+
+def previous_concepts(history):
+    return [h['concept'] for h in history if h.get('concept')]
+
+
+def build_judge_prompt(topic, summary, history, question, answer):
+    # Judge answer (short)
+    base_context = f"Document: {summary}. " if summary else ''
+    last_context = '\n'.join([f"Q: {h['question']} A: {h['user_answer']}" for h in history[-1:]])  # only last one
+    return (
+        f"Topic: {topic}. {base_context}{last_context}"
+        f"Question: {question}\nAnswer: {answer}\n"
+        "Correct? Reply only 'Correct!' or 'Incorrect: [short reason]'"
+    )
+
+
+def cached_verdict(stats, topic, summary, history, question, answer):
+    """
+    Verdict from the semantic judge cache, or None on a miss.
+
+    A hit may be audited in the background against the real judge, past the
+    LLM response cache, which could otherwise hand back the verdict being checked.
+    """
+    hit = judge_cache.lookup(question, answer)
+    if hit is None:
+        return None
+    judge_prompt = build_judge_prompt(topic, summary, history, question, answer)
+    judge_cache.maybe_audit(hit, lambda: llm.generate(judge_prompt, kind='judge', use_cache=False))
+    stats['judge_cache'] = round(hit.similarity, 3)
+    return hit.verdict
+
+
+def build_turn_prompt(topic, summary, history, question, answer, nest_level):
+    base_context = f"Document: {summary}. " if summary else ''
+    last_context = '\n'.join([f"Q: {h['question']} A: {h['user_answer']}" for h in history[-1:]])
+
+    if nest_level == 0:
+        concept_rule = (
+            "concept: ONE key concept/keyword from the student's answer. "
+            "question: a deeper follow-up on that concept (more specific/advanced than the original question)."
+        )
+    else:
+        prev_str = ', '.join(previous_concepts(history)) or 'none'
+        concept_rule = (
+            f"concept: ONE completely new, unrelated concept from {topic} not in [{prev_str}]. "
+            "question: a fresh core question on that new concept (ignore previous discussion)."
+        )
+
+    return (
+        f"You are a quiz master for {topic}. {base_context}{last_context}\n"
+        f"Question: {question}\nAnswer: {answer}\n"
+        "Judge the answer and prepare the next question. Fill the JSON fields:\n"
+        "verdict: 'correct' or 'incorrect'. reason: short reason if incorrect, else empty.\n"
+        f"{concept_rule}\n"
+        "compliment: short compliment for the student. Keep everything very concise."
+    )
+
+
+def _clean_fields(data, names):
+    fields = {}
+    for name in names:
+        value = data.get(name, '')
+        if not isinstance(value, str):
+            raise TurnParseError(f"Field {name!r} must be a string")
+        fields[name] = value.strip()
+    return fields
+
+
+def parse_turn(raw):
+    """Validate a structured turn response and return its cleaned fields."""
+    try:
+        data = json.loads(raw)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise TurnParseError(f"Invalid JSON: {e}")
+
+    if not isinstance(data, dict):
+        raise TurnParseError("Expected a JSON object")
+
+    verdict = str(data.get('verdict', '')).strip().lower()
+    if verdict not in ('correct', 'incorrect'):
+        raise TurnParseError(f"Bad verdict: {verdict!r}")
+
+    fields = _clean_fields(data, ('reason', 'concept', 'compliment', 'question'))
+
+    if not fields['concept'] or not fields['question']:
+        raise TurnParseError("Concept and question are required")
+
+    fields['is_correct'] = verdict == 'correct'
+    return fields
+
+
+def build_candidates_prompt(topic, summary, history, question):
+    base_context = f"Document: {summary}. " if summary else ''
+    prev_str = ', '.join(previous_concepts(history)) or 'none'
+    return (
+        f"You are a quiz master for {topic}. {base_context}"
+        f"The student is now answering: {question}\n"
+        "Prepare the next question for both possible paths. Fill the JSON fields:\n"
+        "follow_up: concept = the key concept of the current question; question = a deeper follow-up on it "
+        "(more specific/advanced than the current question).\n"
+        f"new_concept: concept = ONE completely new, unrelated concept from {topic} not in [{prev_str}]; "
+        "question = a fresh core question on it.\n"
+        "Each with a short compliment for the student. Keep everything very concise."
+    )
+
+
+def generate_candidates(topic, summary, history, question):
+    """
+    Speculatively generate the next question for both branches before the
+    student has answered. Returns {branch: {concept, compliment, question}}.
+    """
+    prompt = build_candidates_prompt(topic, summary, history, question)
+    raw = llm.generate(prompt, kind='candidates', schema=CANDIDATES_SCHEMA)
+    try:
+        data = json.loads(raw)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise TurnParseError(f"Invalid JSON: {e}")
+
+    candidates = {}
+    for branch in BRANCHES:
+        if not isinstance(data, dict) or not isinstance(data.get(branch), dict):
+            raise TurnParseError(f"Missing {branch!r} candidate")
+        fields = _clean_fields(data[branch], ('concept', 'compliment', 'question'))
+        if not fields['concept'] or not fields['question']:
+            raise TurnParseError(f"Incomplete {branch!r} candidate")
+        candidates[branch] = fields
+    return candidates
+
+
+def judge_turn(topic, summary, history, question, answer, nest_level, candidate):
+    """
+    Judge `answer` only and take the next question from a prefetched `candidate`.
+
+    Returns the same shape as run_turn().
+    """
+    stats = {'mode': 'prefetched', 'calls': 0, 'timings': {}}
+    start = time.perf_counter()
+    feedback = cached_verdict(stats, topic, summary, history, question, answer)
+    if feedback is None:
+        feedback = _call(stats, {'judge': build_judge_prompt(topic, summary, history, question, answer)})['judge']
+        judge_cache.store(question, answer, feedback)
+
+    stats['timings']['total'] = round(time.perf_counter() - start, 3)
+    logger.info("Quiz turn (%s): %d LLM call(s), timings=%s", stats['mode'], stats['calls'], stats['timings'])
+    return {
+        'feedback': feedback,
+        'is_correct': is_correct_feedback(feedback),
+        'concept': candidate['concept'],
+        'compliment': candidate['compliment'],
+        'question': candidate['question'],
+        'next_level': 1 if nest_level == 0 else 0,
+        'stats': stats,
+    }
+
+
+def run_turn(topic, summary, history, question, answer, nest_level):
+    """
+    Judge `answer` and generate the next question.
+
+    Returns a dict with feedback, is_correct, concept, compliment, question,
+    next_level and stats (mode, number of LLM calls, per-step timings).
+    """
+    stats = {'mode': 'structured', 'calls': 0, 'timings': {}}
+    start = time.perf_counter()
+    next_level = 1 if nest_level == 0 else 0
+    prompt = build_turn_prompt(topic, summary, history, question, answer, nest_level)
+    raw = _call(stats, {'turn': (prompt, TURN_SCHEMA)})['turn']
+    try:
+        fields = parse_turn(raw)
+        result = {
+            'feedback': format_feedback(fields['is_correct'], fields['reason']),
+            'is_correct': fields['is_correct'],
+            'concept': fields['concept'],
+            'compliment': fields['compliment'],
+            'question': fields['question'],
+        }
+        judge_cache.store(question, answer, result['feedback'])
+    except TurnParseError as e:
+        logger.warning("Structured quiz turn unusable (%s), falling back to multi-call chain", e)
+        stats['mode'] = 'fallback'
+        result = _legacy_turn(stats, topic, summary, history, question, answer, nest_level)
+
+    result['next_level'] = next_level
+    stats['timings']['total'] = round(time.perf_counter() - start, 3)
+    result['stats'] = stats
+    logger.info("Quiz turn (%s): %d LLM call(s), timings=%s", stats['mode'], stats['calls'], stats['timings'])
+    return result
+
+
+def build_concept_prompt(topic, history, answer, nest_level):
+    """Returns (label, prompt) for the concept step of the multi-call chain."""
+    # Only 1 level of nesting, then always branch
+    if nest_level == 0:
+        # Extract concept (short)
+        return 'concept', f"From answer '{answer}' on {topic}, extract ONE key concept/keyword. Reply only the concept."
+
+    # Force completely new branch
+    prev_str = ', '.join(previous_concepts(history)) or 'none'
+    return 'new_concept', (
+        f"Topic: {topic}. Previous concepts: {prev_str}. "
+        f"Pick ONE completely new, unrelated concept from {topic} that hasn't been covered. Reply only the concept name."
+    )
+
+
+def build_next_prompt(topic, summary, nest_level, concept, feedback):
+    base_context = f"Document: {summary}. " if summary else ''
+    if nest_level == 0:
+        nest_text = f"Ask a deeper follow-up on '{concept}' (more specific/advanced than original question)."
+    else:
+        nest_text = f"Start fresh with a core question on the new topic '{concept}' (ignore previous discussion)."
+
+    # Next question (short prompt)
+    return (
+        f"Quiz master for {topic}. {base_context}{nest_text} "
+        f"Previous feedback: {feedback}. "
+        f"Ask engaging question on '{concept}'. Start with short compliment, then question. Very concise."
+    )
+
+
+def build_opening_prompt(topic, summary):
+    base_context = f"Document: {summary}. " if summary else ''
+    return (
+        f"You are a quiz master. Topic: {topic or 'Custom'}. {base_context}"
+        "Ask one engaging beginner question on the main topic. Start with short compliment, then question. Very concise."
+    )
+
+
+def _legacy_turn(stats, topic, summary, history, question, answer, nest_level):
+    """
+    The original judge -> concept -> (new concept) -> next question chain.
+
+    The judge and concept prompts are independent, so they run concurrently;
+    only the next-question prompt waits for both.
+    """
+    concept_label, concept_prompt = build_concept_prompt(topic, history, answer, nest_level)
+    feedback = cached_verdict(stats, topic, summary, history, question, answer)
+    if feedback is not None:
+        concept = _call(stats, {concept_label: concept_prompt})[concept_label]
+    else:
+        judge_prompt = build_judge_prompt(topic, summary, history, question, answer)
+        results = _call(stats, {'judge': judge_prompt, concept_label: concept_prompt})
+        feedback, concept = results['judge'], results[concept_label]
+        judge_cache.store(question, answer, feedback)
+
+    next_prompt = build_next_prompt(topic, summary, nest_level, concept, feedback)
+    compliment, next_question = parse_response(_call(stats, {'next_question': next_prompt})['next_question'])
+
+    return {
+        'feedback': feedback,
+        'is_correct': is_correct_feedback(feedback),
+        'concept': concept,
+        'compliment': compliment,
+        'question': next_question,
+    }
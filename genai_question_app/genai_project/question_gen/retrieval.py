@@ -0,0 +1,139 @@
+"""
+Chunk index over uploaded and bundled PDFs.
+
+Documents are split into overlapping chunks (DocumentChunk rows). On SQLite
+the chunks are mirrored into an FTS5 table by triggers (migration 0011) and
+ranked with bm25(); other databases fall back to a plain keyword filter.
+
+Each quiz turn asks for the few chunks most relevant to the current concept,
+so prompt size stays fixed no matter how long the document is or where in
+it the material sits.
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import Q
+
+from .documents import iter_pages
+from .models import DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'question_gen_documentchunk_fts'
+
+STOPWORDS = {
+    'the', 'and', 'for', 'are', 'was', 'what', 'which', 'how', 'why', 'does', 'with', 'that', 'this',
+    'you', 'your', 'about', 'from', 'into', 'can', 'its', 'between', 'when', 'use', 'used', 'know',
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def notes_source(topic):
+    return f'notes:{topic}'
+
+
+def chunk_text(pages, size=None, overlap=None):
+    """Yield ~`size`-character chunks of the page texts, each overlapping the previous by `overlap`."""
+    size = size or _setting('RETRIEVAL_CHUNK_CHARS', 1000)
+    overlap = overlap if overlap is not None else _setting('RETRIEVAL_CHUNK_OVERLAP', 150)
+    buffer = ''
+    for page in pages:
+        buffer = f"{buffer} {page}" if buffer else page
+        while len(buffer) >= size:
+            # Break on whitespace so words aren't cut in half
+            cut = buffer.rfind(' ', size - overlap, size)
+            cut = cut if cut > 0 else size
+            yield buffer[:cut].strip()
+            start = buffer.find(' ', cut - overlap, cut)
+            buffer = buffer[(start if start >= 0 else cut - overlap):].lstrip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def index_document(source, file_obj, title=''):
+    """(Re)index the PDF in `file_obj` under `source`. Returns the number of chunks."""
+    pages = iter_pages(
+        file_obj,
+        max_pages=_setting('DOCUMENT_INDEX_MAX_PAGES', 300),
+        time_limit=_setting('DOCUMENT_INDEX_TIME_LIMIT', 60),
+    )
+    return index_pages(source, pages, title)
+
+
+def index_pages(source, pages, title=''):
+    """(Re)index already extracted page texts under `source`."""
+    chunks = [
+        DocumentChunk(source=source, title=title, position=position, text=text)
+        for position, text in enumerate(chunk_text(pages))
+    ]
+    with transaction.atomic():
+        DocumentChunk.objects.filter(source=source).delete()
+        DocumentChunk.objects.bulk_create(chunks, batch_size=200)
+    logger.info("Indexed %d chunk(s) for %s", len(chunks), source)
+    return len(chunks)
+
+
+def is_indexed(source):
+    return DocumentChunk.objects.filter(source=source).exists()
+
+
+def _terms(query):
+    words = re.findall(r'\w+', query.lower())
+    terms = []
+    for word in words:
+        if len(word) > 2 and word not in STOPWORDS and word not in terms:
+            terms.append(word)
+    return terms[:12]
+
+
+def _fts_search(source, terms, k):
+    match = ' OR '.join(f'"{term}"' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT c.text FROM {FTS_TABLE} f JOIN question_gen_documentchunk c ON c.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND c.source = %s ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+            [match, source, k],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _keyword_search(source, terms, k):
+    condition = Q()
+    for term in terms:
+        condition |= Q(text__icontains=term)
+    texts = DocumentChunk.objects.filter(condition, source=source).values_list('text', flat=True)[:k * 10]
+    # Rank by how many query terms each chunk contains
+    scored = sorted(texts, key=lambda text: -sum(term in text.lower() for term in terms))
+    return scored[:k]
+
+
+def search(source, query, k=None):
+    """Top-k chunk texts of `source` for `query`, best first."""
+    k = k or _setting('RETRIEVAL_TOP_K', 3)
+    terms = _terms(query)
+    if not source or not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        try:
+            return _fts_search(source, terms, k)
+        except OperationalError as e:
+            # SQLite built without FTS5, or the table is missing
+            logger.warning("FTS search unavailable, using keyword search: %s", e)
+    return _keyword_search(source, terms, k)
+
+
+def context_for(source, query):
+    """Best chunks for `query`, joined and capped at RETRIEVAL_CONTEXT_CHARS."""
+    budget = _setting('RETRIEVAL_CONTEXT_CHARS', 1800)
+    parts, used = [], 0
+    for text in search(source, query):
+        if used >= budget:
+            break
+        parts.append(text[:budget - used])
+        used += len(parts[-1])
+    return ' ... '.join(parts)
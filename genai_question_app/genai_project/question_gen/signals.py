@@ -0,0 +1,45 @@
+"""
+Drops cached dashboard fragments (dashboard.py) when the rows behind them
+change, and re-parses a mentor's skills when they are saved.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import dashboard, skills
+from .models import ChatMessage, Conversation, InterviewRequest, User
+
+
+@receiver([post_save, post_delete], sender=InterviewRequest)
+def interview_request_changed(sender, instance, **kwargs):
+    dashboard.invalidate('pending', instance.interviewer_id)
+
+
+@receiver([post_save, post_delete], sender=ChatMessage)
+def chat_message_changed(sender, instance, **kwargs):
+    dashboard.invalidate_chat(instance.sender_id, instance.receiver_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Logging in saves last_login only; nothing shown on the dashboards
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    dashboard.invalidate(dashboard.MENTORS)
+    if kwargs.get('created') is False:
+        # Mentors' pending requests and chat lists show this user's name. (A new user has
+        # neither; a deleted one cascades to its requests / messages, whose signals cover it.)
+        _invalidate_mentors_of(instance)
+    if kwargs.get('created') is not None and instance.user_type == 'interviewer':
+        # post_save only: keep the searchable skill rows in step with the skills text
+        skills.sync_user_skills(instance)
+
+
+def _invalidate_mentors_of(user):
+    pending = set(
+        InterviewRequest.objects.filter(student=user, status='pending').values_list('interviewer_id', flat=True)
+    )
+    if pending:
+        dashboard.invalidate('pending', *pending)
+    chats = list(Conversation.objects.filter(student=user).values_list('interviewer_id', flat=True))
+    if chats:
+        dashboard.invalidate_chat(*chats)
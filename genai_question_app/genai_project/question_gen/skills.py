@@ -0,0 +1,104 @@
+"""
+Mentor skills and search.
+
+User.skills stays the free-text field mentors fill in ("Java, System
+Design, DSA"); it is parsed into Skill rows linked through MentorSkill
+whenever a mentor is saved (signals.py), so search can join on indexed
+skill ids instead of scanning text.
+
+search() filters by skills (any of them), company and role, ranks by how
+many of the requested skills a mentor has, and pages with a
+(matches, id) keyset cursor.
+"""
+import re
+
+from django.conf import settings
+from django.db.models import Count, IntegerField, Q, Value
+from django.db.models.functions import Lower
+
+from .models import MAX_ID, MentorSkill, Skill, User
+
+SEPARATORS = re.compile(r'[,;/\n|]+')
+
+
+def normalize(name):
+    """'  System   Design ' -> 'system design'."""
+    return ' '.join(name.lower().split())[:50]
+
+
+def parse(text):
+    """Skill names in a free-text list, normalized and de-duplicated (order kept)."""
+    names = []
+    for part in SEPARATORS.split(text or ''):
+        name = normalize(part)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def sync_user_skills(user):
+    """Make the user's MentorSkill rows match their `skills` text."""
+    names = set(parse(user.skills))
+    current = dict(MentorSkill.objects.filter(user=user).values_list('skill__name', 'id'))
+    stale = [link_id for name, link_id in current.items() if name not in names]
+    if stale:
+        MentorSkill.objects.filter(id__in=stale).delete()
+    missing = names - current.keys()
+    if missing:
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+        MentorSkill.objects.bulk_create(
+            [MentorSkill(user=user, skill=skill) for skill in Skill.objects.filter(name__in=missing)],
+            ignore_conflicts=True,
+        )
+
+
+def encode_cursor(mentor):
+    return f"{getattr(mentor, 'matches', 0)}-{mentor.id}"
+
+
+def decode_cursor(cursor):
+    """(matches, id) from encode_cursor(); ValueError if it isn't one."""
+    matches, mentor_id = (int(part) for part in cursor.split('-'))  # ValueError unless two numbers
+    if not (0 <= matches <= MAX_ID and 0 < mentor_id <= MAX_ID):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return matches, mentor_id
+
+
+def search(skill_names=(), company='', role='', cursor=None, limit=None):
+    """
+    One page of mentors, best match first. Returns (mentors, next cursor or None);
+    each mentor has `matches` (requested skills it has) and prefetched skill_tags.
+    Raises ValueError for a cursor that search() didn't hand out.
+    """
+    limit = limit or getattr(settings, 'MENTOR_SEARCH_PAGE_SIZE', 20)
+    mentors = User.objects.filter(user_type='interviewer')
+    # LOWER(...) = value matches the user_company_idx / user_role_idx expression indexes
+    if company:
+        mentors = mentors.alias(company_lower=Lower('company')).filter(company_lower=company.strip().lower())
+    if role:
+        mentors = mentors.alias(role_lower=Lower('role')).filter(role_lower=role.strip().lower())
+
+    skill_ids = list(Skill.objects.filter(name__in=[normalize(name) for name in skill_names]).values_list('id', flat=True))
+    if skill_names and not skill_ids:
+        return [], None
+    if skill_ids:
+        # Join only the requested skills' links (mentorskill_skill_user_idx) and count them per mentor
+        mentors = mentors.filter(mentor_skills__skill_id__in=skill_ids).annotate(matches=Count('mentor_skills'))
+    else:
+        mentors = mentors.annotate(matches=Value(0, output_field=IntegerField()))
+
+    if cursor:
+        matches, mentor_id = decode_cursor(cursor)
+        mentors = mentors.filter(Q(matches__lt=matches) | Q(matches=matches, id__lt=mentor_id))
+
+    page = list(mentors.order_by('-matches', '-id').prefetch_related('skill_tags')[:limit + 1])
+    following = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], following
+
+
+def skill_facets(limit=20):
+    """Most common skills among mentors, as (name, mentor count) pairs."""
+    return list(
+        Skill.objects.annotate(count=Count('mentor_links')).filter(count__gt=0)
+        .order_by('-count', 'name').values_list('name', 'count')[:limit]
+    )
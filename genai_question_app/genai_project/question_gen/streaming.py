@@ -0,0 +1,129 @@
+"""
+Server-sent-events delivery of quiz output.
+
+Instead of blocking until every Gemini response is complete, the streaming
+endpoints forward the verdict and the next question chunk by chunk as the
+model produces them. Events:
+
+    verdict   {"text": chunk}        judge feedback as it arrives
+    question  {"text": chunk}        next (or opening) question as it arrives
+    done      {...}                  final result, already saved by on_done()
+    error     {"message": text}
+
+The generators are synchronous; under ASGI the view wraps them with
+as_async() so each event is still sent as soon as it is produced.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import judge_cache, llm
+from .fanout import submit
+from .quiz_engine import (
+    build_concept_prompt, build_judge_prompt, build_next_prompt, build_opening_prompt,
+    cached_verdict, is_correct_feedback, parse_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def as_async(events):
+    """
+    Serve a sync event generator to an ASGI server one event at a time.
+
+    Given a sync iterator, Django's ASGI handler reads it to the end before
+    sending anything. Every step runs on the request's own sync thread
+    (thread_sensitive), where the view and its DB connection live. Closing
+    early (client gone) closes the generator, so LLM streams are released.
+    """
+    step = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            event = await step(events, None)
+            if event is None:
+                return
+            yield event
+    finally:
+        if hasattr(events, 'close'):
+            await sync_to_async(events.close, thread_sensitive=True)()
+
+
+def _error(e):
+    if isinstance(e, llm.LLMUnavailable):
+        message = llm.AI_BUSY_MESSAGE
+    else:
+        message = f"Error: {e}"
+    return sse('error', {'message': message})
+
+
+def stream_opening(topic, summary, on_done):
+    """Stream the opening question; on_done(compliment, question) saves it and returns the done payload."""
+    parts = []
+    try:
+        for chunk in llm.stream(build_opening_prompt(topic, summary), kind='opening'):
+            parts.append(chunk)
+            yield sse('question', {'text': chunk})
+        compliment, question = parse_response(''.join(parts).strip())
+        yield sse('done', on_done(compliment, question))
+    except llm.LLMError as e:
+        logger.warning("Opening question stream failed: %s", e)
+        yield _error(e)
+
+
+def stream_turn(topic, summary, history, question, answer, nest_level, candidate, on_done):
+    """
+    Stream one quiz turn: the judge verdict, then the next question.
+
+    The concept prompt runs in the background while the verdict streams.
+    With a prefetched `candidate` the next question is sent in one piece.
+    on_done(turn) saves the result and returns the done payload.
+    """
+    concept_future = None
+    if candidate is None:
+        concept_label, concept_prompt = build_concept_prompt(topic, history, answer, nest_level)
+        concept_future = submit(lambda: llm.generate(concept_prompt, kind=concept_label))
+
+    try:
+        feedback = cached_verdict({}, topic, summary, history, question, answer)
+        if feedback is not None:
+            yield sse('verdict', {'text': feedback})
+        else:
+            parts = []
+            for chunk in llm.stream(build_judge_prompt(topic, summary, history, question, answer), kind='judge'):
+                parts.append(chunk)
+                yield sse('verdict', {'text': chunk})
+            feedback = ''.join(parts).strip()
+            judge_cache.store(question, answer, feedback)
+
+        if candidate is not None:
+            concept, compliment, next_question = candidate['concept'], candidate['compliment'], candidate['question']
+            yield sse('question', {'text': f"{compliment} {next_question}".strip()})
+        else:
+            concept = concept_future.result(timeout=getattr(settings, 'LLM_CALL_TIMEOUT', 30))
+            parts = []
+            next_prompt = build_next_prompt(topic, summary, nest_level, concept, feedback)
+            for chunk in llm.stream(next_prompt, kind='next_question'):
+                parts.append(chunk)
+                yield sse('question', {'text': chunk})
+            compliment, next_question = parse_response(''.join(parts).strip())
+
+        yield sse('done', on_done({
+            'feedback': feedback,
+            'is_correct': is_correct_feedback(feedback),
+            'concept': concept,
+            'compliment': compliment,
+            'question': next_question,
+            'next_level': 1 if nest_level == 0 else 0,
+        }))
+    except Exception as e:
+        logger.warning("Quiz turn stream failed: %s", e)
+        yield _error(e)
+    finally:
+        if concept_future is not None:
+            concept_future.cancel()
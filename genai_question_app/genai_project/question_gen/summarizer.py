@@ -0,0 +1,141 @@
+"""
+Map-reduce summarization for documents too long for one prompt.
+
+  extract  page ranges are parsed in a process pool (PyPDF2 is CPU-bound)
+  map      token-bounded chunks are summarized concurrently on a bounded
+           thread pool (the LLM gateway still applies its own limits)
+  reduce   partial summaries are merged SUMMARY_REDUCE_FANIN at a time,
+           level by level, until one summary is left
+
+So wall-clock time grows with pages / cores and chunks / concurrent calls
+rather than with the page count. Used by the document worker (jobs.py).
+"""
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from . import llm, pdfpages
+from .retrieval import chunk_text
+
+logger = logging.getLogger(__name__)
+
+_process_pool = None
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _get_process_pool():
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=_setting('SUMMARY_PROCESSES', 4))
+    return _process_pool
+
+
+def shutdown():
+    """Stop the process pool; worker processes can't exit while its children are alive."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown()
+        _process_pool = None
+
+
+def extract_pages(data, max_pages=None):
+    """Text of every page of the PDF in `data` (up to `max_pages`), parsed across processes."""
+    max_pages = max_pages or _setting('DOCUMENT_INDEX_MAX_PAGES', 300)
+    total = min(pdfpages.page_count(data), max_pages)
+    processes = _setting('SUMMARY_PROCESSES', 4)
+    # Small documents aren't worth shipping to other processes
+    if processes <= 1 or total <= _setting('SUMMARY_MIN_PAGES_PER_PROCESS', 10):
+        return pdfpages.extract_range(data, 0, total)
+
+    step = max(math.ceil(total / processes), _setting('SUMMARY_MIN_PAGES_PER_PROCESS', 10))
+    starts = list(range(0, total, step))
+    stops = [min(start + step, total) for start in starts]
+    parts = _get_process_pool().map(
+        pdfpages.extract_range, [data] * len(starts), starts, stops,
+        timeout=_setting('DOCUMENT_INDEX_TIME_LIMIT', 60),
+    )
+    return [text for part in parts for text in part]
+
+
+def _generate_all(prompts, kind):
+    """Run prompts on a bounded thread pool, keeping their order."""
+    def _one(prompt):
+        try:
+            return llm.generate(prompt, kind=kind)
+        finally:
+            connection.close()
+
+    workers = min(_setting('SUMMARY_MAX_CONCURRENCY', 8), len(prompts))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='summarize') as pool:
+        return list(pool.map(_one, prompts))
+
+
+def _final_prompt(topic, text):
+    # Same wording as the single-prompt summary in documents.py
+    return f"Summarize key points briefly (focus on {topic}): {text}"
+
+
+def _group(partials, max_chars):
+    """Batches of at most SUMMARY_REDUCE_FANIN partials and about `max_chars` characters."""
+    fanin = max(_setting('SUMMARY_REDUCE_FANIN', 8), 2)
+    groups, current, size = [], [], 0
+    for partial in partials:
+        if current and (len(current) >= fanin or size + len(partial) > max_chars):
+            groups.append(current)
+            current, size = [], 0
+        current.append(partial)
+        size += len(partial)
+    if current:
+        groups.append(current)
+    # Never leave a level that doesn't shrink
+    if len(groups) == len(partials) and len(groups) > 1:
+        groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+    return groups
+
+
+def summarize_pages(pages, topic):
+    """Summarize page texts. Returns (summary, timings) with per-stage seconds and counts."""
+    max_chars = _setting('SUMMARY_CHUNK_TOKENS', 3000) * 4  # ~4 characters per token
+    chunks = list(chunk_text(pages, size=max_chars, overlap=0))
+    timings = {'chunks': len(chunks), 'reduce_levels': 0}
+    if not chunks:
+        return '', timings
+
+    start = time.perf_counter()
+    if len(chunks) == 1:
+        summary = llm.generate(_final_prompt(topic, chunks[0]), kind='summary')
+        timings['map'] = round(time.perf_counter() - start, 3)
+        return summary, timings
+
+    partials = _generate_all([
+        f"Summarize this part of a document about {topic} in a few bullet points, "
+        f"keeping definitions and key facts:\n{chunk}"
+        for chunk in chunks
+    ], kind='summary_map')
+    timings['map'] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    while True:
+        groups = _group(partials, max_chars)
+        timings['reduce_levels'] += 1
+        if len(groups) == 1:
+            summary = llm.generate(_final_prompt(topic, '\n'.join(groups[0])), kind='summary')
+            break
+        partials = _generate_all([
+            f"Summarize these partial summaries of a document about {topic} into one set of key points, "
+            f"removing repetition:\n" + '\n'.join(group)
+            for group in groups
+        ], kind='summary_reduce')
+    timings['reduce'] = round(time.perf_counter() - start, 3)
+    logger.info(
+        "Map-reduce summary: %d chunk(s), ~%d tokens in, %d reduce level(s)",
+        len(chunks), sum(len(c) for c in chunks) // 4, timings['reduce_levels'],
+    )
+    return summary, timings
@@ -0,0 +1,16 @@
+"""
+Tests for question_gen. Run with `python manage.py test question_gen.tests`.
+
+Everything runs offline against the fake LLM backend.
+"""
+
+# Fake LLM and no background work, so tests only see what they trigger themselves
+TEST_SETTINGS = {
+    'LLM_BACKEND': 'fake',
+    'LLM_FAKE_LATENCY': 0,
+    'LLM_FAKE_FAILURE_RATE': 0,
+    'LLM_CACHE_ENABLED': False,
+    'JUDGE_CACHE_ENABLED': False,
+    'QUIZ_PREFETCH_ENABLED': False,
+    'QUIZ_STREAMING_ENABLED': False,
+}
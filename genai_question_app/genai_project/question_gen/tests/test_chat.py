@@ -0,0 +1,60 @@
+"""Chat history paging and marking messages read once they reach the open thread."""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import chat
+from ..models import ChatMessage, User
+
+
+class MarkReadOnDeliveryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = User.objects.create(username='mentor', user_type='interviewer')
+        cls.student = User.objects.create(username='student')
+
+    def test_polled_messages_are_marked_read(self):
+        seen = chat.send(self.mentor, self.student, 'hello')
+        self.client.force_login(self.student)
+        url = reverse('chat_updates', args=[self.mentor.id])
+
+        own = chat.send(self.student, self.mentor, 'hi')
+        self.client.get(f'{url}?after={seen.id}')
+        self.assertEqual(chat.unread_counts(self.student), {self.mentor.id: 1})  # only its own message came back
+
+        new = chat.send(self.mentor, self.student, 'how are you?')
+        data = self.client.get(f'{url}?after={own.id}').json()
+        self.assertEqual([message['id'] for message in data['messages']], [new.id])
+        self.assertEqual(chat.unread_counts(self.student), {})
+        # The sender's own messages stay unread until the mentor sees them
+        self.assertFalse(ChatMessage.objects.get(id=own.id).is_read)
+
+
+@override_settings(CHAT_PAGE_SIZE=2)
+class ChatHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = User.objects.create(username='mentor', user_type='interviewer')
+        cls.student = User.objects.create(username='student')
+        cls.sent = [chat.send(cls.student, cls.mentor, f'message {i}') for i in range(5)]
+
+    def setUp(self):
+        self.client.force_login(self.student)
+        self.url = reverse('chat_history', args=[self.mentor.id])
+
+    def test_pages_back_to_the_first_message(self):
+        _, older = chat.page(self.student, self.mentor)
+        seen = []
+        while older:
+            data = self.client.get(self.url, {'before': older}).json()
+            seen = [m for m in (f'message {i}' for i in range(5)) if m in data['html']] + seen
+            older = data['older_url'].partition('before=')[2]
+        self.assertEqual(seen, [f'message {i}' for i in range(3)])
+
+    def test_bad_cursor_is_rejected(self):
+        for cursor in ('soon', '1-2-3', '1-0', '1-99999999999999999999', '99999999999999999999999-1'):
+            self.assertEqual(self.client.get(self.url, {'before': cursor}).status_code, 400, cursor)
+
+    def test_only_chat_partners(self):
+        other_student = User.objects.create(username='other')
+        response = self.client.get(reverse('chat_history', args=[other_student.id]))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,90 @@
+"""WebSocket chat: batched saves, frame validation and failed batches."""
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TransactionTestCase, override_settings
+
+from .. import consumers
+from ..models import ChatMessage, User
+from ..routing import websocket_urlpatterns
+from . import TEST_SETTINGS
+
+application = URLRouter(websocket_urlpatterns)
+
+
+@override_settings(**TEST_SETTINGS, CHAT_WRITE_BATCH_SIZE=3, CHAT_WRITE_FLUSH_INTERVAL=0.05,
+                   CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ChatConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.mentor = User.objects.create(username='mentor', user_type='interviewer')
+        self.student = User.objects.create(username='student')
+
+    async def connect(self, user, other_user):
+        communicator = WebsocketCommunicator(application, f'/ws/chat/{other_user.id}/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_messages_are_saved_in_one_batch_and_pushed_to_both_sides(self):
+        student = await self.connect(self.student, self.mentor)
+        mentor = await self.connect(self.mentor, self.student)
+        with mock.patch.object(consumers, 'save_messages', wraps=consumers.save_messages) as save:
+            for text in ('one', 'two', 'three'):
+                await student.send_json_to({'message': text})
+            frames = [await mentor.receive_json_from() for _ in range(3)]
+            echoed = [await student.receive_json_from() for _ in range(3)]
+
+        save.assert_called_once()
+        self.assertEqual([frame['message'] for frame in frames], ['one', 'two', 'three'])
+        self.assertEqual(frames, echoed)
+        ids = await sync_to_async(lambda: list(ChatMessage.objects.order_by('id').values_list('id', flat=True)))()
+        self.assertEqual([frame['id'] for frame in frames], ids)
+        await student.disconnect()
+        await mentor.disconnect()
+
+    async def test_delivery_to_the_open_thread_marks_read(self):
+        student = await self.connect(self.student, self.mentor)
+        await student.send_json_to({'message': 'anyone there?'})
+        await student.receive_json_from(timeout=2)
+        unread = sync_to_async(lambda: list(ChatMessage.objects.filter(is_read=False).values_list('message', flat=True)))
+        self.assertEqual(await unread(), ['anyone there?'])  # the mentor hasn't got the chat open
+
+        mentor = await self.connect(self.mentor, self.student)
+        await student.send_json_to({'message': 'hello'})
+        await mentor.receive_json_from(timeout=2)
+        await student.receive_json_from(timeout=2)
+        self.assertTrue(await mentor.receive_nothing(timeout=0.1))  # lets the mentor's mark_read finish
+        self.assertEqual(await unread(), [])
+        await student.disconnect()
+        await mentor.disconnect()
+
+    async def test_timer_flushes_a_partial_batch(self):
+        student = await self.connect(self.student, self.mentor)
+        await student.send_json_to({'message': 'hello'})
+        self.assertEqual((await student.receive_json_from(timeout=2))['message'], 'hello')
+        await student.disconnect()
+
+    async def test_malformed_frames_get_an_error(self):
+        student = await self.connect(self.student, self.mentor)
+        for frame in ('not json', '["hello"]', '{"message": 5}'):
+            await student.send_to(text_data=frame)
+            self.assertIn('error', await student.receive_json_from())
+        await student.send_json_to({'message': '   '})
+        self.assertTrue(await student.receive_nothing(timeout=0.2))
+        self.assertEqual(await sync_to_async(ChatMessage.objects.count)(), 0)
+        await student.disconnect()
+
+    async def test_sender_gets_the_text_back_when_the_batch_is_not_saved(self):
+        student = await self.connect(self.student, self.mentor)
+        mentor = await self.connect(self.mentor, self.student)
+        with mock.patch.object(consumers, 'save_messages', side_effect=RuntimeError('db down')), \
+                self.assertLogs(consumers.logger, 'ERROR'):
+            await student.send_json_to({'message': 'lost?'})
+            frame = await student.receive_json_from(timeout=2)
+        self.assertEqual(frame, {'error': consumers.NOT_SAVED, 'message': 'lost?'})
+        self.assertTrue(await mentor.receive_nothing(timeout=0.2))
+        await student.disconnect()
+        await mentor.disconnect()
@@ -0,0 +1,34 @@
+"""Fan-out pool for independent LLM prompts."""
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .. import fanout
+
+
+class FanoutTests(SimpleTestCase):
+    def test_runs_tasks_concurrently(self):
+        start = time.perf_counter()
+        results, timings = fanout.run_parallel({
+            'a': lambda: time.sleep(0.2) or 'A',
+            'b': lambda: time.sleep(0.2) or 'B',
+        })
+        self.assertLess(time.perf_counter() - start, 0.35)
+        self.assertEqual(results, {'a': 'A', 'b': 'B'})
+        self.assertEqual(set(timings), {'a', 'b'})
+
+    def test_reraises_first_failure(self):
+        def fail():
+            raise ValueError('boom')
+        with self.assertRaisesMessage(ValueError, 'boom'):
+            fanout.run_parallel({'ok': lambda: 1, 'bad': fail})
+        with self.assertRaises(fanout.FanoutTimeout):
+            fanout.run_parallel({'slow': lambda: time.sleep(0.2)}, timeout=0.05)
+
+    def test_tasks_close_stale_connections(self):
+        with mock.patch.object(fanout, 'close_old_connections') as close:
+            self.assertEqual(fanout.submit(lambda: 'done').result(), 'done')
+            self.assertEqual(close.call_count, 2)
+            fanout.run_parallel({'a': lambda: 1, 'b': lambda: 2})
+            self.assertEqual(close.call_count, 6)
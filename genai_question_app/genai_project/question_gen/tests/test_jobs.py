@@ -0,0 +1,93 @@
+"""Document job queue: claiming, retries with backoff and stale-lock recovery."""
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import jobs
+from ..models import DocumentJob, User
+
+
+@override_settings(DOCUMENT_JOB_MAX_ATTEMPTS=3, DOCUMENT_JOB_RETRY_DELAY=10, DOCUMENT_JOB_LOCK_TIMEOUT=300)
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='student')
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_root = override_settings(MEDIA_ROOT=media)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def job(self, **fields):
+        return DocumentJob.objects.create(user=self.user, content_hash='abc', **fields)
+
+    def test_claims_oldest_runnable_job_once(self):
+        now = timezone.now()
+        later = self.job(available_at=now + timedelta(minutes=5))
+        second = self.job(available_at=now - timedelta(seconds=1))
+        first = self.job(available_at=now - timedelta(seconds=2))
+
+        claimed = jobs.claim('w1')
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), ('running', 'w1', 1))
+        self.assertEqual(jobs.claim('w2').id, second.id)
+        self.assertIsNone(jobs.claim('w3'))  # `later` isn't due yet
+        self.assertEqual(DocumentJob.objects.get(id=later.id).status, 'queued')
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        self.job()
+        with mock.patch.object(jobs, '_process', side_effect=RuntimeError('bad pdf')):
+            for attempt, delay in [(1, 10), (2, 20)]:
+                job = jobs.claim('w1')
+                self.assertEqual(job.attempts, attempt)
+                before = timezone.now()
+                self.assertFalse(jobs.run(job))
+                job.refresh_from_db()
+                self.assertEqual((job.status, job.error, job.locked_by), ('queued', 'bad pdf', ''))
+                self.assertAlmostEqual((job.available_at - before).total_seconds(), delay, delta=1)
+                DocumentJob.objects.update(available_at=timezone.now())
+
+            job = jobs.claim('w1')
+            self.assertFalse(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+        self.assertIsNotNone(job.finished_at)
+        self.assertIsNone(jobs.claim('w1'))
+
+    def test_success_stores_the_summary(self):
+        self.job()
+        job = jobs.claim('w1')
+        with mock.patch.object(jobs, '_process', return_value=('Key points', 4, {'total': 0.1})):
+            self.assertTrue(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.summary, job.pages_parsed, job.locked_by), ('done', 'Key points', 4, ''))
+
+    def test_stale_lock_is_requeued_and_old_worker_cannot_finish(self):
+        job = self.job()
+        job.document.save('notes.pdf', ContentFile(b'%PDF-1.4'))
+        stale = jobs.claim('dead-worker')
+        DocumentJob.objects.update(locked_at=timezone.now() - timedelta(seconds=301))
+        self.assertEqual(jobs.requeue_stale(), 1)
+
+        fresh = jobs.claim('w2')
+        self.assertEqual((fresh.id, fresh.attempts), (stale.id, 2))
+        # The first worker wakes up and reports: its lease is gone, so nothing changes
+        with mock.patch.object(jobs, '_process', return_value=('late', 1, {})):
+            self.assertFalse(jobs.run(stale))
+        with mock.patch.object(jobs, '_process', side_effect=RuntimeError('bad pdf')):
+            self.assertFalse(jobs.run(stale))
+        fresh.refresh_from_db()
+        self.assertEqual((fresh.status, fresh.locked_by, fresh.error), ('running', 'w2', ''))
+        # The upload is still there for the new owner
+        self.assertEqual(fresh.document.name, stale.document.name)
+        self.assertTrue(fresh.document.storage.exists(fresh.document.name))
+
+        # A recent lock is left alone
+        self.assertEqual(jobs.requeue_stale(), 0)
@@ -0,0 +1,89 @@
+"""Semantic judge cache: vectors, threshold, per-question limits and audits."""
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import judge_cache, quiz_engine
+from ..models import JudgedAnswer
+from . import TEST_SETTINGS
+
+QUESTION = 'What does the JVM do?'
+ANSWER = 'It runs Java bytecode on any platform'
+
+
+class VectorTests(SimpleTestCase):
+    def similarity(self, a, b):
+        return float(judge_cache.densify(judge_cache.vectorize(a)) @ judge_cache.densify(judge_cache.vectorize(b)))
+
+    def test_sparse_unit_vectors(self):
+        buckets, weights = judge_cache.vectorize(ANSWER)
+        self.assertEqual(buckets.dtype, np.uint16)
+        self.assertLess(len(buckets), 200)
+        self.assertAlmostEqual(float(np.linalg.norm(weights.astype(np.float32))), 1.0, places=2)
+        self.assertEqual(len(judge_cache.vectorize('')[0]), 0)
+
+    def test_encode_round_trip(self):
+        vec = judge_cache.vectorize(ANSWER)
+        blob = judge_cache.encode(vec)
+        self.assertEqual(len(blob), 4 * len(vec[0]))
+        for original, decoded in zip(vec, judge_cache.decode(memoryview(blob))):
+            np.testing.assert_array_equal(original, decoded)
+
+    def test_similarity(self):
+        self.assertGreater(self.similarity(ANSWER, 'it runs java  bytecode on any platform!'), 0.95)
+        self.assertLess(self.similarity(ANSWER, 'A garbage collector for C++ programs'), 0.5)
+
+
+@override_settings(**dict(TEST_SETTINGS, JUDGE_CACHE_ENABLED=True), JUDGE_CACHE_THRESHOLD=0.9,
+                   JUDGE_CACHE_ANSWERS_PER_QUESTION=3, JUDGE_CACHE_AUDIT_RATE=1)
+class JudgeCacheTests(TestCase):
+    def setUp(self):
+        judge_cache.reset()
+        self.addCleanup(judge_cache.reset)
+
+    def test_close_answers_reuse_the_verdict(self):
+        judge_cache.store(QUESTION, ANSWER, 'Correct!')
+        hit = judge_cache.lookup(QUESTION, 'It runs Java bytecode on any platform.')
+        self.assertEqual(hit.verdict, 'Correct!')
+        self.assertEqual(JudgedAnswer.objects.get(id=hit.entry_id).hits, 1)
+
+        self.assertIsNone(judge_cache.lookup(QUESTION, 'It compiles C code'))
+        self.assertIsNone(judge_cache.lookup('Another question', ANSWER))
+        with override_settings(JUDGE_CACHE_THRESHOLD=0.999):
+            self.assertIsNone(judge_cache.lookup(QUESTION, 'it runs java bytecode on every platform'))
+
+    def test_keeps_newest_answers_per_question(self):
+        answers = [f'{ANSWER} variant {word}' for word in ('alpha', 'bravo', 'charlie', 'delta', 'echo')]
+        for answer in answers:
+            judge_cache.store(QUESTION, answer, 'Correct!')
+        judge_cache.store('Another question', ANSWER, 'Correct!')
+
+        stored = JudgedAnswer.objects.filter(question_hash=judge_cache.question_hash(QUESTION))
+        self.assertEqual(list(stored.order_by('id').values_list('answer', flat=True)), answers[2:])
+        self.assertEqual(JudgedAnswer.objects.count(), 4)
+
+        index = judge_cache._get_index(judge_cache.question_hash(QUESTION))
+        self.assertEqual(index.entry_ids, set(stored.values_list('id', flat=True)))
+        judge_cache.reset()  # reloaded from the DB, same rows
+        index = judge_cache._get_index(judge_cache.question_hash(QUESTION))
+        self.assertEqual(index.entry_ids, set(stored.values_list('id', flat=True)))
+        self.assertAlmostEqual(judge_cache.lookup(QUESTION, answers[-1]).similarity, 1.0, places=2)
+
+    def test_audit_records_disagreement(self):
+        judge_cache.store(QUESTION, ANSWER, 'Correct!')
+        hit = judge_cache.lookup(QUESTION, ANSWER)
+        with mock.patch.object(judge_cache, 'submit', side_effect=lambda fn: fn()):
+            judge_cache.maybe_audit(hit, lambda: 'Incorrect: wrong')
+            judge_cache.maybe_audit(hit, lambda: 'Correct!')
+        entry = JudgedAnswer.objects.get(id=hit.entry_id)
+        self.assertEqual((entry.audits, entry.audit_mismatches), (2, 1))
+
+    def test_audit_skips_the_llm_response_cache(self):
+        judge_cache.store(QUESTION, ANSWER, 'Correct!')
+        with mock.patch.object(judge_cache, 'submit', side_effect=lambda fn: fn()), \
+                mock.patch.object(quiz_engine.llm, 'generate', return_value='Correct!') as generate:
+            stats = {}
+            verdict = quiz_engine.cached_verdict(stats, 'java', '', [], QUESTION, ANSWER)
+        self.assertEqual(verdict, 'Correct!')
+        self.assertEqual(generate.call_args.kwargs['use_cache'], False)
@@ -0,0 +1,127 @@
+"""LLM gateway: fake backend, retries, circuit breaker and streams, all offline."""
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .. import llm, metrics
+from . import TEST_SETTINGS
+
+
+class FlakyBackend(llm.FakeBackend):
+    """FakeBackend whose first `failures` calls raise a transient error."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.calls = 0
+
+    def generate(self, prompt, model, schema=None, timeout=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise llm.TransientLLMError("flaky")
+        return super().generate(prompt, model, schema, timeout)
+
+
+@override_settings(**TEST_SETTINGS, LLM_RETRY_BACKOFF=0, LLM_BREAKER_THRESHOLD=2, LLM_BREAKER_COOLDOWN=0.05)
+class GatewayTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        llm.reset()
+        self.addCleanup(llm.reset)
+
+    def use_backend(self, backend):
+        patcher = mock.patch.object(llm, 'get_backend', return_value=backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return backend
+
+    def open_breaker(self):
+        self.use_backend(FlakyBackend(failures=100))
+        for _ in range(2):
+            with self.assertRaises(llm.LLMError):
+                llm.generate('hello')
+        self.assertEqual(llm.get_breaker().state, 'open')
+
+    # ==================== FAKE BACKEND ====================
+    def test_fake_backend_is_deterministic(self):
+        self.assertEqual(llm.generate('Explain closures'), llm.generate('Explain closures'))
+        verdict = llm.generate("Q: x\nA: y\nCorrect? Reply only 'Correct!' or 'Incorrect: [short reason]'")
+        self.assertIn(verdict, ['Correct!', 'Incorrect: missing key details'])
+
+    @override_settings(LLM_FAKE_FAILURE_RATE=0.3, LLM_FAKE_SEED=7)
+    def test_fake_backend_failure_rate(self):
+        backend = llm.FakeBackend()
+        failures = 0
+        for i in range(1000):
+            try:
+                backend.generate(f'prompt {i}', 'model')
+            except llm.TransientLLMError:
+                failures += 1
+        self.assertTrue(250 < failures < 350, failures)
+
+    @override_settings(LLM_FAKE_LATENCY=0.2)
+    def test_fake_backend_timeout(self):
+        with self.assertRaises(llm.LLMTimeout):
+            llm.FakeBackend().generate('slow', 'model', timeout=0.01)
+
+    # ==================== RETRIES ====================
+    def test_transient_errors_are_retried(self):
+        backend = self.use_backend(FlakyBackend(failures=2))
+        self.assertTrue(llm.generate('hello'))
+        self.assertEqual(backend.calls, 3)
+        self.assertEqual(metrics.get('llm.retries'), 2)
+        self.assertEqual(llm.get_breaker().state, 'closed')
+
+    def test_gives_up_after_max_retries(self):
+        backend = self.use_backend(FlakyBackend(failures=3))
+        with self.assertRaises(llm.LLMError):
+            llm.generate('hello')
+        self.assertEqual(backend.calls, 3)  # LLM_MAX_RETRIES = 2
+
+    @override_settings(LLM_RETRY_BACKOFF=0.5, LLM_RETRY_BACKOFF_MAX=3)
+    def test_backoff_is_jittered_and_capped(self):
+        for attempt, cap in [(0, 0.5), (1, 1), (2, 2), (5, 3)]:
+            delays = [llm._backoff(attempt) for _ in range(200)]
+            self.assertTrue(all(0 <= delay <= cap for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    # ==================== CIRCUIT BREAKER ====================
+    def test_breaker_opens_then_closes_after_a_good_trial(self):
+        self.open_breaker()
+        with self.assertRaises(llm.LLMUnavailable):
+            llm.generate('hello')
+        self.assertEqual(llm.generate('hello', fallback='degraded'), 'degraded')
+
+        time.sleep(0.06)
+        self.assertEqual(llm.get_breaker().state, 'half-open')
+        self.use_backend(llm.FakeBackend())
+        self.assertNotEqual(llm.generate('hello'), 'degraded')
+        self.assertEqual(llm.get_breaker().state, 'closed')
+
+    def test_failed_trial_reopens(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        with self.assertRaises(llm.LLMError):
+            llm.generate('hello')
+        self.assertEqual(llm.get_breaker().state, 'open')
+
+    # ==================== STREAMS ====================
+    def test_stream_yields_chunks(self):
+        chunks = list(llm.stream('Tell me about closures'))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), llm.generate('Tell me about closures'))
+
+    def test_abandoned_trial_stream_releases_the_breaker(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.use_backend(llm.FakeBackend())
+        chunks = llm.stream('Tell me about closures')
+        next(chunks)
+        chunks.close()  # client went away mid-stream
+
+        breaker = llm.get_breaker()
+        self.assertFalse(breaker.trial_running)
+        self.assertTrue(llm.generate('hello'))
+        self.assertEqual(breaker.state, 'closed')
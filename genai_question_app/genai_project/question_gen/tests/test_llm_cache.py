@@ -0,0 +1,84 @@
+"""LLM response cache: in-process and DB tiers, TTLs, opt-outs and pruning."""
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import llm, llm_cache, metrics
+from ..models import LLMCacheEntry
+from . import TEST_SETTINGS
+
+
+@override_settings(**dict(TEST_SETTINGS, LLM_CACHE_ENABLED=True), LLM_CACHE_PRUNE_PROBABILITY=0)
+class LLMCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        llm.reset()
+        self.addCleanup(llm.reset)
+
+    def test_key_ignores_whitespace_but_not_model_or_schema(self):
+        key = llm_cache.make_key('What  is\na closure?', 'm1')
+        self.assertEqual(key, llm_cache.make_key(' What is a closure? ', 'm1'))
+        self.assertNotEqual(key, llm_cache.make_key('What is a closure?', 'm2'))
+        self.assertNotEqual(key, llm_cache.make_key('What is a closure?', 'm1', {'type': 'string'}))
+
+    def test_memory_then_db_tier(self):
+        key = llm_cache.make_key('prompt', 'm1')
+        self.assertIsNone(llm_cache.get(key))
+        llm_cache.put(key, 'judge', 'm1', 'Correct!', latency_ms=120)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(llm_cache.get(key), 'Correct!')
+
+        llm_cache.reset()  # another process: only the DB tier is shared
+        self.assertEqual(llm_cache.get(key), 'Correct!')
+        with self.assertNumQueries(0):
+            self.assertEqual(llm_cache.get(key), 'Correct!')
+
+        self.assertEqual(LLMCacheEntry.objects.get(key=key).hits, 1)
+        self.assertEqual(metrics.get('llm_cache.memory_hits'), 2)
+        self.assertEqual(metrics.get('llm_cache.db_hits'), 1)
+        self.assertEqual(metrics.get('llm_cache.saved_ms'), 360)
+
+    @override_settings(LLM_CACHE_MEMORY_TTL=0.05, LLM_CACHE_TTLS={'summary': 3600}, LLM_CACHE_DEFAULT_TTL=60)
+    def test_ttls(self):
+        key = llm_cache.make_key('prompt', 'm1')
+        llm_cache.put(key, 'summary', 'm1', 'text', latency_ms=10)
+        entry = LLMCacheEntry.objects.get(key=key)
+        self.assertAlmostEqual((entry.expires_at - timezone.now()).total_seconds(), 3600, delta=5)
+
+        time.sleep(0.06)  # memory tier expired, DB row still valid
+        with self.assertNumQueries(2):
+            self.assertEqual(llm_cache.get(key), 'text')
+
+        llm_cache.reset()
+        LLMCacheEntry.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(llm_cache.get(key))
+
+    @override_settings(LLM_CACHE_EXCLUDE={'opening'})
+    def test_gateway_serves_repeats_and_skips_excluded_kinds(self):
+        backend = llm.FakeBackend()
+        with mock.patch.object(backend, 'generate', wraps=backend.generate) as generate, \
+                mock.patch.object(llm, 'get_backend', return_value=backend):
+            first = llm.generate('Explain closures', kind='concept')
+            self.assertEqual(llm.generate('Explain  closures ', kind='concept'), first)
+            self.assertEqual(generate.call_count, 1)
+
+            llm.generate('Ask an opening question', kind='opening')
+            llm.generate('Ask an opening question', kind='opening')
+            self.assertEqual(generate.call_count, 3)
+        self.assertFalse(LLMCacheEntry.objects.filter(kind='opening').exists())
+
+    @override_settings(LLM_CACHE_DB_MAX_ENTRIES=10)
+    def test_prune_drops_expired_then_oldest_rows(self):
+        keys = [llm_cache.make_key(f'prompt {i}', 'm1') for i in range(15)]
+        for key in keys:
+            llm_cache.put(key, 'judge', 'm1', 'x', latency_ms=1)
+        LLMCacheEntry.objects.filter(key=keys[-1]).update(expires_at=timezone.now())
+
+        # 1 expired, then the oldest 4 over the limit + 1 (10% headroom)
+        self.assertEqual(llm_cache.prune(), 6)
+        self.assertEqual(set(LLMCacheEntry.objects.values_list('key', flat=True)), set(keys[5:14]))
@@ -0,0 +1,243 @@
+"""
+Query budgets per view.
+
+Each view is requested against a small and a much larger data set; the
+number of SQL queries must be the same for both (no N+1) and within the
+view's budget.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import chat, leaderboard, skills, views
+from ..models import ChatMessage, InterviewRequest, LeaderboardEntry, QuizAttempt, QuizTurn, User
+from . import TEST_SETTINGS
+
+
+@override_settings(**TEST_SETTINGS)
+class QueryBudgetTests(TestCase):
+    SMALL, LARGE = 2, 40
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = User.objects.create(username='mentor', user_type='interviewer', company='Acme')
+        cls.student = User.objects.create(username='student')
+        cls.seeded = 0
+
+    def setUp(self):
+        # Cached dashboard fragments would hide the views' queries (and outlive the rolled-back rows)
+        cache.clear()
+
+    def seed(self, scale):
+        """Grow the data set to `scale` extra students / mentors, each with chats and requests."""
+        now = timezone.now()
+        for i in range(self.seeded, scale):
+            other_student = User.objects.create(username=f'student-{i}')
+            other_mentor = User.objects.create(
+                username=f'mentor-{i}', user_type='interviewer', company='Acme', skills='Java, System Design, DSA',
+            )
+            chat.save_messages([
+                ChatMessage(sender=other_student if n % 2 else self.mentor,
+                            receiver=self.mentor if n % 2 else other_student, message=f'hi {n}')
+                for n in range(5)
+            ] + [
+                ChatMessage(sender=other_mentor if n % 2 else self.student,
+                            receiver=self.student if n % 2 else other_mentor, message=f'hello {n}')
+                for n in range(5)
+            ])
+            InterviewRequest.objects.create(
+                student=other_student, interviewer=self.mentor, requested_date=now + timedelta(days=i),
+            )
+        # The thread that chat pages are opened on
+        chat.save_messages([
+            ChatMessage(sender=self.student if n % 2 else self.mentor,
+                        receiver=self.mentor if n % 2 else self.student, message=f'thread {n}')
+            for n in range((scale - self.seeded) * 10)
+        ])
+        self.seeded = scale
+
+    def count_queries(self, user, method, url, data=None, **extra):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data or {}, **extra)
+        self.assertLess(response.status_code, 400, url)
+        return len(queries)
+
+    def assertBudget(self, budget, user, method, url_func, data=None):
+        """Same query count at both data sizes, and no more than `budget`."""
+        self.seed(self.SMALL)
+        small = self.count_queries(user, method, url_func(), data)
+        self.seed(self.LARGE)
+        large = self.count_queries(user, method, url_func(), data)
+        self.assertEqual(small, large, f"query count grows with data: {small} -> {large}")
+        self.assertLessEqual(large, budget)
+
+    def start_quiz(self):
+        attempt = QuizAttempt.objects.create(
+            user=self.student, topic='java', current_question='What is the JVM?', current_compliment='Hi!',
+        )
+        QuizTurn.objects.bulk_create([
+            QuizTurn(attempt=attempt, step=step, question='Q', user_answer='A', concept='jvm', is_correct=True)
+            for step in range(1, 3)
+        ])
+        QuizAttempt.objects.filter(id=attempt.id).update(step=3)
+        session = self.client.session
+        session['quiz_attempt_id'] = attempt.id
+        session.save()
+
+    # ==================== DASHBOARDS ====================
+    def test_student_landing(self):
+        self.assertBudget(4, self.student, 'get', lambda: reverse('landing'))
+
+    def test_mentor_dashboard(self):
+        self.assertBudget(6, self.mentor, 'get', lambda: reverse('landing'))
+
+    def test_user_profile(self):
+        self.assertBudget(3, self.student, 'get', lambda: reverse('user_profile', args=[self.mentor.id]))
+
+    def test_calendar(self):
+        def url():
+            return f"{reverse('interview_calendar')}?month={timezone.localdate():%Y-%m}"
+        self.assertBudget(3, self.mentor, 'get', url)
+
+    def test_calendar_window(self):
+        now = timezone.now()
+        InterviewRequest.objects.create(student=self.student, interviewer=self.mentor, requested_date=now)
+        InterviewRequest.objects.create(
+            student=self.student, interviewer=self.mentor, requested_date=now + timedelta(days=70),
+        )
+        self.client.force_login(self.mentor)
+        data = self.client.get(reverse('interview_calendar'), {'week': f"{timezone.localdate():%Y-%m-%d}"}).json()
+        self.assertEqual(len(data['requests']), 1)
+        for query in ({'month': 'soon'}, {'month': '9999-12'}, {'month': '0001-01'},
+                      {'week': '0001-01-01'}, {'week': '9999-12-31'}):
+            self.assertEqual(self.client.get(reverse('interview_calendar'), query).status_code, 400, query)
+
+    def test_dashboard_cache(self):
+        self.seed(self.SMALL)
+        miss = self.count_queries(self.mentor, 'get', reverse('landing'))
+        hit = self.count_queries(self.mentor, 'get', reverse('landing'))
+        self.assertLess(hit, miss)
+
+        # A new request and a new message both show up on the next load
+        other = User.objects.get(username='student-0')
+        InterviewRequest.objects.create(student=other, interviewer=self.mentor, requested_date=timezone.now())
+        chat.send(other, self.mentor, 'are you free?')
+        response = self.client.get(reverse('landing'))
+        self.assertEqual(len(response.context['pending_requests']), self.SMALL + 1)
+        self.assertEqual(response.context['active_chats'][0].last_message_preview, 'are you free?')
+
+        # So does a student renaming themselves, in both lists
+        self.client.get(reverse('landing'))
+        other.username = 'renamed'
+        other.save()
+        response = self.client.get(reverse('landing'))
+        self.assertIn('renamed', [r.student.username for r in response.context['pending_requests']])
+        self.assertEqual(response.context['active_chats'][0].student.username, 'renamed')
+
+    def test_mentor_search(self):
+        self.assertBudget(
+            6, self.student, 'get', lambda: reverse('mentor_search'),
+            {'skills': 'java, dsa', 'company': 'ACME'},
+        )
+
+    def test_mentor_search_ranking(self):
+        User.objects.create(username='java-only', user_type='interviewer', skills='java')
+        User.objects.create(username='full-stack', user_type='interviewer', skills='Java, DSA')
+        self.client.force_login(self.student)
+        data = self.client.get(reverse('mentor_search'), {'skill': ['java', 'dsa']}).json()
+        self.assertEqual([r['username'] for r in data['results']], ['full-stack', 'java-only'])
+
+        # Walking the cursor visits every java mentor exactly once
+        seen, cursor = [], None
+        while True:
+            mentors, cursor = skills.search(['java'], cursor=cursor, limit=1)
+            seen += [mentor.username for mentor in mentors]
+            if not cursor:
+                break
+        self.assertEqual(seen, ['full-stack', 'java-only'])
+
+        for cursor in ('soon', '1-2-3', '-1-5', '1-0', '1-99999999999999999999', '99999999999999999999-1'):
+            response = self.client.get(reverse('mentor_search'), {'skill': 'java', 'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+
+    # ==================== CHAT ====================
+    def test_chat_view(self):
+        self.assertBudget(8, self.student, 'get', lambda: reverse('chat', args=[self.mentor.id]))
+
+    def test_chat_post(self):
+        self.assertBudget(
+            12, self.student, 'post', lambda: reverse('chat', args=[self.mentor.id]), {'message': 'new message'},
+        )
+
+    def test_chat_history(self):
+        def url():
+            # Everything before the newest message (the small data set has no second page)
+            newest = chat.page(self.student, self.mentor)[0][-1]
+            return f"{reverse('chat_history', args=[self.mentor.id])}?before={chat.encode_cursor(newest)}"
+        self.assertBudget(4, self.student, 'get', url)
+
+    def test_chat_updates(self):
+        def url():
+            after = ChatMessage.objects.order_by('-id').values_list('id', flat=True)[10]
+            return f"{reverse('chat_updates', args=[self.mentor.id])}?after={after}"
+        # 6 = the page's queries plus the one UPDATE marking the delivered messages read
+        self.assertBudget(6, self.student, 'get', url)
+
+    def test_chat_updates_not_modified(self):
+        self.seed(self.LARGE)
+        self.client.force_login(self.student)
+        url = reverse('chat_updates', args=[self.mentor.id])
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertLessEqual(len(queries), 3)
+
+    # ==================== QUIZ ====================
+    def test_quiz_question(self):
+        self.start_quiz()
+        self.assertBudget(5, self.student, 'get', lambda: reverse('quiz_view', args=['java']))
+
+    def test_quiz_answer(self):
+        self.start_quiz()
+        self.seed(self.LARGE)
+        queries = self.count_queries(self.student, 'post', reverse('quiz_view', args=['java']), {'answer': 'bytecode'})
+        self.assertLessEqual(queries, 11)
+
+    def test_top_performers(self):
+        def url():
+            for user in User.objects.filter(username__startswith='student-'):
+                leaderboard.record(user.id, 'java', 3, 5, timezone.now())
+            return reverse('top_performers')
+        self.assertBudget(1, self.student, 'get', url)
+
+    def test_quiz_end_updates_leaderboard(self):
+        self.client.force_login(self.student)
+        self.start_quiz()
+        QuizAttempt.objects.update(step=6)
+        attempt = QuizAttempt.objects.get(user=self.student)
+        response = self.client.get(reverse('quiz_view', args=['java']))
+        self.assertTemplateUsed(response, 'question_gen/quiz_end.html')
+        # A reload racing that one still holds the unfinished attempt; it must not count the quiz twice
+        request = RequestFactory().get('/')
+        request.session = {'quiz_attempt_id': attempt.id}
+        self.assertEqual(views._finish_quiz(request, attempt), 2)
+        self.assertNotIn('quiz_attempt_id', request.session)
+        rows = LeaderboardEntry.objects.filter(user=self.student)
+        self.assertEqual(rows.count(), 6)  # java + all topics, x all time / month / week
+        self.assertEqual(set(rows.values_list('points', 'quizzes')), {(2, 1)})
+        board = leaderboard.top('java', 'week')
+        self.assertEqual([entry.user_id for entry in board], [self.student.id])
+
+    def test_quiz_end(self):
+        self.start_quiz()
+        QuizAttempt.objects.update(step=6)
+        self.seed(self.LARGE)
+        # Worst case: the user's first quiz of the period also inserts their leaderboard rows
+        self.assertLessEqual(self.count_queries(self.student, 'get', reverse('quiz_view', args=['java'])), 18)
@@ -0,0 +1,40 @@
+"""Claiming opening questions from the pre-generated bank."""
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from .. import question_bank
+from ..models import BankQuestion
+
+
+@override_settings(QUESTION_BANK_LOW_WATER=2)
+class TakeOpeningQuestionTests(TestCase):
+    def setUp(self):
+        BankQuestion.objects.bulk_create([
+            BankQuestion(topic='java', compliment='Hi!', question=f'Q{i}', question_hash=f'java-{i}')
+            for i in range(4)
+        ] + [BankQuestion(topic='reactjs', question='R', question_hash='reactjs-0')])
+        patcher = mock.patch.object(question_bank, 'refill_in_background')
+        self.refill = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_each_question_is_claimed_once_in_one_query(self):
+        claimed = []
+        for _ in range(4):
+            with self.assertNumQueries(1):
+                claimed.append(question_bank.take_opening_question('java'))
+        self.assertEqual(sorted(question for _, question in claimed), ['Q0', 'Q1', 'Q2', 'Q3'])
+        self.assertEqual(claimed[0][0], 'Hi!')
+        self.assertIsNone(question_bank.take_opening_question('java'))
+        self.assertFalse(BankQuestion.objects.filter(topic='java', used=False).exists())
+        self.assertTrue(BankQuestion.objects.filter(topic='reactjs', used=False).exists())
+
+    def test_refills_below_low_water(self):
+        question_bank.take_opening_question('java')
+        question_bank.take_opening_question('java')
+        self.refill.assert_not_called()
+        question_bank.take_opening_question('java')  # one left
+        self.refill.assert_called_once_with('java')
+        self.refill.reset_mock()
+        self.assertIsNone(question_bank.take_opening_question('javascript'))
+        self.refill.assert_called_once_with('javascript')
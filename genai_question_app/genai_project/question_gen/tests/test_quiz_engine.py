@@ -0,0 +1,105 @@
+"""Structured quiz turns and the multi-call fallback chain."""
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from .. import quiz_engine
+from . import TEST_SETTINGS
+
+
+def turn_json(**fields):
+    data = {'verdict': 'correct', 'reason': '', 'concept': 'closures', 'compliment': 'Nice!', 'question': 'Why?'}
+    data.update(fields)
+    return json.dumps(data)
+
+
+class ParseTurnTests(SimpleTestCase):
+    def test_valid_turn(self):
+        fields = quiz_engine.parse_turn(turn_json(verdict=' Incorrect ', reason=' too vague ', question=' Why? '))
+        self.assertFalse(fields['is_correct'])
+        self.assertEqual(fields['reason'], 'too vague')
+        self.assertEqual(fields['question'], 'Why?')
+
+    def test_rejects_unusable_responses(self):
+        for raw in (
+            'not json',
+            None,
+            '["a list"]',
+            turn_json(verdict='maybe'),
+            turn_json(concept=''),
+            turn_json(question='  '),
+            turn_json(compliment=3),
+        ):
+            with self.subTest(raw=raw), self.assertRaises(quiz_engine.TurnParseError):
+                quiz_engine.parse_turn(raw)
+
+    def test_parse_response_splits_at_first_question_mark(self):
+        self.assertEqual(
+            quiz_engine.parse_response('Great start! Ready? What is a closure?'),
+            ('Great start! Ready?', 'What is a closure?'),
+        )
+        self.assertEqual(quiz_engine.parse_response(' Explain hoisting. '), ('', 'Explain hoisting.'))
+
+    def test_feedback_wording(self):
+        self.assertEqual(quiz_engine.format_feedback(True, 'ignored'), 'Correct!')
+        self.assertEqual(quiz_engine.format_feedback(False, 'missing details'), 'Incorrect: missing details')
+        self.assertTrue(quiz_engine.is_correct_feedback(' correct!'))
+        self.assertFalse(quiz_engine.is_correct_feedback('Incorrect: no'))
+
+
+@override_settings(**TEST_SETTINGS)
+class RunTurnTests(SimpleTestCase):
+    def fake_generate(self, responses):
+        """llm.generate stand-in answering by call kind and recording the kinds asked for."""
+        calls = []
+
+        def generate(prompt, kind='default', schema=None, **kwargs):
+            calls.append(kind)
+            return responses[kind]
+        return mock.patch.object(quiz_engine.llm, 'generate', side_effect=generate), calls
+
+    def test_structured_turn_is_one_call(self):
+        patch, calls = self.fake_generate({'turn': turn_json(verdict='incorrect', reason='no example')})
+        with patch:
+            result = quiz_engine.run_turn('java', '', [], 'What is the JVM?', 'a compiler', nest_level=0)
+        self.assertEqual(calls, ['turn'])
+        self.assertEqual(result['stats']['mode'], 'structured')
+        self.assertEqual(result['feedback'], 'Incorrect: no example')
+        self.assertFalse(result['is_correct'])
+        self.assertEqual(result['next_level'], 1)
+
+    def test_falls_back_to_call_chain(self):
+        patch, calls = self.fake_generate({
+            'turn': '{"verdict": "correct"}',
+            'judge': 'Correct!',
+            'new_concept': 'generics',
+            'next_question': 'Well done! What are generics used for?',
+        })
+        history = [{'question': 'Q', 'user_answer': 'A', 'concept': 'threads'}]
+        with patch:
+            result = quiz_engine.run_turn('java', '', history, 'What is a thread?', 'a unit of work', nest_level=1)
+        self.assertEqual(calls[0], 'turn')
+        self.assertCountEqual(calls[1:3], ['judge', 'new_concept'])
+        self.assertEqual(calls[3], 'next_question')
+        self.assertEqual(result['stats']['mode'], 'fallback')
+        self.assertEqual(result['stats']['calls'], 4)
+        self.assertTrue(result['is_correct'])
+        self.assertEqual(result['concept'], 'generics')
+        self.assertEqual(
+            (result['compliment'], result['question']),
+            quiz_engine.parse_response('Well done! What are generics used for?'),
+        )
+        self.assertEqual(result['next_level'], 0)
+
+    def test_candidates_need_both_branches(self):
+        candidate = {'concept': 'streams', 'compliment': 'Good!', 'question': 'What is a stream?'}
+        patch, _ = self.fake_generate({'candidates': json.dumps({'follow_up': candidate})})
+        with patch, self.assertRaises(quiz_engine.TurnParseError):
+            quiz_engine.generate_candidates('java', '', [], 'Q')
+
+        both = json.dumps({'follow_up': candidate, 'new_concept': dict(candidate, concept='lambdas')})
+        patch, _ = self.fake_generate({'candidates': both})
+        with patch:
+            candidates = quiz_engine.generate_candidates('java', '', [], 'Q')
+        self.assertEqual(candidates['new_concept']['concept'], 'lambdas')
@@ -0,0 +1,60 @@
+"""Chunking and ranked chunk retrieval (FTS5 on SQLite, keyword filter elsewhere)."""
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import retrieval
+
+PAGES = [
+    "Closures capture variables from the enclosing scope. A closure keeps its scope alive.",
+    "Promises represent a value that arrives later. Chain promises with then and catch.",
+    "The event loop runs callbacks. Promises queue microtasks on the event loop before timers.",
+    "Hoisting moves declarations to the top of their scope.",
+]
+
+
+class ChunkTextTests(SimpleTestCase):
+    def test_chunks_overlap_without_cutting_words(self):
+        words = [f'word{i}' for i in range(300)]
+        chunks = list(retrieval.chunk_text([' '.join(words[:150]), ' '.join(words[150:])], size=200, overlap=40))
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(len(chunk) <= 200 for chunk in chunks))
+        for chunk in chunks:
+            self.assertTrue(set(chunk.split()) <= set(words), chunk)
+        # Consecutive chunks share text, and together they cover every word
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertIn(chunk.split()[0], previous.split())
+        self.assertEqual(set(' '.join(chunks).split()), set(words))
+
+
+@override_settings(RETRIEVAL_CHUNK_CHARS=100, RETRIEVAL_CHUNK_OVERLAP=10, RETRIEVAL_TOP_K=2)
+class SearchTests(TestCase):
+    def setUp(self):
+        retrieval.index_pages('doc', PAGES, title='notes.pdf')
+        retrieval.index_pages('other', ["Promises promises promises everywhere in the event loop."])
+
+    def test_best_chunks_first(self):
+        results = retrieval.search('doc', 'How do promises use the event loop?')
+        self.assertEqual(len(results), 2)
+        self.assertIn('event loop', results[0])
+        self.assertTrue(all('Promises' in text or 'promises' in text for text in results))
+
+        self.assertIn('Closures', retrieval.search('doc', 'closure scope')[0])
+        self.assertEqual(retrieval.search('doc', 'the and what'), [])  # only stopwords
+        self.assertEqual(retrieval.search('doc', 'kubernetes'), [])
+
+    def test_search_stays_within_the_source(self):
+        for text in retrieval.search('doc', 'promises everywhere', k=10):
+            self.assertNotIn('everywhere', text)
+
+    def test_reindex_replaces_chunks(self):
+        retrieval.index_pages('doc', ["Generics make collections type safe."])
+        self.assertEqual(retrieval.search('doc', 'promises'), [])
+        self.assertEqual(len(retrieval.search('doc', 'generics collections')), 1)
+
+    def test_keyword_fallback_ranks_by_matching_terms(self):
+        results = retrieval._keyword_search('doc', ['promises', 'event', 'loop'], 2)
+        self.assertIn('event loop', results[0])
+
+    @override_settings(RETRIEVAL_CONTEXT_CHARS=60)
+    def test_context_is_capped(self):
+        context = retrieval.context_for('doc', 'promises event loop')
+        self.assertLessEqual(len(context.replace(' ... ', '')), 60)
@@ -0,0 +1,54 @@
+"""Server-sent quiz events under WSGI and ASGI."""
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import llm, streaming
+from ..models import QuizAttempt, User
+from . import TEST_SETTINGS
+
+
+@override_settings(**TEST_SETTINGS)
+class QuizStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create(username='student')
+
+    def setUp(self):
+        self.attempt = QuizAttempt.objects.create(user=self.student, topic='java', pending_opening=True)
+        self.url = reverse('quiz_stream', args=['java'])
+
+    def start(self, client):
+        client.force_login(self.student)
+        session = client.session
+        session['quiz_attempt_id'] = self.attempt.id
+        session.save()
+
+    def assertOpeningStreamed(self, events):
+        self.assertGreater(events.count('event: question'), 1)
+        self.assertTrue(events.rstrip().splitlines()[0].startswith('event: question'))
+        self.assertIn('event: done', events)
+        self.attempt.refresh_from_db()
+        self.assertFalse(self.attempt.pending_opening)
+
+    def test_wsgi_stream(self):
+        self.start(self.client)
+        response = self.client.get(self.url)
+        self.assertFalse(response.is_async)
+        self.assertOpeningStreamed(b''.join(response.streaming_content).decode())
+
+    async def test_asgi_stream_is_not_buffered(self):
+        # A sync iterator would be read to the end by Django's ASGI handler before sending
+        await sync_to_async(self.start)(self.async_client)
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.is_async)
+        events = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        await sync_to_async(self.assertOpeningStreamed)(events)
+
+
+class ErrorEventTests(SimpleTestCase):
+    def test_busy_gateway_gets_the_same_message_as_the_pages(self):
+        event = streaming._error(llm.LLMUnavailable('breaker open'))
+        self.assertIn('event: error', event)
+        self.assertIn(llm.AI_BUSY_MESSAGE, event)
+        self.assertIn('Error: boom', streaming._error(RuntimeError('boom')))
@@ -10,19 +10,29 @@ urlpatterns = [
     # Quiz
     path('select-topic/', views.select_topic, name='select_topic'),
     path('quiz/<str:topic>/', views.quiz_view, name='quiz_view'),
+    path('quiz/<str:topic>/stream/', views.quiz_stream, name='quiz_stream'),
+    path('documents/<int:job_id>/status/', views.document_job_status, name='document_job_status'),
+    path('documents/<int:job_id>/start/', views.start_document_quiz, name='start_document_quiz'),
     
     # Virtual Interview
     path('meet/start/', views.start_manual_meet, name='start_manual_meet'),
     
     # Mentor & Chat
     path('top-performers/', views.top_performers, name='top_performers'),
+    path('mentors/search/', views.mentor_search, name='mentor_search'),
     path('profile/<int:user_id>/', views.user_profile, name='user_profile'),
     path('chat/<int:user_id>/', views.chat_view, name='chat'),
+    path('chat/<int:user_id>/history/', views.chat_history, name='chat_history'),
+    path('chat/<int:user_id>/updates/', views.chat_updates, name='chat_updates'),
     
     # Interview Request Actions
+    path('calendar/', views.interview_calendar, name='interview_calendar'),
     path('accept-request/<int:request_id>/', views.accept_request, name='accept_request'),
     path('reject-request/<int:request_id>/', views.reject_request, name='reject_request'),
 
     #Contact
     path('contact/', views.contact_request, name='contact'),
+
+    # Internal
+    path('internal/perf-stats/', views.perf_stats, name='perf_stats'),
 ]
\ No newline at end of file
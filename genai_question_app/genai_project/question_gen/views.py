@@ -1,30 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.template.loader import render_to_string
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, logout, authenticate
 from django.conf import settings
-from django.db import models
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
 import razorpay
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
-import google.generativeai as genai
 import re
-import PyPDF2
-from io import BytesIO
 from .models import ContactMessage
 import urllib.parse
 import base64
-from datetime import datetime
+from datetime import datetime, timedelta
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import condition
+from django.core.handlers.asgi import ASGIRequest
 
 # Import models
-from .models import User, InterviewRequest, ChatMessage
+from .models import User, InterviewRequest, DocumentJob, QuizAttempt, QuizTurn, Conversation
+from .quiz_engine import (
+    run_turn, judge_turn, branch_for, build_opening_prompt, parse_response,
+)
+from .question_bank import BUILTIN_TOPICS, take_opening_question
+from .documents import cached_summary, content_hash, summarize_document
+from . import chat, dashboard, jobs, judge_cache, leaderboard, llm, llm_cache, prefetch, retrieval, skills
+from .streaming import as_async, sse, stream_opening, stream_turn
 
-# Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
 client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-# Current stable model (December 2025)
-GEMINI_MODEL = 'gemini-2.5-flash-lite'
+
+QUIZ_MAX_STEPS = 5
 
 # ==================== AUTH VIEWS ====================
 def register(request):
@@ -98,36 +108,46 @@ def landing(request):
 
     # Interviewer / Mentor Dashboard
     if user.user_type == 'interviewer':
-        # Pending requests
-        pending_requests = InterviewRequest.objects.filter(
-            interviewer=user, 
-            status='pending'
-        ).order_by('requested_date')
-
-        # All requests (for calendar drawer)
-        all_requests = InterviewRequest.objects.filter(
-            interviewer=user
-        ).order_by('-requested_date')
-
-        # Active chats: students who have messaged this interviewer
-        active_students = User.objects.filter(
-            sent_messages__receiver=user
-        ).annotate(
-            last_message_time=models.Max('sent_messages__timestamp')
-        ).order_by('-last_message_time')
+        # Cached per mentor; signals.py drops them when requests / messages change
+        pending_requests = dashboard.fragment('pending', user.id, lambda: list(
+            InterviewRequest.objects.filter(interviewer=user, status='pending')
+            .select_related('student').order_by('requested_date')
+        ))
+
+        active_chats, unread_total = dashboard.fragment('chats', user.id, lambda: _active_chats(user))
 
         return render(request, 'question_gen/mentor_dashboard.html', {
             'pending_requests': pending_requests,
-            'all_requests': all_requests,        # For calendar drawer
-            'active_chats': active_students,     # With last message time
+            'active_chats': active_chats,        # With last message time
+            'unread_total': unread_total,
         })
 
     # Student Landing Page (default)
-    mentors = User.objects.filter(user_type='interviewer').order_by('-date_joined')[:6]
-    
+    # Mentor strip is the same for every student; unread counts are per student
+    mentors = dashboard.fragment(dashboard.MENTORS, None, lambda: list(
+        User.objects.filter(user_type='interviewer').order_by('-date_joined')[:6]
+    ))
+    unread = dashboard.fragment('unread', user.id, lambda: chat.unread_counts(user))
+    for mentor in mentors:
+        mentor.unread = unread.get(mentor.id, 0)
+
     return render(request, 'question_gen/landing.html', {
-        'mentors': mentors
+        'mentors': mentors,
+        'unread_total': sum(unread.values()),
     })
+
+
+def _active_chats(user):
+    """A mentor's conversations, newest first, with unread counts. Returns (conversations, total unread)."""
+    # One indexed read of the interviewer's conversations
+    active_chats = list(Conversation.objects.filter(
+        interviewer=user
+    ).select_related('student').order_by('-last_message_at'))
+    unread = chat.unread_counts(user)
+    for conversation in active_chats:
+        conversation.unread = unread.get(conversation.student_id, 0)
+    return active_chats, sum(unread.values())
+
 @login_required
 def select_topic(request):
     if request.method == 'POST':
@@ -137,48 +157,40 @@ def select_topic(request):
 
         if document_file:
             try:
-                pdf_reader = PyPDF2.PdfReader(BytesIO(document_file.read()))
-                text = ''
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    text += (page_text or '') + '\n'
-
-                model = genai.GenerativeModel(GEMINI_MODEL)
-                sum_prompt = f"Summarize key points briefly (focus on {topic}): {text[:3000]}"
-                summary = model.generate_content(sum_prompt).text.strip()
-                messages.success(request, "Document summarized!")
+                # Same file + topic uploaded before → reuse its summary, no parsing or LLM call
+                digest = content_hash(document_file)
+                summary = cached_summary(digest, topic)
+                if summary is not None:
+                    messages.success(request, "Document summarized!")
+                elif settings.DOCUMENT_QUEUE_ENABLED:
+                    # Parsed by `manage.py document_worker`; the page polls until it's done
+                    job = jobs.enqueue(request.user, topic, document_file, digest)
+                    return render(request, 'question_gen/select_topic.html', {
+                        'job_status_url': reverse('document_job_status', args=[job.id]),
+                    })
+                else:
+                    summary, extraction = summarize_document(document_file, topic, digest, document_file.size)
+                    messages.success(
+                        request,
+                        f"Document summarized! (read {extraction.pages_parsed} of {extraction.total_pages} pages)",
+                    )
+            except llm.LLMUnavailable:
+                messages.error(request, llm.AI_BUSY_MESSAGE)
+                return render(request, 'question_gen/select_topic.html')
             except Exception as e:
                 messages.error(request, f"PDF error: {str(e)}")
                 return render(request, 'question_gen/select_topic.html')
 
-        if not document_file and topic not in ['java', 'javascript', 'reactjs']:
+        if not document_file and topic not in BUILTIN_TOPICS:
             messages.error(request, "Select valid topic or upload PDF.")
             return render(request, 'question_gen/select_topic.html')
 
         try:
-            model = genai.GenerativeModel(GEMINI_MODEL)
-            base_context = f"Document: {summary}. " if summary else ''
-            prompt = (
-                f"You are a quiz master. Topic: {topic or 'Custom'}. {base_context}"
-                "Ask one engaging beginner question on the main topic. Start with short compliment, then question. Very concise."
-            )
-            response = model.generate_content(prompt)
-            full_text = response.text.strip()
-
-            compliment, question = parse_response(full_text)
-
-            request.session['history'] = []
-            request.session['step'] = 1
-            request.session['nest_level'] = 0
-            request.session['topic'] = topic or 'Custom'
-            request.session['document_summary'] = summary
-            request.session['current_compliment'] = compliment
-            request.session['current_question'] = question
-            request.session.modified = True
-
-            url_topic = (topic or 'custom').lower().replace(' ', '-')
-            return redirect('quiz_view', topic=url_topic)
-
+            source = digest if document_file else retrieval.notes_source(topic)
+            return redirect(_open_quiz(request, topic, summary, source))
+        except llm.LLMUnavailable:
+            messages.error(request, llm.AI_BUSY_MESSAGE)
+            return render(request, 'question_gen/select_topic.html')
         except Exception as e:
             messages.error(request, f"Quiz error: {str(e)}")
             return render(request, 'question_gen/select_topic.html')
@@ -186,47 +198,167 @@ def select_topic(request):
     return render(request, 'question_gen/select_topic.html')
 
 
-def parse_response(full_text):
-    # Shortened logic
-    if '?' in full_text:
-        split_idx = full_text.find('?') + 1
-        compliment = full_text[:split_idx].strip()
-        question = full_text[split_idx:].strip()
+def _open_quiz(request, topic, summary, source=''):
+    """
+    Start a quiz on `topic` (with an optional document summary); returns the quiz URL.
+    `source` names the indexed document that quiz turns retrieve notes from.
+    """
+    # Built-in topics start from the pre-generated bank (no LLM call)
+    banked = take_opening_question(topic) if not summary and topic in BUILTIN_TOPICS else None
+    if banked:
+        _start_quiz(request, topic, summary, *banked, source=source)
+    elif settings.QUIZ_STREAMING_ENABLED:
+        # The quiz page streams the opening question in (see quiz_stream)
+        _start_quiz(request, topic, summary, '', '', pending=True, source=source)
     else:
-        compliment = ''
-        question = full_text.strip()
+        full_text = llm.generate(build_opening_prompt(topic, summary), kind='opening')
+        _start_quiz(request, topic, summary, *parse_response(full_text), source=source)
+
+    url_topic = (topic or 'custom').lower().replace(' ', '-')
+    return reverse('quiz_view', args=[url_topic])
+
+
+@login_required
+def document_job_status(request, job_id):
+    """Polled by select_topic.html while an uploaded PDF waits in the queue."""
+    job = get_object_or_404(DocumentJob, id=job_id, user=request.user)
+    data = {'status': job.status, 'attempts': job.attempts}
+    if job.status == 'done':
+        data['redirect'] = reverse('start_document_quiz', args=[job.id])
+    elif job.status == 'failed':
+        data['error'] = f"PDF error: {job.error}"
+    return JsonResponse(data)
+
+
+@login_required
+def start_document_quiz(request, job_id):
+    job = get_object_or_404(DocumentJob, id=job_id, user=request.user, status='done')
+    try:
+        messages.success(request, "Document summarized!")
+        return redirect(_open_quiz(request, job.topic, job.summary, job.content_hash))
+    except llm.LLMUnavailable:
+        messages.error(request, llm.AI_BUSY_MESSAGE)
+    except Exception as e:
+        messages.error(request, f"Quiz error: {str(e)}")
+    return redirect('select_topic')
+
+
+def _start_quiz(request, topic, summary, compliment, question, pending=False, source=''):
+    # The session only remembers which attempt is running; its state lives in QuizAttempt
+    attempt = QuizAttempt.objects.create(
+        user=request.user,
+        topic=topic or 'Custom',
+        document_summary=summary,
+        document_source=source,
+        total_steps=QUIZ_MAX_STEPS,
+        current_compliment=compliment,
+        current_question=question,
+        pending_opening=pending,
+    )
+    request.session['quiz_attempt_id'] = attempt.id
+    return attempt
+
+
+def _current_attempt(request, topic):
+    """The user's unfinished attempt for `topic` (URL form), or None."""
+    attempt_id = request.session.get('quiz_attempt_id')
+    if not attempt_id:
+        return None
+    attempt = QuizAttempt.objects.filter(id=attempt_id, user=request.user, finished_at__isnull=True).first()
+    if attempt is None or topic.replace('-', ' ').lower() != attempt.topic.lower():
+        return None
+    return attempt
+
+
+def _history(attempt):
+    """Answered steps in the shape quiz_engine expects."""
+    return list(attempt.turns.values(
+        'question', 'user_answer', 'concept', 'feedback', 'is_correct', 'nest_level', 'compliment',
+    ))
+
+
+def _quiz_context(attempt, history, question):
+    """Document summary plus the indexed notes most relevant to the current concept."""
+    summary = attempt.document_summary
+    source = attempt.document_source
+    concept = history[-1]['concept'] if history else attempt.topic
+    notes = retrieval.context_for(source, f"{concept} {question}") if source else ''
+    return f"{summary} Relevant notes: {notes}".strip() if notes else summary
+
+
+def _save_turn(attempt, turn, current_question, user_answer):
+    """
+    Append an answered step and move the attempt to the next question.
+    Returns False if this step was already answered (double submit).
+    """
+    with transaction.atomic():
+        # Conditional on the step so a resubmitted answer can't record the same step twice
+        moved = QuizAttempt.objects.filter(id=attempt.id, step=attempt.step).update(
+            step=F('step') + 1,
+            nest_level=turn['next_level'],
+            current_compliment=turn['compliment'],
+            current_question=turn['question'],
+        )
+        if moved:
+            QuizTurn.objects.create(
+                attempt=attempt,
+                step=attempt.step,
+                question=current_question,
+                user_answer=user_answer,
+                concept=turn['concept'],
+                feedback=turn['feedback'],
+                is_correct=turn['is_correct'],
+                nest_level=attempt.nest_level,
+                compliment=turn['compliment'],
+            )
+    return bool(moved)
 
-    return compliment, question
+
+def _finish_quiz(request, attempt):
+    """Score the attempt with one aggregate query, close it and add it to the leaderboard."""
+    score = attempt.turns.aggregate(correct=Count('id', filter=Q(is_correct=True)))['correct']
+    finished_at = timezone.now()
+    with transaction.atomic():
+        # Conditional so a reload racing this one can't add the quiz to the leaderboard twice
+        if QuizAttempt.objects.filter(id=attempt.id, finished_at__isnull=True).update(
+            score=score, finished_at=finished_at,
+        ):
+            leaderboard.record(attempt.user_id, attempt.topic, score, attempt.total_steps, finished_at)
+    request.session.pop('quiz_attempt_id', None)
+    return score
 
 
 @login_required
 def quiz_view(request, topic):
-    if topic.replace('-', ' ').lower() != request.session.get('topic', '').lower():
+    attempt = _current_attempt(request, topic)
+    if attempt is None:
         messages.error(request, 'Session expired.')
         return redirect('landing')
 
-    history = request.session.get('history', [])
-    step = request.session.get('step', 1)
-    nest_level = request.session.get('nest_level', 0)
-    max_steps = 5
-    summary = request.session.get('document_summary', '')
+    step = attempt.step
+    nest_level = attempt.nest_level
+    max_steps = attempt.total_steps
+    summary = attempt.document_summary
 
     # Quiz complete
     if step > max_steps:
-        correct = sum(1 for h in history if 'correct' in h.get('feedback', '').lower())
+        prefetch.evict(attempt.id, range(1, max_steps + 1))
+        correct = _finish_quiz(request, attempt)
         percentage = round((correct / max_steps) * 100, 1)
-        request.session.clear()
         return render(request, 'question_gen/quiz_end.html', {
-            'history': history,
+            'history': _history(attempt),
             'topic': topic.replace('-', ' ').title(),
-            'total': max_steps,
+            'total_steps': max_steps,
             'score': correct,
             'percentage': percentage,
-            'summary': summary
+            'document_summary': summary,
         })
 
-    current_compliment = request.session.get('current_compliment', 'Welcome!')
-    current_question = request.session.get('current_question', "Let's start!")
+    history = _history(attempt)
+    current_compliment = attempt.current_compliment or 'Welcome!'
+    current_question = attempt.current_question or "Let's start!"
+    # Summary + notes retrieved for the current concept; same size at any point of the document
+    context = _quiz_context(attempt, history, current_question)
 
     if request.method == 'POST':
         user_answer = request.POST.get('answer', '').strip()
@@ -235,79 +367,41 @@ def quiz_view(request, topic):
             return redirect('quiz_view', topic=topic)
 
         try:
-            model = genai.GenerativeModel(GEMINI_MODEL)
-            base_context = f"Document: {summary}. " if summary else ''
-            last_context = '\n'.join([f"Q: {h['question']} A: {h['user_answer']}" for h in history[-1:]])  # only last one
-
-            # Judge answer (short)
-            judge_prompt = (
-                f"Topic: {topic}. {base_context}{last_context}"
-                f"Question: {current_question}\nAnswer: {user_answer}\n"
-                "Correct? Reply only 'Correct!' or 'Incorrect: [short reason]'"
-            )
-            feedback = model.generate_content(judge_prompt).text.strip()
-
-            # Extract concept (short)
-            concept_prompt = f"From answer '{user_answer}' on {topic}, extract ONE key concept/keyword. Reply only the concept."
-            concept = model.generate_content(concept_prompt).text.strip()
-
-            # FIXED Nesting: Only 1 level, then always branch
-            if nest_level == 0:
-                nest_text = f"Ask a deeper follow-up on '{concept}' (more specific/advanced than original question)."
-                next_level = 1
+            # Next question was generated while the student was answering → judge only
+            candidate = prefetch.take(attempt.id, step, branch_for(nest_level))
+            if candidate:
+                turn = judge_turn(topic, context, history, current_question, user_answer, nest_level, candidate)
             else:
-                # Force completely new branch
-                previous_concepts = [h['concept'] for h in history if 'concept' in h]
-                prev_str = ', '.join(previous_concepts) if previous_concepts else 'none'
-                
-                # FIXED: Explicit new concept extraction
-                new_concept_prompt = (
-                    f"Topic: {topic}. Previous concepts: {prev_str}. "
-                    "Pick ONE completely new, unrelated concept from {topic} that hasn't been covered. Reply only the concept name."
-                )
-                concept = model.generate_content(new_concept_prompt).text.strip()
-                
-                nest_text = f"Start fresh with a core question on the new topic '{concept}' (ignore previous discussion)."
-                next_level = 0
-
-            # Next question (short prompt)
-            next_prompt = (
-                f"Quiz master for {topic}. {base_context}{nest_text} "
-                f"Previous feedback: {feedback}. "
-                f"Ask engaging question on '{concept}'. Start with short compliment, then question. Very concise."
-            )
-            next_response = model.generate_content(next_prompt).text.strip()
-            compliment, question = parse_response(next_response)
-
-            # Save history
-            history.append({
-                'question': current_question,
-                'user_answer': user_answer,
-                'concept': concept,
-                'feedback': feedback,
-                'nest_level': nest_level,
-                'compliment': compliment
-            })
-
-            # Update session
-            request.session['history'] = history
-            request.session['step'] = step + 1
-            request.session['nest_level'] = next_level
-            request.session['current_compliment'] = compliment
-            request.session['current_question'] = question
-            request.session.modified = True
-
-            if 'correct' in feedback.lower():
+                turn = run_turn(topic, context, history, current_question, user_answer, nest_level)
+            if not _save_turn(attempt, turn, current_question, user_answer):
+                return redirect('quiz_view', topic=topic)
+            feedback, concept = turn['feedback'], turn['concept']
+
+            if turn['is_correct']:
                 messages.success(request, f"{feedback} → Next: {concept}")
             else:
                 messages.error(request, f"{feedback} → Next: {concept}")
 
             return redirect('quiz_view', topic=topic)
 
+        except llm.LLMUnavailable:
+            messages.error(request, llm.AI_BUSY_MESSAGE)
+            return redirect('quiz_view', topic=topic)
         except Exception as e:
             messages.error(request, f"Error: {str(e)}")
             return redirect('quiz_view', topic=topic)
 
+    # Feedback from a streamed turn (quiz_stream can't add messages after its headers are sent)
+    streamed = request.session.pop('quiz_feedback', None)
+    if streamed:
+        (messages.success if streamed['is_correct'] else messages.error)(request, streamed['text'])
+
+    pending_opening = attempt.pending_opening
+
+    # Start on the next question while the student is answering this one
+    if step < max_steps and not pending_opening:
+        prefetch.schedule(attempt.id, step, topic, context, history, current_question)
+
     topic_display = topic.replace('-', ' ').title()
     return render(request, 'question_gen/quiz_question.html', {
         'compliment': current_compliment,
@@ -317,7 +411,131 @@ def quiz_view(request, topic):
         'nest_level': nest_level,
         'history': history[-2:],
         'topic': topic_display,
+        'streaming': settings.QUIZ_STREAMING_ENABLED,
+        'pending_opening': pending_opening,
+        'stream_url': reverse('quiz_stream', args=[topic]),
     })
+
+
+@login_required
+def quiz_stream(request, topic):
+    """
+    Server-sent-events version of quiz_view.
+
+    GET streams the opening question when select_topic left it pending;
+    POST streams the verdict and next question for an answer. Results are
+    saved to the attempt when the stream ends.
+    """
+    attempt = _current_attempt(request, topic)
+    if attempt is None:
+        return JsonResponse({'error': 'Session expired.'}, status=400)
+
+    session = request.session
+    quiz_url = reverse('quiz_view', args=[topic])
+
+    if request.method == 'POST':
+        user_answer = request.POST.get('answer', '').strip()
+        step = attempt.step
+        if not user_answer or step > attempt.total_steps or attempt.pending_opening:
+            return JsonResponse({'error': 'Please answer.'}, status=400)
+
+        history = _history(attempt)
+        nest_level = attempt.nest_level
+        current_question = attempt.current_question or "Let's start!"
+        candidate = prefetch.take(attempt.id, step, branch_for(nest_level))
+        context = _quiz_context(attempt, history, current_question)
+
+        def on_done(turn):
+            if _save_turn(attempt, turn, current_question, user_answer):
+                session['quiz_feedback'] = {
+                    'text': f"{turn['feedback']} → Next: {turn['concept']}",
+                    'is_correct': turn['is_correct'],
+                }
+                session.save()
+            return {'redirect': quiz_url, 'feedback': turn['feedback'], 'concept': turn['concept']}
+
+        events = stream_turn(topic, context, history, current_question, user_answer, nest_level, candidate, on_done)
+
+    elif attempt.pending_opening:
+        def on_done(compliment, question):
+            QuizAttempt.objects.filter(id=attempt.id, pending_opening=True).update(
+                current_compliment=compliment, current_question=question, pending_opening=False,
+            )
+            return {'redirect': quiz_url, 'compliment': compliment, 'question': question}
+
+        events = stream_opening(attempt.topic, attempt.document_summary, on_done)
+
+    else:
+        events = iter([sse('done', {'redirect': quiz_url})])
+
+    if isinstance(request, ASGIRequest):
+        events = as_async(events)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ==================== CALENDAR ====================
+def _calendar_window(request):
+    """
+    [start, end) for ?week=YYYY-MM-DD (the Monday-to-Sunday week holding
+    that day) or ?month=YYYY-MM (default: this month), plus prev / next query strings.
+    """
+    today = timezone.localdate()
+    if request.GET.get('week'):
+        day = datetime.strptime(request.GET['week'], '%Y-%m-%d').date()
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+        prev, following = f"week={start - timedelta(days=7)}", f"week={end}"
+        label = f"{start:%b %d} – {end - timedelta(days=1):%b %d, %Y}"
+    else:
+        month = request.GET.get('month') or f"{today:%Y-%m}"
+        start = datetime.strptime(month, '%Y-%m').date()
+        end = (start + timedelta(days=32)).replace(day=1)
+        prev, following = f"month={(start - timedelta(days=1)):%Y-%m}", f"month={end:%Y-%m}"
+        label = f"{start:%B %Y}"
+
+    tz = timezone.get_current_timezone()
+    bounds = [timezone.make_aware(datetime.combine(d, datetime.min.time()), tz) for d in (start, end)]
+    return bounds[0], bounds[1], label, prev, following
+
+
+@login_required
+def interview_calendar(request):
+    """A mentor's interview requests in one week or month, for the dashboard's calendar drawer."""
+    if request.user.user_type != 'interviewer':
+        return JsonResponse({'error': 'Only mentors have a calendar.'}, status=403)
+    try:
+        start, end, label, prev, following = _calendar_window(request)
+    except (ValueError, OverflowError):
+        # OverflowError: a window (or its prev / next link) past year 1 or 9999
+        return JsonResponse({'error': 'Use ?month=YYYY-MM or ?week=YYYY-MM-DD.'}, status=400)
+
+    interview_requests = InterviewRequest.objects.filter(
+        interviewer=request.user,
+        requested_date__gte=start,
+        requested_date__lt=end,
+    ).select_related('student').order_by('requested_date')
+
+    return JsonResponse({
+        'label': label,
+        'prev': prev,
+        'next': following,
+        'requests': [
+            {
+                'id': req.id,
+                'student': req.student.username,
+                'date': date_format(timezone.localtime(req.requested_date), 'l, M d, Y'),
+                'time': date_format(timezone.localtime(req.requested_date), 'h:i A'),
+                'status': req.status,
+                'status_display': req.get_status_display(),
+            }
+            for req in interview_requests
+        ],
+    })
+
+
 # ==================== VIRTUAL INTERVIEW & MENTORSHIP ====================
 @login_required
 def start_manual_meet(request):
@@ -353,12 +571,67 @@ def start_manual_meet(request):
 
     return render(request, 'question_gen/start_manual_meet.html')
 
+@staff_member_required
+def perf_stats(request):
+    """Internal counters (prefetch hit/miss, ...) for staff."""
+    return JsonResponse({
+        'llm': llm.stats(),
+        'llm_cache': llm_cache.stats(),
+        'judge_cache': judge_cache.stats(),
+        'prefetch': prefetch.stats(),
+        'dashboard': dashboard.stats(),
+    })
+
 def top_performers(request):
+    """Quiz leaderboard: ?topic=java for one topic, ?window=month / week for recent results."""
+    topic = request.GET.get('topic', '')
+    window = request.GET.get('window', 'all')
+    if window not in leaderboard.WINDOWS:
+        window = 'all'
     return render(request, 'question_gen/top_performers.html', {
-        'users': HIGH_PACKAGE_USERS
+        'entries': leaderboard.top(topic, window),
+        'topic': topic,
+        'window': window,
+        'topics': BUILTIN_TOPICS,
+        'windows': leaderboard.WINDOWS,
     })
 
 
+@login_required
+def mentor_search(request):
+    """
+    Mentors by ?skill=java&skill=system design (or ?skills=java,dsa), ?company= and ?role=,
+    best skill overlap first. Pass back `next` as ?cursor= for the following page.
+    """
+    skill_names = request.GET.getlist('skill') + skills.parse(request.GET.get('skills', ''))
+    cursor = request.GET.get('cursor')
+    try:
+        mentors, following = skills.search(
+            skill_names, request.GET.get('company', ''), request.GET.get('role', ''), cursor,
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Use the `next` value from the previous page as ?cursor=.'}, status=400)
+    data = {
+        'results': [
+            {
+                'id': mentor.id,
+                'username': mentor.username,
+                'company': mentor.company or '',
+                'role': mentor.role or '',
+                'package': mentor.package or '',
+                'skills': [skill.name for skill in mentor.skill_tags.all()],
+                'matches': mentor.matches,
+                'profile_url': reverse('user_profile', args=[mentor.id]),
+            }
+            for mentor in mentors
+        ],
+        'next': following,
+    }
+    if not cursor:
+        data['skill_facets'] = skills.skill_facets()
+    return JsonResponse(data)
+
+
 @login_required
 def user_profile(request, user_id):
     try:
@@ -407,7 +680,7 @@ def user_profile(request, user_id):
 def accept_request(request, request_id):
     req = get_object_or_404(InterviewRequest, id=request_id, interviewer=request.user)
     req.status = 'accepted'
-    req.save()
+    req.save(update_fields=['status', 'updated_at'])
     messages.success(request, "Interview request accepted!")
     return redirect('landing')
 
@@ -415,7 +688,7 @@ def accept_request(request, request_id):
 def reject_request(request, request_id):
     req = get_object_or_404(InterviewRequest, id=request_id, interviewer=request.user)
     req.status = 'rejected'
-    req.save()
+    req.save(update_fields=['status', 'updated_at'])
     messages.success(request, "Interview request rejected.")
     return redirect('landing')
 
@@ -424,35 +697,76 @@ def chat_view(request, user_id):
     other_user = get_object_or_404(User, id=user_id)
 
     # Security: only allow chat between student and interviewer
-    if not (
-        (request.user.user_type == 'student' and other_user.user_type == 'interviewer') or
-        (request.user.user_type == 'interviewer' and other_user.user_type == 'student')
-    ):
+    if not chat.can_chat(request.user, other_user):
         messages.error(request, "You can only chat with mentors/students.")
         return redirect('landing')
 
     if request.method == 'POST':
         message_text = request.POST.get('message', '').strip()
         if message_text:
-            ChatMessage.objects.create(
-                sender=request.user,
-                receiver=other_user,
-                message=message_text
-            # Do NOT set timestamp here — let default=timezone.now handle it
-            )
+            # Also updates the Conversation row (dashboard list)
+            chat.send(request.user, other_user, message_text)
             messages.success(request, "Message sent!")
 
-    # Correct query: fetch all messages between the two users, regardless of who is viewing
-    chat_history = ChatMessage.objects.filter(
-        models.Q(sender=request.user, receiver=other_user) |
-        models.Q(sender=other_user, receiver=request.user)
-    ).order_by('timestamp')
+    chat.mark_read(request.user, other_user)
+
+    # Newest page only; older pages are fetched by chat_history as the user scrolls up
+    chat_messages, older_cursor = chat.page(request.user, other_user)
 
     return render(request, 'question_gen/chat.html', {
         'other_user': other_user,
-        'messages': chat_history
+        'messages': chat_messages,
+        'older_url': _older_url(other_user, older_cursor),
     })
 
+
+def _older_url(other_user, cursor):
+    if not cursor:
+        return ''
+    return f"{reverse('chat_history', args=[other_user.id])}?before={cursor}"
+
+
+@login_required
+def chat_history(request, user_id):
+    """Older chat messages (rendered rows) for chat.html's scroll-up loader."""
+    other_user = get_object_or_404(User, id=user_id)
+    if not chat.can_chat(request.user, other_user):
+        return JsonResponse({'error': 'You can only chat with mentors/students.'}, status=403)
+    try:
+        chat_messages, older_cursor = chat.page(request.user, other_user, before=request.GET.get('before'))
+    except ValueError:
+        return JsonResponse({'error': 'Use the older_url from the previous page.'}, status=400)
+    html = render_to_string('question_gen/chat_messages.html', {'messages': chat_messages}, request=request)
+    return JsonResponse({'html': html, 'older_url': _older_url(other_user, older_cursor)})
+
+def _chat_etag(request, user_id):
+    # Only the newest message id changes what a poll can return; None skips the check when logged out
+    if not request.user.is_authenticated:
+        return None
+    return f'"chat-{request.user.id}-{user_id}-{chat.latest_id(request.user, user_id)}"'
+
+
+@login_required
+@condition(etag_func=_chat_etag)
+def chat_updates(request, user_id):
+    """
+    Messages newer than ?after=<id>, for chat.html when no WebSocket is open;
+    the other user's messages among them are marked read. Unchanged conversations get a 304 (ETag) without loading any messages.
+    """
+    other_user = get_object_or_404(User, id=user_id)
+    try:
+        after_id = int(request.GET.get('after', 0))
+    except ValueError:
+        after_id = 0
+    new_messages = chat.newer(request.user, other_user, after_id)
+    if any(message.sender_id == other_user.id for message in new_messages):
+        # Delivered to an open thread, same as loading the chat page
+        chat.mark_read(request.user, other_user)
+    response = JsonResponse({'messages': [chat.serialize(message) for message in new_messages]})
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @login_required  # or not, if contact is public
 def contact_request(request):
     if request.method == 'POST':